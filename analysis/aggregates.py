@@ -0,0 +1,305 @@
+"""Running per-question aggregates of the 1-5 rating answers.
+
+For every rating question and every group of respondents (all respondents,
+and each value of the keys in GROUP_KEYS) the store keeps the count of each
+rating, the answer count, sum, sum of squares and the number of low (<4)
+ratings. New survey submissions are appended to Responses.json with
+``ingest`` and folded into the stored aggregates, so the cost of an ingest
+is proportional to the batch and the pages never rescan the raw rows.
+
+The counts come from the ratings packed into an int8 matrix (see
+``likert_matrix``), binned for every question and group in one bincount.
+"""
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.instrumentation import timed
+from analysis.paths import cache_dir, current_cohort
+from analysis.responses import (likert_columns, load_responses, read_responses, responses_path,
+                                responses_signature, tail_digest)
+from analysis.wordclouds import RESPONSES_SOURCE, invalidate_wordclouds
+
+AGGREGATES_FILE = 'response_aggregates.json'
+AGGREGATES_VERSION = 1
+
+# Respondent attributes the aggregates are broken down by, besides "All"
+GROUP_KEYS = ['Role', 'Gender', 'Coaching For']
+ALL = 'All'
+
+LOW_RATING = 4
+RATINGS = [1, 2, 3, 4, 5]
+# Unanswered cell of a likert_matrix
+MISSING_RATING = 0
+
+
+def likert_matrix(df, questions):
+    """Ratings of ``questions`` as a rows x questions int8 matrix.
+
+    Unanswered cells, and answers off the rating scale, hold MISSING_RATING.
+    """
+    matrix = np.full((len(df), len(questions)), MISSING_RATING, dtype=np.int8)
+    for position, question in enumerate(questions):
+        if question not in df.columns:
+            continue
+        values = pd.to_numeric(df[question], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = (values >= RATINGS[0]) & (values <= RATINGS[-1]) & (values == np.floor(values))
+        matrix[valid, position] = values[valid]
+    return matrix
+
+
+def rating_histograms(matrix, groups=None, n_groups=1):
+    """Count of each rating per group and question, in one bincount of ``matrix``.
+
+    ``groups`` is the group code of every row (-1 for none; default: one
+    group of all rows). Returns an n_groups x questions x RATINGS array.
+    """
+    n_questions = matrix.shape[1]
+    bins = len(RATINGS) + 1
+    # Cell of every answer: (group, question, rating), MISSING_RATING included
+    cells = np.arange(n_questions, dtype=np.intp) * bins + matrix
+    if groups is not None:
+        # Rows in no group are counted in an extra group, dropped below
+        cells += (np.where(groups < 0, n_groups, groups) * (n_questions * bins))[:, None]
+    size = n_groups * n_questions * bins
+    counts = np.bincount(cells.ravel(), minlength=size)[:size]
+    return counts.reshape(n_groups, n_questions, bins)[:, :, 1:]
+
+
+def rating_counts(df, questions, matrix=None):
+    """Count each rating of each question, overall and per group.
+
+    ``matrix`` is the likert_matrix of ``df`` if already at hand.
+    Returns {group key: {group: {question: [count of 1, ..., count of 5]}}}.
+    """
+    if matrix is None:
+        matrix = likert_matrix(df, questions)
+
+    counts = {ALL: {ALL: dict(zip(questions, rating_histograms(matrix)[0].tolist()))}}
+    for key in GROUP_KEYS:
+        if key not in df.columns:
+            continue
+        codes, groups = pd.factorize(df[key].astype(object), sort=True)
+        histograms = rating_histograms(matrix, codes, len(groups))
+        counts[key] = {str(group): dict(zip(questions, group_histograms.tolist()))
+                       for group, group_histograms in zip(groups, histograms)}
+    return counts
+
+
+def merge_counts(total, batch):
+    for key, groups in batch.items():
+        for group, questions in groups.items():
+            stored = total.setdefault(key, {}).setdefault(group, {})
+            for question, counts in questions.items():
+                previous = stored.get(question, [0] * len(RATINGS))
+                stored[question] = [a + b for a, b in zip(previous, counts)]
+    return total
+
+
+def question_stats(counts):
+    """Count, sum, sum of squares and low-rating count from rating counts."""
+    return {
+        'counts': counts,
+        'count': sum(counts),
+        'sum': sum(rating * count for rating, count in zip(RATINGS, counts)),
+        'sum_sq': sum(rating * rating * count for rating, count in zip(RATINGS, counts)),
+        'low': sum(count for rating, count in zip(RATINGS, counts) if rating < LOW_RATING),
+    }
+
+
+def _with_stats(counts):
+    return {key: {group: {question: question_stats(question_counts)
+                          for question, question_counts in questions.items()}
+                  for group, questions in groups.items()}
+            for key, groups in counts.items()}
+
+
+def aggregates_path(cohort=None):
+    """Stored aggregates of ``cohort`` (default: the current one)."""
+    return cache_dir(cohort) / AGGREGATES_FILE
+
+
+def aggregate_frame(df, questions=None, matrix=None):
+    """Aggregates of the rating questions of ``df``, not tied to any file.
+
+    ``questions`` defaults to the rating questions of ``df``; ``matrix`` is
+    their likert_matrix if already at hand.
+    """
+    questions = likert_columns(df) if questions is None else questions
+    return {
+        'version': AGGREGATES_VERSION,
+        'rows': len(df),
+        'questions': questions,
+        'groups': _with_stats(rating_counts(df, questions, matrix)),
+    }
+
+
+def build_aggregates(source=None):
+    """Aggregate the whole responses file from scratch."""
+    source = source or responses_path()
+    aggregates = aggregate_frame(read_responses(source)[0])
+    size = os.path.getsize(source)
+    return {**aggregates, 'source_bytes': size, 'source_digest': tail_digest(source, size)}
+
+
+def update_aggregates(aggregates, batch_df, source=None):
+    """Fold a batch of new responses into existing aggregates."""
+    source = source or responses_path()
+    counts = {key: {group: {question: stats['counts'] for question, stats in questions.items()}
+                    for group, questions in groups.items()}
+              for key, groups in aggregates['groups'].items()}
+    merge_counts(counts, rating_counts(batch_df, aggregates['questions']))
+    size = os.path.getsize(source)
+    return {
+        **aggregates,
+        'rows': aggregates['rows'] + len(batch_df),
+        'source_bytes': size,
+        'source_digest': tail_digest(source, size),
+        'groups': _with_stats(counts),
+    }
+
+
+def load_stored_aggregates(path=None):
+    path = path or aggregates_path()
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        aggregates = json.load(f)
+    return aggregates if aggregates.get('version') == AGGREGATES_VERSION else None
+
+
+def save_aggregates(aggregates, path=None):
+    path = path or aggregates_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(aggregates, f)
+    os.replace(tmp_path, path)
+
+
+def _read_appended(source, offset):
+    with open(source, 'rb') as f:
+        f.seek(offset)
+        text = f.read().decode('utf-8')
+    if not text.strip():
+        return None
+    return read_responses(io.StringIO(text))[0]
+
+
+def sync_aggregates(source=None, path=None):
+    """Bring the stored aggregates in line with the responses file.
+
+    Lines appended to the file since the last sync are folded in
+    incrementally; a rewritten or truncated file triggers a full rebuild.
+    """
+    source, path = source or responses_path(), path or aggregates_path()
+    aggregates = load_stored_aggregates(path)
+    size = os.path.getsize(source)
+    if (aggregates is None or size < aggregates['source_bytes']
+            or tail_digest(source, aggregates['source_bytes']) != aggregates['source_digest']):
+        aggregates = build_aggregates(source)
+    elif size > aggregates['source_bytes']:
+        batch_df = _read_appended(source, aggregates['source_bytes'])
+        if batch_df is not None and set(likert_columns(batch_df)) - set(aggregates['questions']):
+            # A new rating question appeared: the question set must be rebuilt
+            aggregates = build_aggregates(source)
+        elif batch_df is not None:
+            aggregates = update_aggregates(aggregates, batch_df, source)
+    else:
+        return aggregates
+    save_aggregates(aggregates, path)
+    # The response word clouds were drawn from the previous answers
+    invalidate_wordclouds(RESPONSES_SOURCE, Path(path).parent / 'wordclouds')
+    return aggregates
+
+
+def ingest(records, source=None, path=None):
+    """Append new survey responses and update the aggregates with them only.
+
+    ``records`` is a list of dicts, one per submission, in the same shape
+    as the lines of Responses.json; a missing file (a new cohort) is
+    created. Returns the updated aggregates.
+    """
+    source, path = source or responses_path(), path or aggregates_path()
+    if not records:
+        return sync_aggregates(source, path)
+    if os.path.exists(source):
+        # Fold in anything appended outside ``ingest`` before adding the batch
+        sync_aggregates(source, path)
+    else:
+        # The first batch of a new cohort
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+
+    lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+    with open(source, 'rb+' if os.path.exists(source) else 'wb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                lines = '\n' + lines
+        f.write(lines.encode('utf-8'))
+
+    return sync_aggregates(source, path)
+
+
+# Small enough to keep those of many cohorts for the comparisons
+@st.cache_data(max_entries=32)
+def _load_aggregates(cohort, signature):
+    return sync_aggregates(responses_path(cohort), aggregates_path(cohort))
+
+
+@timed('load')
+def load_aggregates(cohort=None):
+    """The aggregates matching a cohort's Responses.json, cached per file version.
+
+    Only ``cohort``'s own files are read (default: the current cohort).
+    """
+    cohort = cohort or current_cohort()
+    return _load_aggregates(cohort, responses_signature(responses_path(cohort)))
+
+
+@st.cache_resource(max_entries=4)
+def _load_likert_matrix(signature):
+    df = load_responses()
+    questions = likert_columns(df)
+    matrix = likert_matrix(df, questions)
+    matrix.flags.writeable = False
+    return questions, matrix
+
+
+@timed('load')
+def load_likert_matrix():
+    """(rating questions, shared likert_matrix) of the current responses."""
+    return _load_likert_matrix(responses_signature())
+
+
+def rating_distribution(aggregates, question, key=ALL, group=ALL):
+    """Counts per rating of one question, like ``value_counts().sort_index()``."""
+    stats = aggregates['groups'].get(key, {}).get(group, {}).get(question)
+    if stats is None:
+        return pd.Series(dtype='int64', name='count')
+    counts = pd.Series(stats['counts'], index=pd.Index(
+        RATINGS, name=question), name='count')
+    return counts[counts > 0]
+
+
+def rating_summary(aggregates, questions, key=ALL, group=ALL):
+    """Mean, variance, answer count and low-rating count per question."""
+    records = []
+    for question in questions:
+        stats = aggregates['groups'].get(key, {}).get(group, {}).get(question)
+        count = stats['count'] if stats else 0
+        mean = stats['sum'] / count if count else np.nan
+        records.append({
+            'Question': question,
+            'Count': count,
+            'Mean Rating': mean,
+            'Variance': stats['sum_sq'] / count - mean * mean if count else np.nan,
+            'Low Ratings (<4)': stats['low'] if stats else 0,
+        })
+    return pd.DataFrame(records)
@@ -0,0 +1,336 @@
+"""Builders for the derived files in a cohort's directory.
+
+Each stage reads its inputs from the data directory and writes its outputs
+back next to them. The stages are run as a dependency graph by
+``build_artifacts.py``, which skips stages whose inputs did not change.
+"""
+import json
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.cube import CUBE_FILE, Cube, build_cube
+from analysis.matrix_store import matrix_paths, write_matrix
+from analysis.phrases import count_phrases
+from analysis.questions import (COMPARED_COLUMNS, COMPONENT_COLUMNS,
+                                PCA_COMPONENT_NAMES,
+                                PRACTICE_WEEK_COLUMNS,
+                                PRACTICE_WEEK_JOINED_COLUMN,
+                                RANKED_LESSON_EXAM_COLUMNS,
+                                RANKED_SECTION_COLUMNS, SATISFACTION_COLUMN,
+                                SCHEDULING_COLUMN,
+                                TIMEZONE_COLUMN, WEEKDAY_TIMES_COLUMN,
+                                WEEKEND_TIMES_COLUMN)
+from analysis.responses import read_responses
+from analysis.sentiment import sentiment_table, to_columns
+from analysis.sentiment_store import SentimentStore
+from analysis.wordclouds import PHRASES_SOURCE, invalidate_wordclouds
+
+# ``modules`` are the analysis modules besides the builder's own whose code
+# shapes the outputs; their source is part of the stage's fingerprint
+Stage = namedtuple('Stage', ['name', 'inputs', 'outputs', 'build', 'modules'])
+
+RESPONSES = 'Responses.json'
+STRONG_CORRELATION_THRESHOLD = 0.7
+PCA_COMPONENTS = 5
+TOP_PHRASES = 50
+TOP_PHRASES_PER_GROUP = 20
+
+
+def write_json(data, path, indent=4):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=indent)
+
+
+def matrix_files(name):
+    """File names of a matrix stored with ``write_matrix``."""
+    return [path.name for path in matrix_paths(name)]
+
+
+def numeric_responses(df):
+    """Numeric answers with missing values imputed by the question mean."""
+    df_numeric = df.select_dtypes('number').astype(float)
+    return df_numeric.fillna(df_numeric.mean())
+
+
+def ranking(scores, counts, label):
+    """Records sorted by descending average score, as in the *_Ranking files."""
+    return [{label: key, "Average_Score": float(score), "Participant_Count": int(counts[key])}
+            for key, score in scores.sort_values(ascending=False).items()]
+
+
+def build_correlations(data_dir):
+    df_numeric = numeric_responses(read_responses(data_dir / RESPONSES)[0])
+    correlations = df_numeric.corr()
+    write_json(correlations.to_dict(), data_dir /
+               'Heatmap_Correlation_Matrix.json')
+    write_matrix(correlations, data_dir / 'Heatmap_Correlation_Matrix')
+
+    # Every ordered pair of distinct questions above the threshold
+    pairs = correlations.rename_axis(index='Variable 1', columns='Variable 2').stack(
+    ).rename('Correlation').reset_index()
+    pairs = pairs[(pairs['Variable 1'] != pairs['Variable 2']) &
+                  (pairs['Correlation'].abs() > STRONG_CORRELATION_THRESHOLD)]
+    pairs.to_json(data_dir / 'Strong_Correlations.json',
+                  orient='records', lines=True)
+
+    ranked = correlations.unstack().sort_values(
+        ascending=False, kind='stable').drop_duplicates()
+    write_json({
+        "Top_Positive_Correlations": {f'{a} & {b}': value for (a, b), value in ranked.head(10).items()},
+        "Top_Negative_Correlations": {f'{a} & {b}': value for (a, b), value in ranked.tail(10)[::-1].items()},
+    }, data_dir / 'Correlation_Insights.json')
+
+
+def build_pca(data_dir):
+    df_numeric = numeric_responses(read_responses(data_dir / RESPONSES)[0])
+    standardized = (df_numeric - df_numeric.mean()) / df_numeric.std(ddof=0)
+    standardized = standardized.fillna(0)
+
+    _, singular_values, components = np.linalg.svd(
+        standardized.to_numpy(), full_matrices=False)
+    # Fix the arbitrary SVD signs so reruns give identical files
+    signs = np.sign(components[np.arange(len(components)),
+                    np.abs(components).argmax(axis=1)])
+    components = components * signs[:, None]
+
+    names = [f'PC{i + 1}' for i in range(PCA_COMPONENTS)]
+    explained = singular_values ** 2 / (singular_values ** 2).sum()
+    scores = pd.DataFrame(standardized.to_numpy() @ components[:PCA_COMPONENTS].T,
+                          columns=names)
+    loadings = pd.DataFrame(components[:PCA_COMPONENTS].T,
+                            index=df_numeric.columns, columns=names)
+    explained_variance = dict(zip(names, explained[:PCA_COMPONENTS].tolist()))
+    write_json({
+        "PCA_Components": scores.to_dict(orient='records'),
+        "Explained_Variance": explained_variance,
+        "Loadings": loadings.to_dict(),
+    }, data_dir / 'PCA_Analysis.json')
+    write_matrix(loadings, data_dir / 'PCA_Loadings',
+                 attrs={'explained_variance': explained_variance})
+    write_matrix(scores, data_dir / 'PCA_Scores', row_labels=False)
+
+
+def build_pca_ranking(data_dir):
+    df = read_responses(data_dir / RESPONSES)[0]
+    df_numeric = numeric_responses(df).drop(columns='Birth Year')
+    with open(data_dir / 'PCA_Analysis.json', 'r') as f:
+        loadings = pd.DataFrame(json.load(f)['Loadings']).loc[df_numeric.columns]
+
+    # Score each component by the questions loading most strongly on it
+    dominant = loadings.abs().idxmax(axis=1)
+    component_scores = pd.DataFrame({
+        PCA_COMPONENT_NAMES.get(component, component): df_numeric[dominant.index[dominant == component]].mean(axis=1)
+        for component in loadings.columns if (dominant == component).any()
+    })
+    by_role = component_scores.groupby(df['Role'], observed=True)
+    counts = df['Role'].value_counts()
+    write_json({role: ranking(scores, {name: counts[role] for name in scores.index}, "PCA_Component")
+                for role, scores in by_role.mean().iterrows()},
+               data_dir / 'PCA_Components_Ranking_By_Role.json')
+
+
+def build_comparison_cube(data_dir):
+    cube = build_cube(read_responses(data_dir / RESPONSES)[0], data_dir / RESPONSES)
+    write_json(cube, data_dir / CUBE_FILE, indent=None)
+
+    # The Summary's published comparisons, as views of the cube
+    cube = Cube(cube)
+    satisfaction = cube.mean('Role', [SATISFACTION_COLUMN], impute=True)[SATISFACTION_COLUMN]
+    nationality_satisfaction = cube.mean('Nationality_Country', [SATISFACTION_COLUMN], impute=True)
+    write_json({
+        "Role_Satisfaction_Comparison": satisfaction.to_dict(),
+        "Nationality_Satisfaction_Comparison": nationality_satisfaction[SATISFACTION_COLUMN].round(2).to_dict(),
+    }, data_dir / 'Comparative_Analysis-2.json')
+    write_json(cube.component_means('Residence_Continent', COMPONENT_COLUMNS).to_dict(),
+               data_dir / 'continent_component_analysis.json')
+
+    # The comparative section's published mean ratings per group
+    for name in ['Role', 'Age_Group']:
+        write_json(cube.mean(name, impute=True).to_dict(), data_dir / f'{name}_Comparative_Analysis.json')
+    write_json({name: cube.mean(name, impute=True).to_dict()
+                for name in ['Residence_Continent', 'Nationality_Continent']},
+               data_dir / 'Continent_Comparative_Analysis.json')
+
+
+def build_rankings(data_dir):
+    df = read_responses(data_dir / RESPONSES)[0]
+    df_numeric = numeric_responses(df)
+    counts = df['Role'].value_counts()
+
+    for columns, label, filename in [
+            (RANKED_SECTION_COLUMNS, "Section", 'All_Sections_Ranking_By_Role.json'),
+            (RANKED_LESSON_EXAM_COLUMNS, "Lesson_Exam", 'Lessons_Exams_Ranking_By_Role.json')]:
+        means = df_numeric[columns].groupby(df['Role'], observed=True).mean()
+        write_json({role: ranking(scores, {column: counts[role] for column in columns}, label)
+                    for role, scores in means.iterrows()}, data_dir / filename)
+
+    # One row per (respondent, practice week joined), scored by the
+    # respondent's average practice week rating
+    df_weeks = pd.DataFrame({
+        'Practice_Week': df[PRACTICE_WEEK_JOINED_COLUMN].astype(object).str.split(','),
+        'Role': df['Role'],
+        'Score': df_numeric[PRACTICE_WEEK_COLUMNS].mean(axis=1),
+    }).explode('Practice_Week').dropna(subset='Practice_Week')
+    df_weeks['Practice_Week'] = df_weeks['Practice_Week'].str.strip()
+
+    overall = df_weeks.groupby('Practice_Week')['Score']
+    write_json(ranking(overall.mean(), overall.size(), "Practice_Week"),
+               data_dir / 'Practice_Week_Ranking_Corrected.json')
+    write_json({role: ranking(group.groupby('Practice_Week')['Score'].mean(),
+                              group['Practice_Week'].value_counts(), "Practice_Week")
+                for role, group in df_weeks.groupby('Role', observed=True, sort=False)},
+               data_dir / 'Extended_Practice_Week_Ranking_By_Role.json')
+
+
+def build_distributions(data_dir):
+    df = read_responses(data_dir / RESPONSES)[0]
+    df_numeric = numeric_responses(df)
+
+    write_json({
+        "Role_Distribution": df['Role'].astype(object).value_counts().to_dict(),
+        "Satisfaction_Distribution": {str(rating): count for rating, count in
+                                      df_numeric[SATISFACTION_COLUMN].value_counts().items()},
+    }, data_dir / 'Bar_Histogram_Visualization.json')
+    write_json(df_numeric[COMPARED_COLUMNS].describe().to_dict(),
+               data_dir / 'Box_Plot_Visualization.json')
+    write_json({
+        "Gender_Distribution": df['Gender'].astype(object).value_counts(normalize=True).to_dict(),
+        "Nationality_Distribution": df['Nationality'].astype(object).value_counts(normalize=True).to_dict(),
+    }, data_dir / 'Pie_Chart_Visualization.json')
+
+    for column, key, filename in [
+            ("How effective was the EHCB Members' Online Lectures? ",
+             'EHCB_Members_Online_Lectures', 'EHCB_Members_Online.json'),
+            ("How much knowledge did you gain from the EHCB Coaches Academy's  modules?",
+             'How_much_knowledge_did_you_gain_from_the_modules',
+             'How_much_knowledge_did_you_gain_from_the_modules.json')]:
+        values = df[column].astype(object).where(df[column].notna(), None)
+        write_json({key: values.tolist()}, data_dir / filename)
+
+
+def build_time_zones(data_dir):
+    df = read_responses(data_dir / RESPONSES)[0]
+    zones = df[TIMEZONE_COLUMN].map(normalize_time_zone)
+
+    def periods(column):
+        return df[column].str.split(',').explode().str.strip().dropna().value_counts().to_dict()
+
+    write_json({
+        "Time_Zone_Distribution": zones.value_counts().to_dict(),
+        "Weekday_Availability_Distribution": periods(WEEKDAY_TIMES_COLUMN),
+        "Weekend_Availability_Distribution": periods(WEEKEND_TIMES_COLUMN),
+        "Average_Satisfaction_By_Time_Zone": df[SCHEDULING_COLUMN].astype(float).groupby(
+            zones).mean().round(3).to_dict(),
+    }, data_dir / 'Time_Zone_Availability_Satisfaction_Analysis_v2.json')
+
+
+# Time zone labels and the words or offsets naming them, tried in order
+TIME_ZONE_KEYWORDS = [
+    (('iran', 'irst', '3:30', '+3.5'), 'GMT+3.5'),
+    (('china',), 'GMT+8'),
+    (('tokyo',), 'GMT+9'),
+    (('athens', 'cairo', 'eest', 'gmt+2', 'gmt +2', 'utc+02', '+2 cet', '(gmt+2)'), 'GMT+2'),
+    (('saudi', 'middle east', 'gmt+3', 'gmt +3', '+3 gmt'), 'GMT+3'),
+    (('georgia', 'gmt+4'), 'GMT+4'),
+    (('eastern standard', 'est', 'eastern', 'gmt-5', 'brasilia'), 'GMT-5'),
+    (('cet', 'central eu', 'central european', 'belgrad', 'belgrade', 'rome', 'brussels', 'skopje',
+      'zagreb', 'budapest', 'europe', 'eu', '+1', 'gmt+1', 'gt+1'), 'CET'),
+    (('london', 'bst', 'gambia', 'gmt'), 'GMT'),
+    (('utc',), 'UTC'),
+    (('+2',), 'GMT+2'),
+]
+
+
+def _keyword_pattern(keyword):
+    # Whole words only ('est' is not in "Budapest", '+1' not in "+10"); a
+    # keyword edge that is not a letter or digit needs no boundary
+    start = r'\b' if keyword[0].isalnum() else ''
+    end = r'\b' if keyword[-1].isalnum() else ''
+    return start + re.escape(keyword) + end
+
+
+_TIME_ZONE_PATTERNS = [(re.compile('|'.join(_keyword_pattern(keyword) for keyword in keywords)), zone)
+                       for keywords, zone in TIME_ZONE_KEYWORDS]
+
+
+def normalize_time_zone(text):
+    """Map a free-text time zone answer to a label such as 'CET' or 'GMT+3'."""
+    if not isinstance(text, str):
+        return None
+    text = text.lower()
+    for pattern, zone in _TIME_ZONE_PATTERNS:
+        if pattern.search(text):
+            return zone
+    return None
+
+
+def build_sentiment(data_dir):
+    df = read_responses(data_dir / RESPONSES)[0]
+    # Scores persisted by earlier builds (and the app) are reused, the rest
+    # are computed in a process pool
+    store = SentimentStore(data_dir / '.cache' / 'sentiment_store.json')
+    write_json(to_columns(sentiment_table(df, store=store)),
+               data_dir / 'Sentiment_Analysis.json', indent=None)
+
+
+def phrase_records(counter, n, **orders):
+    return [{"Phrase": phrase, "Count": count} for phrase, count in counter.most_common(n, **orders)]
+
+
+def build_phrases(data_dir):
+    # One streaming pass; the breakdowns are merges of its per-cell counters
+    counts = count_phrases(data_dir / RESPONSES)
+    total = counts.total()
+    write_json({
+        "Most_Common_Phrases": phrase_records(total, TOP_PHRASES, min_order=2),
+        "Most_Common_Words": phrase_records(total, TOP_PHRASES, max_order=1),
+        "Phrases_By_Question": {question.strip(): phrase_records(
+            counts.total(question=question), TOP_PHRASES_PER_GROUP, min_order=2)
+            for question in counts.questions},
+        "Phrases_By_Role": {role: phrase_records(
+            counts.total(role=role), TOP_PHRASES_PER_GROUP, min_order=2)
+            for role in counts.roles},
+        "Answers": counts.answers,
+        # Upper bound on the undercount of any phrase; 0 unless counters were pruned
+        "Count_Error": total.error,
+    }, data_dir / 'Phrase_Frequency_Summary.json')
+    invalidate_wordclouds(PHRASES_SOURCE, data_dir / '.cache' / 'wordclouds')
+
+
+# Column names and the parsing of Responses.json, used by most builders
+RESPONSE_MODULES = ['analysis.questions', 'analysis.responses']
+
+STAGES = [
+    Stage('correlations', [RESPONSES],
+          ['Heatmap_Correlation_Matrix.json', *matrix_files('Heatmap_Correlation_Matrix'),
+           'Strong_Correlations.json', 'Correlation_Insights.json'],
+          build_correlations, [*RESPONSE_MODULES, 'analysis.matrix_store']),
+    Stage('pca', [RESPONSES],
+          ['PCA_Analysis.json', *matrix_files('PCA_Loadings'), *matrix_files('PCA_Scores')],
+          build_pca, [*RESPONSE_MODULES, 'analysis.matrix_store']),
+    Stage('pca_ranking', [RESPONSES, 'PCA_Analysis.json'],
+          ['PCA_Components_Ranking_By_Role.json'], build_pca_ranking, RESPONSE_MODULES),
+    Stage('comparisons', [RESPONSES],
+          [CUBE_FILE, 'Comparative_Analysis-2.json', 'continent_component_analysis.json',
+           'Role_Comparative_Analysis.json', 'Age_Group_Comparative_Analysis.json',
+           'Continent_Comparative_Analysis.json'],
+          build_comparison_cube, [*RESPONSE_MODULES, 'analysis.cube', 'analysis.geography']),
+    Stage('rankings', [RESPONSES],
+          ['All_Sections_Ranking_By_Role.json', 'Lessons_Exams_Ranking_By_Role.json',
+           'Practice_Week_Ranking_Corrected.json', 'Extended_Practice_Week_Ranking_By_Role.json'],
+          build_rankings, RESPONSE_MODULES),
+    Stage('distributions', [RESPONSES],
+          ['Bar_Histogram_Visualization.json', 'Box_Plot_Visualization.json',
+           'Pie_Chart_Visualization.json', 'EHCB_Members_Online.json',
+           'How_much_knowledge_did_you_gain_from_the_modules.json'],
+          build_distributions, RESPONSE_MODULES),
+    Stage('time_zones', [RESPONSES],
+          ['Time_Zone_Availability_Satisfaction_Analysis_v2.json'], build_time_zones, RESPONSE_MODULES),
+    Stage('sentiment', [RESPONSES], ['Sentiment_Analysis.json'], build_sentiment,
+          [*RESPONSE_MODULES, 'analysis.sentiment', 'analysis.sentiment_store']),
+    Stage('phrases', [RESPONSES], ['Phrase_Frequency_Summary.json'], build_phrases,
+          ['analysis.questions', 'analysis.phrases', 'analysis.wordclouds']),
+]
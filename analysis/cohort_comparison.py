@@ -0,0 +1,96 @@
+"""Comparison of the cohorts (generations) of the academy.
+
+Every chart is drawn from the per-cohort rating aggregates of
+analysis.aggregates. Each cohort's aggregates are loaded and cached on their
+own, from that cohort's directory only: the raw responses of the cohorts are
+never concatenated, and another generation adds one small file to the view.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from analysis.aggregates import ALL, GROUP_KEYS, RATINGS, load_aggregates
+from analysis.figure_cache import cached_figure
+from analysis.paths import cohorts
+from analysis.questions import QUESTION_SECTIONS
+
+
+def pooled_stats(aggregates, questions, key=ALL, group=ALL):
+    """Answer count, mean rating and low-rating share over ``questions`` together."""
+    stats = aggregates['groups'].get(key, {}).get(group, {})
+    present = [stats[question] for question in questions if question in stats]
+    count = sum(question['count'] for question in present)
+    return {
+        'Answers': count,
+        'Mean Rating': sum(question['sum'] for question in present) / count if count else np.nan,
+        'Low Rating Share': sum(question['low'] for question in present) / count if count else np.nan,
+    }
+
+
+def cohort_overview(all_aggregates):
+    """Respondents and rating questions of every cohort."""
+    return pd.DataFrame([{'Cohort': name, 'Respondents': aggregates['rows'],
+                          'Rating Questions': len(aggregates['questions'])}
+                         for name, aggregates in all_aggregates.items()])
+
+
+def section_comparison(all_aggregates, key=ALL, group=ALL):
+    """One row per (cohort, questionnaire section) with its pooled rating stats."""
+    return pd.DataFrame([{'Cohort': name, 'Section': section,
+                          **pooled_stats(aggregates, questions, key, group)}
+                         for name, aggregates in all_aggregates.items()
+                         for section, questions in QUESTION_SECTIONS.items()])
+
+
+def question_comparison(all_aggregates, question, key=ALL, group=ALL):
+    """Share of each rating of ``question`` per cohort, in percent."""
+    records = []
+    for name, aggregates in all_aggregates.items():
+        stats = aggregates['groups'].get(key, {}).get(group, {}).get(question)
+        if not stats or not stats['count']:
+            continue
+        for rating, count in zip(RATINGS, stats['counts']):
+            records.append({'Cohort': name, 'Rating': str(rating),
+                            'Share (%)': 100 * count / stats['count']})
+    return pd.DataFrame(records, columns=['Cohort', 'Rating', 'Share (%)'])
+
+
+def cohort_comparison():
+    names = cohorts()
+    all_aggregates = {name: load_aggregates(name) for name in names}
+    if len(names) < 2:
+        st.info("Only one cohort has responses so far. Every generation added under "
+                "data/cohorts appears here next to the others.")
+
+    st.subheader('Cohorts')
+    st.dataframe(cohort_overview(all_aggregates), hide_index=True)
+
+    # 1. Respondent group the comparison is restricted to
+    key = st.selectbox('Compare respondents by', [ALL] + GROUP_KEYS, key='cohort_comparison_key')
+    group = ALL
+    if key != ALL:
+        groups = sorted({group for aggregates in all_aggregates.values()
+                         for group in aggregates['groups'].get(key, {})})
+        group = st.selectbox(key, groups, key='cohort_comparison_group')
+
+    # 2. Average rating per questionnaire section
+    st.subheader('Average Rating per Section')
+    df_sections = section_comparison(all_aggregates, key, group)
+    fig_sections = cached_figure('cohorts/sections', df_sections, lambda: px.bar(
+        df_sections, x='Section', y='Mean Rating', color='Cohort', barmode='group',
+        hover_data=['Answers', 'Low Rating Share'], range_y=[1, 5],
+        title='Average Rating per Section and Cohort'))
+    st.plotly_chart(fig_sections)
+
+    # 3. Rating distribution of one question
+    st.subheader('Ratings of a Question')
+    questions = list(dict.fromkeys(question for aggregates in all_aggregates.values()
+                                   for question in aggregates['questions']))
+    question = st.selectbox('Question', questions, key='cohort_comparison_question')
+    df_question = question_comparison(all_aggregates, question, key, group)
+    fig_question = cached_figure('cohorts/question', (question, df_question), lambda: px.bar(
+        df_question, x='Cohort', y='Share (%)', color='Rating', barmode='stack',
+        category_orders={'Rating': [str(rating) for rating in RATINGS]},
+        color_discrete_sequence=px.colors.diverging.RdYlGn, title=question))
+    st.plotly_chart(fig_question)
@@ -0,0 +1,99 @@
+"""Preloaded store of the answers to the open-ended questions.
+
+Every question's CSV is parsed once per version of the files, with blank and
+generic answers ("yes", "-", "N/A", ...) dropped at load time. Sections then
+page through plain lists of strings instead of re-reading and re-filtering
+the CSVs on every rerun.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from analysis.instrumentation import timed
+from analysis.paths import data_dir
+
+# Open-ended questions and the CSV of their answers (one answer per row, first column)
+COMMENT_FILES = {
+    "Application and Registration Process": "additional_comments_or_suggestions_about_Application_and_Registration_Process.csv",
+    "Lecture Modules, Exam, Grading, and Certification": "additional_comments_or_suggestions_about_Lecture_Modules_exams.csv",
+    "Networking": "additional_comments_or_suggestions_about_Networking.csv",
+    "Bonus Lectures": "additional_comments_or_suggestions_about_the_Bonus_Lectures.csv",
+    "Curriculum": "additional_comments_or_suggestions_about_the_Curriculum.csv",
+    "Operational and Technical Aspects": "additional_comments_or_suggestions_about_the_Operational_and_Technical_Aspects.csv",
+    "Practice Weeks": "additional_comments_or_suggestions_about_the_Practice_Weeks.csv",
+    "Schedule and Attendance": "additional_comments_or_suggestions_about_the_Schedule_and_Attandance.csv",
+    "General Suggestions": "additional_comments_or_suggestions.csv",
+    "Should Exams be Part of the Curriculum?": "should_exams_be_part_of_the_curriculum.csv",
+    "Criteria/Screening for New Participants": "screening_criteria.csv",
+    "What Helped You Decide to Sign Up?": "decision_to_sign.csv",
+    "Preferred Content from EHCB Members": "members_content.csv",
+    "Preferred Interactivity from Professors": "what-kind-of-interactivity.csv",
+    "Suggested Price for 5th Gen": "suggested-price.csv",
+    "Module/Lesson to Add to the Curriculum": "what-to-add-for-curriculum.csv"
+}
+
+# Answers that carry no feedback, compared after stripping and lower-casing
+GENERIC_RESPONSES = {'/', 'yes', 'no', '-', 'na', 'none', 'n/a', 'nothing'}
+
+
+def read_comments(filename):
+    """The non-blank, non-generic answers in the first column of a CSV."""
+    answers = pd.read_csv(filename).iloc[:, 0].dropna().astype(str)
+    stripped = answers.str.strip()
+    return stripped[(stripped != '') & ~stripped.str.lower().isin(GENERIC_RESPONSES)].tolist()
+
+
+class CommentStore:
+    """The filtered answers of every open-ended question, in file order."""
+
+    def __init__(self, directory=None, files=COMMENT_FILES):
+        directory = directory or data_dir()
+        self.comments = {}
+        # Questions whose CSV does not exist
+        self.missing = []
+        for question, filename in files.items():
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                self.comments[question] = read_comments(path)
+            else:
+                self.missing.append(question)
+
+    @property
+    def questions(self):
+        return list(self.comments)
+
+    def __len__(self):
+        return sum(len(comments) for comments in self.comments.values())
+
+    def count(self, question):
+        return len(self.comments.get(question, ()))
+
+    def page(self, question, number, size):
+        """Comments of page ``number`` (from 0) of ``question``, ``size`` per page."""
+        return self.comments.get(question, [])[number * size:(number + 1) * size]
+
+
+def comments_signature(directory=None, files=COMMENT_FILES):
+    """Size and modification time of every comment CSV, as a cache key."""
+    directory = directory or data_dir()
+    signature = []
+    for filename in files.values():
+        try:
+            stat = os.stat(os.path.join(directory, filename))
+            signature.append((filename, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append((filename, None, None))
+    return tuple(signature)
+
+
+@st.cache_resource(max_entries=4)
+def _load_comment_store(directory, signature):
+    return CommentStore(directory)
+
+
+@timed('load')
+def load_comment_store():
+    """The shared, read-only comment store of the current cohort's CSVs."""
+    directory = data_dir()
+    return _load_comment_store(str(directory), comments_signature(directory))
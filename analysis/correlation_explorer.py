@@ -0,0 +1,65 @@
+import streamlit as st
+
+from analysis.correlations import load_correlation_engine
+from analysis.questions import QUESTION_SECTIONS
+from analysis.sections import exporting
+
+# Defaults of the controls, which the exported report is shown with
+THRESHOLD = 0.7
+SECTION_THRESHOLD = 0.0
+PARTNERS = 10
+
+
+def pairs_table(pairs):
+    st.dataframe(pairs, hide_index=True, column_config={
+        "Correlation": st.column_config.NumberColumn(format="%.3f")})
+
+
+def exported_views(engine):
+    """Every view of the explorer, for every question and section, at the default settings."""
+    st.caption(f"Pairs with |r| ≥ {THRESHOLD:.2f}, every pair within each section and the "
+               f"{PARTNERS} strongest partners of each question. The dashboard lets you change "
+               "the minimum |r| and the number of partners.")
+    st.subheader("Pairs above a threshold")
+    pairs = engine.pairs_above(THRESHOLD)
+    st.write(f"{len(pairs)} pairs with |r| ≥ {THRESHOLD:.2f}")
+    pairs_table(pairs)
+
+    st.subheader("Pairs within a section")
+    for section in QUESTION_SECTIONS:
+        with st.expander(section):
+            pairs_table(engine.section_pairs(section, SECTION_THRESHOLD))
+
+    st.subheader("Strongest partners of a question")
+    for question in engine.questions:
+        with st.expander(question):
+            pairs_table(engine.top_partners(question, PARTNERS).drop(columns="Variable 1"))
+
+
+def correlation_explorer():
+    engine = load_correlation_engine()
+    st.markdown(f"Pearson correlations between the {len(engine.questions)} rating questions, "
+                f"computed from the {engine.rows} current responses. Each pair counts the "
+                "respondents who answered both questions.")
+    if exporting():
+        exported_views(engine)
+        return
+
+    query = st.radio("Find", ["Pairs above a threshold", "Strongest partners of a question",
+                              "Pairs within a section"], horizontal=True, key="correlations_query")
+
+    if query == "Pairs above a threshold":
+        threshold = st.slider("Minimum |r|", 0.0, 1.0, THRESHOLD, 0.05, key="correlations_threshold")
+        pairs = engine.pairs_above(threshold)
+        st.write(f"{len(pairs)} pairs with |r| ≥ {threshold:.2f}")
+    elif query == "Strongest partners of a question":
+        question = st.selectbox("Question", engine.questions, key="correlations_question")
+        k = st.number_input("Partners", 1, len(engine.questions) - 1, PARTNERS, key="correlations_k")
+        pairs = engine.top_partners(question, int(k)).drop(columns="Variable 1")
+    else:
+        section = st.selectbox("Section", list(QUESTION_SECTIONS), key="correlations_section")
+        threshold = st.slider("Minimum |r|", 0.0, 1.0, SECTION_THRESHOLD, 0.05,
+                              key="correlations_section_threshold")
+        pairs = engine.section_pairs(section, threshold)
+
+    pairs_table(pairs)
@@ -0,0 +1,104 @@
+"""Pairwise correlations of the rating questions, computed from the responses.
+
+``pairwise_correlations`` computes the Pearson correlation of every pair of
+columns in one pass of matrix products. Like ``DataFrame.corr()`` each pair
+uses the respondents who answered both questions, but the cost is a few
+BLAS calls instead of a Python loop over pairs. ``load_correlation_engine``
+keeps one engine per version of Responses.json, so the queries only filter
+the precomputed matrix.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.instrumentation import timed
+from analysis.questions import QUESTION_SECTIONS
+from analysis.responses import likert_columns, load_responses, responses_signature
+
+
+def pairwise_correlations(values):
+    """Pearson correlations and answer counts of the columns of a 2-D array.
+
+    Missing answers are NaN; every pair is computed over the rows where
+    both columns are present. Pairs with fewer than two such rows, or
+    without variance in them, are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    mask = present.astype(np.float64)
+    answered = mask.sum(axis=0)
+    means = np.divide(np.where(present, values, 0.0).sum(axis=0), answered,
+                      out=np.zeros(values.shape[1]), where=answered > 0)
+    # Centering first keeps the sums of squares small and the result exact
+    values = np.where(present, values - means, 0.0)
+
+    counts = mask.T @ mask
+    sums = values.T @ mask           # sums[i, j]: sum of column i where j is present
+    squares = (values * values).T @ mask
+    products = values.T @ values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = products - sums * sums.T / counts
+        variance = squares - sums * sums / counts
+        correlations = covariance / np.sqrt(variance * variance.T)
+    correlations[(counts < 2) | ~np.isfinite(correlations)] = np.nan
+    np.clip(correlations, -1.0, 1.0, out=correlations)
+    return correlations, counts.astype(np.int64)
+
+
+class CorrelationEngine:
+    """Threshold, top-k and section queries over a correlation matrix."""
+
+    def __init__(self, df):
+        self.questions = list(df.columns)
+        self._positions = {question: i for i, question in enumerate(self.questions)}
+        values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+        self.correlations, self.counts = pairwise_correlations(values)
+        self.rows = len(df)
+
+    def matrix(self):
+        return pd.DataFrame(self.correlations, index=self.questions, columns=self.questions)
+
+    def _pairs(self, first, second, threshold):
+        correlations = self.correlations[first, second]
+        keep = np.abs(correlations) >= threshold
+        first, second, correlations = first[keep], second[keep], correlations[keep]
+        order = np.argsort(-np.abs(correlations), kind='stable')
+        questions = np.asarray(self.questions, dtype=object)
+        return pd.DataFrame({
+            'Variable 1': questions[first[order]],
+            'Variable 2': questions[second[order]],
+            'Correlation': correlations[order],
+            'Respondents': self.counts[first[order], second[order]],
+        })
+
+    def pairs_above(self, threshold):
+        """Every pair of distinct questions with |r| >= threshold, strongest first."""
+        first, second = np.triu_indices(len(self.questions), k=1)
+        return self._pairs(first, second, threshold)
+
+    def top_partners(self, question, k=10):
+        """The k questions most strongly correlated (either sign) with ``question``."""
+        position = self._positions[question]
+        others = np.array([i for i in range(len(self.questions)) if i != position], dtype=np.intp)
+        pairs = self._pairs(np.full(len(others), position), others, 0.0)
+        return pairs.head(k)
+
+    def section_pairs(self, section, threshold=0.0):
+        """Pairs of questions both in ``section`` (a name from QUESTION_SECTIONS)."""
+        positions = [self._positions[question] for question in QUESTION_SECTIONS[section]
+                     if question in self._positions]
+        first, second = np.triu_indices(len(positions), k=1)
+        positions = np.asarray(positions, dtype=np.intp)
+        return self._pairs(positions[first], positions[second], threshold)
+
+
+@st.cache_resource(max_entries=2)
+def _load_correlation_engine(signature):
+    df = load_responses()
+    return CorrelationEngine(df[likert_columns(df)])
+
+
+@timed('load')
+def load_correlation_engine():
+    """The engine over the rating questions of the current Responses.json."""
+    return _load_correlation_engine(responses_signature())
@@ -0,0 +1,202 @@
+"""Pre-aggregated (grouping dimension x question) cube behind the comparisons.
+
+For every grouping of the respondents in DIMENSIONS and every numeric
+question, the cube stores per group the number of respondents in the group
+and the count, sum and sum of squares of the answers given. It is built in
+one read of Responses.json by ``build_cube`` and saved as
+Comparison_Cube.json; every comparative view is a slice or roll-up of these
+small arrays, which takes microseconds instead of a groupby over the rows.
+The saved cube is used only while it was built from the current
+Responses.json; after an ingest it is rebuilt from the responses in memory
+until build_artifacts.py saves a new one.
+
+The published comparisons average the answers with missing ones imputed by
+the question mean (see ``numeric_responses`` in analysis.artifacts). That is
+exact from the cube as well: a group's imputed mean is its sum plus the
+overall mean for each of its missing answers, divided by its size.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.geography import continent_of_answer, normalize_country
+from analysis.instrumentation import timed
+from analysis.paths import data_dir
+from analysis.responses import load_responses, responses_signature, tail_digest
+
+CUBE_FILE = 'Comparison_Cube.json'
+CUBE_VERSION = 1
+ALL = 'All'
+STATS = ['count', 'sum', 'sum_sq']
+
+
+def age_groups(birth_years):
+    # Without the where, older pandas turns a missing year into '<NA>s'
+    decades = (birth_years // 10 * 10).astype('Int64').astype(str) + 's'
+    return decades.where(birth_years.notna())
+
+
+def _mapped(function):
+    return lambda answers: answers.astype(object).map(function)
+
+
+# Grouping dimensions: name -> (column, function giving the group of every
+# answer, NaN for none)
+DIMENSIONS = {
+    'Role': ('Role', None),
+    'Gender': ('Gender', None),
+    'Nationality': ('Nationality', None),
+    'Nationality_Country': ('Nationality', _mapped(normalize_country)),
+    'Age_Group': ('Birth Year', age_groups),
+    'Residence_Continent': ('Residence', _mapped(continent_of_answer)),
+    'Nationality_Continent': ('Nationality', _mapped(continent_of_answer)),
+}
+
+
+def source_stamp(path):
+    """(size, tail digest) of the responses file a cube was built from."""
+    size = os.path.getsize(path)
+    return size, tail_digest(path, size)
+
+
+def build_cube(df, source=None):
+    """The cube of every numeric column of ``df`` over DIMENSIONS, as a dict.
+
+    ``source`` is the responses file ``df`` was read from, if any; the
+    cube records its ``source_stamp``.
+    """
+    values = df.select_dtypes('number').astype(float)
+    answered = values.notna()
+    filled = values.fillna(0.0)
+    squares = filled * filled
+
+    dimensions = {ALL: pd.Series(ALL, index=df.index)}
+    dimensions.update({name: function(df[column]) if function else df[column]
+                       for name, (column, function) in DIMENSIONS.items() if column in df.columns})
+    cube = {'version': CUBE_VERSION, 'rows': len(df), 'questions': list(values.columns), 'dimensions': {}}
+    if source is not None:
+        cube['source_bytes'], cube['source_digest'] = source_stamp(source)
+    for name, keys in dimensions.items():
+        keys = keys.astype(object)
+        counts, sums, sums_sq = (frame.groupby(keys).sum() for frame in (answered, filled, squares))
+        cube['dimensions'][name] = {
+            'groups': [str(group) for group in counts.index],
+            'size': keys.value_counts().reindex(counts.index).astype(int).tolist(),
+            'count': counts.astype(int).to_numpy().tolist(),
+            'sum': sums.to_numpy().tolist(),
+            'sum_sq': sums_sq.to_numpy().tolist(),
+        }
+    return cube
+
+
+class Cube:
+    """Read-only view of a cube dict with numpy arrays per dimension."""
+
+    def __init__(self, data):
+        self.rows = data['rows']
+        self.source = (data.get('source_bytes'), data.get('source_digest'))
+        self.questions = data['questions']
+        self._positions = {question: i for i, question in enumerate(self.questions)}
+        self.dimensions = {}
+        for name, dimension in data['dimensions'].items():
+            shape = (len(dimension['groups']), len(self.questions))
+            self.dimensions[name] = {
+                'groups': dimension['groups'],
+                'size': np.asarray(dimension['size'], dtype=np.float64),
+                **{stat: np.asarray(dimension[stat], dtype=np.float64).reshape(shape) for stat in STATS},
+            }
+        overall = self.dimensions[ALL]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Overall mean of every question, imputed for the missing answers
+            self._overall_mean = overall['sum'][0] / overall['count'][0]
+
+    def groups(self, dimension):
+        return list(self.dimensions[dimension]['groups'])
+
+    def _columns(self, questions):
+        if questions is None:
+            return list(self.questions), slice(None)
+        questions = [question for question in questions if question in self._positions]
+        return questions, [self._positions[question] for question in questions]
+
+    def stats(self, dimension, questions=None):
+        """{stat: groups x questions array}, plus the group sizes, of some questions."""
+        questions, columns = self._columns(questions)
+        cells = self.dimensions[dimension]
+        return questions, {'size': cells['size'], **{stat: cells[stat][:, columns] for stat in STATS}}
+
+    def mean(self, dimension, questions=None, impute=False):
+        """Mean answer per group (rows) and question (columns).
+
+        With ``impute`` every missing answer counts as the overall mean of
+        its question, as in the published comparisons.
+        """
+        questions, stats = self.stats(dimension, questions)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if impute:
+                size = stats['size'][:, None]
+                overall_mean = self._overall_mean[self._columns(questions)[1]]
+                means = (stats['sum'] + (size - stats['count']) * overall_mean) / size
+            else:
+                means = stats['sum'] / stats['count']
+        return pd.DataFrame(means, index=self.groups(dimension), columns=questions)
+
+    def variance(self, dimension, questions=None):
+        """Population variance of the given answers per group and question."""
+        questions, stats = self.stats(dimension, questions)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = stats['sum'] / stats['count']
+            variance = stats['sum_sq'] / stats['count'] - mean * mean
+        return pd.DataFrame(variance, index=self.groups(dimension), columns=questions)
+
+    def rollup(self, dimension, questions=None):
+        """Answers pooled over ``questions``: Count, Mean and Variance per group."""
+        _, stats = self.stats(dimension, questions)
+        count, total, total_sq = (stats[stat].sum(axis=1) for stat in STATS)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            variance = total_sq / count - mean * mean
+        return pd.DataFrame({'Count': count.astype(np.int64), 'Mean': mean, 'Variance': variance},
+                            index=self.groups(dimension))
+
+    def component_means(self, dimension, components):
+        """Per group, the average imputed answer of each {component: questions}.
+
+        Equals the mean over respondents of their average answer to the
+        component's questions.
+        """
+        return pd.DataFrame({component: self.mean(dimension, questions, impute=True).mean(axis=1)
+                             for component, questions in components.items()})
+
+
+def cube_signature(path):
+    stat = os.stat(path)
+    return str(path), stat.st_size, stat.st_mtime_ns
+
+
+@st.cache_resource(max_entries=4)
+def _load_cube(signature):
+    with open(signature[0], 'r') as f:
+        return Cube(json.load(f))
+
+
+@st.cache_resource(max_entries=4)
+def _load_current_cube(cube_signature, signature):
+    # The stored cube while it was built from this version of the responses;
+    # otherwise (e.g. after an ingest not rebuilt yet) the cube of the
+    # responses themselves, which the cubes of filtered respondents agree with
+    if cube_signature is not None:
+        cube = _load_cube(cube_signature)
+        if cube.source == source_stamp(signature[0]):
+            return cube
+    return Cube(build_cube(load_responses(), signature[0]))
+
+
+@timed('load')
+def load_cube():
+    """The shared comparison cube of the current cohort's responses."""
+    path = data_dir() / CUBE_FILE
+    return _load_current_cube(cube_signature(path) if path.exists() else None, responses_signature())
@@ -1,37 +1,21 @@
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from pathlib import Path
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from analysis.figure_cache import cached_figure
+from analysis.instrumentation import timed
+from analysis.paths import data_dir
+from analysis.filters import filter_caption, filtered_responses, selection
+from analysis.wordclouds import RESPONSES_SOURCE, show_wordcloud
 
 
+@timed('load')
 @st.cache_data
-def load_cleaned_data():
-    CLEANED_DATA_FILENAME = Path(
-        __file__).parent.parent / 'data' / 'Responses.json'
-    return pd.read_json(CLEANED_DATA_FILENAME, lines=True)
-
-
-@st.cache_data
-def load_country_data():
-    COUNTRY_DATA_FILENAME = Path(
-        __file__).parent.parent / 'data' / 'final_combined_country_data.json'
+def load_country_data(directory):
+    COUNTRY_DATA_FILENAME = directory / 'final_combined_country_data.json'
     return pd.read_json(COUNTRY_DATA_FILENAME)
 
 
-def demographics():
-    df_cleaned = load_cleaned_data()
-    country_data = load_country_data()
-
-    # Ensure missing values for "Played professional basketball?" are treated as "No"
-    df_cleaned['Played professional basketball?'] = df_cleaned['Played professional basketball?'].fillna(
-        "No")
-
-    # 1. Nationality Distribution
-    st.header('Nationality Distribution')
-    df_view = pd.DataFrame(country_data['nationality'].items(), columns=[
-                           'Country', 'Count'])
+def country_map_figure(df_view, title):
     fig = px.choropleth(
         df_view,
         locations="Country",
@@ -43,7 +27,7 @@ def demographics():
     )
     fig.update_geos(showcoastlines=True, coastlinecolor="Black")
     fig.update_layout(
-        title_text='Nationality Distribution by Country',
+        title_text=title,
         title_x=0.5,
         geo=dict(
             showframe=False,
@@ -53,6 +37,34 @@ def demographics():
             projection_type='equirectangular'
         ),
     )
+    return fig
+
+
+def count_bar_figure(df_view, x):
+    return px.bar(
+        df_view,
+        x=x,
+        y='Count',
+        color='Count',
+        color_continuous_scale=px.colors.sequential.YlGn,
+    )
+
+
+def demographics():
+    if not filter_caption():
+        return
+    # Work on a shallow copy: the shared responses DataFrame is read-only
+    df_cleaned = filtered_responses().copy(deep=False)
+    country_data = load_country_data(data_dir())
+
+    # 1. Nationality Distribution
+    st.header('Nationality Distribution')
+    if selection():
+        st.caption("The country maps count every respondent; the filters apply to the charts below them.")
+    df_view = pd.DataFrame(country_data['nationality'].items(), columns=[
+                           'Country', 'Count'])
+    fig = cached_figure('demographics/nationality', df_view, lambda: country_map_figure(
+        df_view, 'Nationality Distribution by Country'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -60,27 +72,8 @@ def demographics():
     st.header('Residence Distribution')
     df_view = pd.DataFrame(country_data['residence'].items(), columns=[
                            'Country', 'Count'])
-    fig = px.choropleth(
-        df_view,
-        locations="Country",
-        locationmode="country names",
-        color="Count",
-        hover_name="Country",
-        color_continuous_scale=px.colors.sequential.YlGn,
-        labels={'Count': 'Participant Count'},
-    )
-    fig.update_geos(showcoastlines=True, coastlinecolor="Black")
-    fig.update_layout(
-        title_text='Residence Distribution by Country',
-        title_x=0.5,
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            showland=True,
-            landcolor="lightgray",
-            projection_type='equirectangular'
-        ),
-    )
+    fig = cached_figure('demographics/residence', df_view, lambda: country_map_figure(
+        df_view, 'Residence Distribution by Country'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -88,27 +81,8 @@ def demographics():
     st.header('Federation Distribution')
     df_view = pd.DataFrame(country_data['related_federation'].items(), columns=[
                            'Country', 'Count'])
-    fig = px.choropleth(
-        df_view,
-        locations="Country",
-        locationmode="country names",
-        color="Count",
-        hover_name="Country",
-        color_continuous_scale=px.colors.sequential.YlGn,
-        labels={'Count': 'Participant Count'},
-    )
-    fig.update_geos(showcoastlines=True, coastlinecolor="Black")
-    fig.update_layout(
-        title_text='Federation Distribution by Country',
-        title_x=0.5,
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            showland=True,
-            landcolor="lightgray",
-            projection_type='equirectangular'
-        ),
-    )
+    fig = cached_figure('demographics/federation', df_view, lambda: country_map_figure(
+        df_view, 'Federation Distribution by Country'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -116,24 +90,16 @@ def demographics():
     st.header('Gender Distribution')
     df_view = df_cleaned['Gender'].value_counts().reset_index()
     df_view.columns = ['Gender', 'Count']
-    fig = px.bar(
-        df_view,
-        x='Gender',
-        y='Count',
-        color='Count',
-        color_continuous_scale=px.colors.sequential.YlGn,
-    )
+    fig = cached_figure('demographics/gender', df_view,
+                        lambda: count_bar_figure(df_view, 'Gender'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
     # 5. Years of Work Distribution
     st.header('Years of Work Distribution')
     if 'Coaching Since' in df_cleaned.columns:
-        # Attempt to convert the 'Coaching Since' column from Unix timestamps
-        df_cleaned['Coaching Since'] = pd.to_datetime(
-            df_cleaned['Coaching Since'], unit='ms', errors='coerce')
-
-        # Check if conversion was successful
+        # 'Coaching Since' is converted from Unix timestamps by the loader;
+        # check if conversion was successful
         if df_cleaned['Coaching Since'].isnull().all():
             st.error(
                 "Failed to convert any 'Coaching Since' values to dates. Please check the data format.")
@@ -162,13 +128,8 @@ def demographics():
             df_view = df_view.sort_values(by='Years of Work Range')
 
             # Create and display the bar chart
-            fig = px.bar(
-                df_view,
-                x='Years of Work Range',
-                y='Count',
-                color='Count',
-                color_continuous_scale=px.colors.sequential.YlGn,
-            )
+            fig = cached_figure('demographics/years-of-work', df_view,
+                                lambda: count_bar_figure(df_view, 'Years of Work Range'))
             st.plotly_chart(fig, use_container_width=True)
             st.dataframe(df_view)
 
@@ -182,13 +143,8 @@ def demographics():
             bins=10, sort=False).reset_index()
         df_view.columns = ['Age Range', 'Count']
         df_view['Age Range'] = df_view['Age Range'].astype(str)
-        fig = px.bar(
-            df_view,
-            x='Age Range',
-            y='Count',
-            color='Count',
-            color_continuous_scale=px.colors.sequential.YlGn,
-        )
+        fig = cached_figure('demographics/age', df_view,
+                            lambda: count_bar_figure(df_view, 'Age Range'))
         st.plotly_chart(fig, use_container_width=True)
         st.dataframe(df_view)
 
@@ -197,13 +153,8 @@ def demographics():
     df_view = df_cleaned['Played professional basketball?'].value_counts(
     ).reset_index()
     df_view.columns = ['Professional Experience', 'Count']
-    fig = px.bar(
-        df_view,
-        x='Professional Experience',
-        y='Count',
-        color='Count',
-        color_continuous_scale=px.colors.sequential.YlGn,
-    )
+    fig = cached_figure('demographics/professional-experience', df_view,
+                        lambda: count_bar_figure(df_view, 'Professional Experience'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -211,13 +162,8 @@ def demographics():
     st.header('Coaching For Distribution')
     df_view = df_cleaned['Coaching For'].value_counts().reset_index()
     df_view.columns = ['Coaching For', 'Count']
-    fig = px.bar(
-        df_view,
-        x='Coaching For',
-        y='Count',
-        color='Count',
-        color_continuous_scale=px.colors.sequential.YlGn,
-    )
+    fig = cached_figure('demographics/coaching-for', df_view,
+                        lambda: count_bar_figure(df_view, 'Coaching For'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -226,13 +172,8 @@ def demographics():
     df_view = df_cleaned['Role(s) Taken'].str.split(
         ',').explode().value_counts().reset_index()
     df_view.columns = ['Roles Taken', 'Count']
-    fig = px.bar(
-        df_view,
-        x='Roles Taken',
-        y='Count',
-        color='Count',
-        color_continuous_scale=px.colors.sequential.YlGn,
-    )
+    fig = cached_figure('demographics/roles-taken', df_view,
+                        lambda: count_bar_figure(df_view, 'Roles Taken'))
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(df_view)
 
@@ -240,9 +181,8 @@ def demographics():
     st.header('Word Cloud for Other Professions')
     df_view = df_cleaned['Other Profession(s)'].dropna()
     text = ' '.join(df_view.tolist())
-    wordcloud = WordCloud(width=800, height=400,
-                          background_color='white').generate(text)
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    st.pyplot(plt)
+    if text.strip():
+        show_wordcloud(RESPONSES_SOURCE, text=text, width=800,
+                       height=400, background_color='white')
+    else:
+        st.info('None of the selected respondents named another profession.')
@@ -0,0 +1,160 @@
+"""Process-wide cache of Plotly figures, keyed by chart and input data.
+
+Building a figure with plotly express costs tens of milliseconds, rebuilding
+it from its JSON about one. ``cached_figure`` stores the serialized figure
+under the chart's id plus a digest of the data it was built from, so an
+unchanged chart is rebuilt from JSON on every rerun and for every session.
+The least recently used figures are dropped once the cache holds more than
+MAX_CACHE_BYTES of JSON. A missing figure is built once while other sessions
+asking for it wait (see analysis.single_flight).
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from analysis.instrumentation import note_cache, stage
+from analysis.single_flight import single_flight
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        labels = list(value.columns) if isinstance(
+            value, pd.DataFrame) else value.name
+        digest.update(repr((type(value).__name__, value.shape, labels,
+                            list(value.index.names) if not isinstance(value, pd.Index) else None,
+                            str(value.dtypes) if isinstance(value, pd.DataFrame) else str(value.dtype))).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(
+                value, index=not isinstance(value, pd.Index)).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells such as lists: fall back to the JSON form
+            digest.update(value.to_series().to_json().encode() if isinstance(value, pd.Index)
+                          else value.to_json().encode())
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=repr):
+            _update_digest(digest, key)
+            _update_digest(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b']')
+    else:
+        digest.update(repr(value).encode())
+        digest.update(b';')
+
+
+def data_digest(data):
+    """Stable digest of the data (DataFrames, Series, containers, scalars) behind a chart."""
+    digest = hashlib.sha1()
+    _update_digest(digest, data)
+    return digest.hexdigest()
+
+
+def _figure_from_json(figure_json):
+    # The JSON came from a valid figure, so skip Plotly's validation
+    return go.Figure(json.loads(figure_json), _validate=False)
+
+
+class FigureCache:
+    """Size-bounded LRU of figure JSON with hit/miss counters."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (figure JSON, seconds the original build took)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def get_or_build(self, chart_id, data, build):
+        key = f'{chart_id}:{data_digest(data)}'
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            start = time.perf_counter()
+            fig = _figure_from_json(entry[0])
+            note_cache(hit=True)
+            with self._lock:
+                self.hits += 1
+                self.saved_seconds += max(0.0,
+                                          entry[1] - (time.perf_counter() - start))
+            return fig
+
+        note_cache(hit=False)
+        figure_json = single_flight(f'figure:{key}', self._build, key, build)
+        # Hand out the same form a hit would, so the chart's spec (and with it
+        # Streamlit's element id) does not change between the miss and later hits
+        return _figure_from_json(figure_json)
+
+    def _build(self, key, build):
+        # Another session may have built the figure while this one waited
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry[0]
+
+        start = time.perf_counter()
+        fig = build()
+        elapsed = time.perf_counter() - start
+        figure_json = fig.to_json()
+        with self._lock:
+            self.misses += 1
+            self.build_seconds += elapsed
+            if key not in self._entries:
+                self._entries[key] = (figure_json, elapsed)
+                self._bytes += len(figure_json)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted_json, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted_json)
+                self.evictions += 1
+        return figure_json
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'build_seconds': self.build_seconds,
+                'saved_seconds': self.saved_seconds,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+def cached_figure(chart_id, data, build):
+    """The figure ``build()`` returns for ``data``, reused while the data is unchanged.
+
+    ``chart_id`` names the chart and ``data`` must cover everything the
+    figure depends on. Every call returns a fresh figure the caller may
+    modify.
+    """
+    with stage('build', chart_id):
+        return get_figure_cache().get_or_build(chart_id, data, build)
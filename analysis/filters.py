@@ -0,0 +1,217 @@
+"""Respondent filters applied to every section at once, backed by a bitmap index.
+
+The BitmapIndex holds, for every value of every filter in FILTERS, a bitset
+over the rows of Responses.json (numpy packed bits). Multi-select answers
+such as "Youth, Senior" set the bit of each option they contain. It is built
+once per version of the responses from the shared DataFrame; a filter
+selection is then combined with a few bitwise ORs (values of one filter) and
+ANDs (across filters), without touching the rows again.
+
+Sections ask for the filtered responses, rating aggregates and comparison
+cube of the current selection. Each is computed once per mask, cached under
+the hash of its bits, and shared by every session selecting the same
+respondents. Without a selection the unfiltered, stored versions are used.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.aggregates import aggregate_frame, load_aggregates, load_likert_matrix
+from analysis.cube import Cube, age_groups, build_cube, load_cube
+from analysis.geography import continent_of_answer
+from analysis.instrumentation import timed
+from analysis.responses import load_responses, responses_signature
+
+
+def _continents(answers):
+    return answers.astype(object).map(continent_of_answer)
+
+
+def _options(answers):
+    # Multi-select answers: the options of every answer, as a list
+    return answers.astype(object).str.split(',').map(
+        lambda options: [option.strip() for option in options if option.strip()]
+        if isinstance(options, list) else [])
+
+
+# Sidebar filters: label -> (column, function giving every respondent's
+# value, or list of values for multi-select questions; None: the answer)
+FILTERS = {
+    'Role': ('Role', None),
+    'Gender': ('Gender', None),
+    'Continent': ('Residence', _continents),
+    'Coaching For': ('Coaching For', _options),
+    'Played Professionally': ('Played professional basketball?', _options),
+    'Age Band': ('Birth Year', age_groups),
+}
+FILTER_KEY_PREFIX = 'filter_'
+
+
+class BitmapIndex:
+    """Bitsets over the respondents of every value of the FILTERS."""
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.bitsets = {}
+        for name, (column, function) in FILTERS.items():
+            if column not in df.columns:
+                continue
+            answers = function(df[column]) if function else df[column].astype(object)
+            # Indexed by row position; one row per option of multi-select answers
+            answers = pd.Series(answers.to_numpy(), index=np.arange(self.rows))
+            if function is _options:
+                answers = answers.explode()
+            answers = answers.dropna().astype(str)
+            bitsets = {}
+            for value, rows in sorted(answers.groupby(answers).groups.items()):
+                bits = np.zeros(self.rows, dtype=bool)
+                bits[rows.to_numpy(dtype=np.intp)] = True
+                bitsets[value] = np.packbits(bits)
+            self.bitsets[name] = bitsets
+
+    def values(self, name):
+        return list(self.bitsets.get(name, ()))
+
+    def mask(self, selection):
+        """Packed bits of the respondents matching ``selection`` ({filter: values}).
+
+        A respondent matches a filter when it has any of its selected values,
+        and the selection when it matches every filter. None selects everyone.
+        """
+        mask = None
+        for name, values in selection.items():
+            if not values:
+                continue
+            bitsets = self.bitsets.get(name, {})
+            union = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+            for value in values:
+                if value in bitsets:
+                    union |= bitsets[value]
+            mask = union if mask is None else mask & union
+        return mask
+
+    def count(self, mask):
+        return self.rows if mask is None else int(np.unpackbits(mask, count=self.rows).sum())
+
+    def positions(self, mask):
+        """Row positions selected by ``mask``."""
+        if mask is None:
+            return np.arange(self.rows)
+        return np.flatnonzero(np.unpackbits(mask, count=self.rows))
+
+
+def mask_key(mask):
+    return None if mask is None else hashlib.sha1(mask.tobytes()).hexdigest()
+
+
+@st.cache_resource(max_entries=4)
+def _load_bitmap_index(signature):
+    return BitmapIndex(load_responses())
+
+
+@timed('load')
+def load_bitmap_index():
+    """The bitmap index of the current cohort's responses."""
+    return _load_bitmap_index(responses_signature())
+
+
+# 1. The selection of the current session
+def selection():
+    """{filter: values} chosen in the sidebar, without the empty filters."""
+    chosen = {name: tuple(st.session_state.get(FILTER_KEY_PREFIX + name) or ()) for name in FILTERS}
+    return {name: values for name, values in chosen.items() if values}
+
+
+def current_mask():
+    """(packed bits, hash) of the selected respondents; (None, None) without a filter."""
+    chosen = selection()
+    if not chosen:
+        return None, None
+    mask = load_bitmap_index().mask(chosen)
+    return mask, mask_key(mask)
+
+
+def filter_sidebar(container):
+    """Multiselects of the FILTERS, with the values found in the responses."""
+    index = load_bitmap_index()
+    for name in FILTERS:
+        options = index.values(name)
+        key = FILTER_KEY_PREFIX + name
+        # Values of another cohort are not options here
+        if any(value not in options for value in st.session_state.get(key, ())):
+            st.session_state[key] = [value for value in st.session_state[key] if value in options]
+        container.multiselect(name, options, key=key)
+    mask, _ = current_mask()
+    if mask is not None:
+        container.caption(f"{index.count(mask)} of {index.rows} respondents selected")
+
+
+def filter_caption():
+    """Note on the active filter at the top of a section.
+
+    Returns False, after a warning, when no respondent matches the filters.
+    """
+    chosen = selection()
+    if not chosen:
+        return True
+    mask, _ = current_mask()
+    count = load_bitmap_index().count(mask)
+    if not count:
+        st.warning("No respondent matches the selected filters.")
+        return False
+    st.caption(f"Filtered to {count} respondents: " + "; ".join(
+        f"{name} {', '.join(values)}" for name, values in chosen.items()))
+    return True
+
+
+# 2. Views of the selected respondents, cached per mask
+@st.cache_resource(max_entries=16)
+def _filtered_responses(signature, key, _mask):
+    return load_responses().iloc[load_bitmap_index().positions(_mask)]
+
+
+def filtered_responses():
+    """The shared, read-only responses of the selected respondents."""
+    mask, key = current_mask()
+    if mask is None:
+        return load_responses()
+    return _filtered_responses(responses_signature(), key, mask)
+
+
+def selected_rows():
+    """Row positions of the selected respondents, or None without a filter."""
+    mask, _ = current_mask()
+    return None if mask is None else load_bitmap_index().positions(mask)
+
+
+@st.cache_data(max_entries=16)
+def _filtered_aggregates(signature, key, _mask):
+    # The selected rows of the shared rating matrix, not a rescan of the answers
+    questions, matrix = load_likert_matrix()
+    rows = load_bitmap_index().positions(_mask)
+    return aggregate_frame(_filtered_responses(signature, key, _mask), questions, matrix[rows])
+
+
+@timed('load')
+def filtered_aggregates():
+    """Rating aggregates (see analysis.aggregates) of the selected respondents."""
+    mask, key = current_mask()
+    if mask is None:
+        return load_aggregates()
+    return _filtered_aggregates(responses_signature(), key, mask)
+
+
+@st.cache_resource(max_entries=16)
+def _filtered_cube(signature, key, _mask):
+    return Cube(build_cube(_filtered_responses(signature, key, _mask)))
+
+
+@timed('load')
+def filtered_cube():
+    """Comparison cube (see analysis.cube) of the selected respondents."""
+    mask, key = current_mask()
+    if mask is None:
+        return load_cube()
+    return _filtered_cube(responses_signature(), key, mask)
@@ -0,0 +1,101 @@
+import re
+
+# Word-start patterns recognising a country in the free-text Nationality and
+# Residence answers (demonyms, cities and common misspellings included)
+COUNTRY_PATTERNS = {
+    'Albania': r'alban',
+    'Argentina': r'argentin',
+    'Australia': r'australi|adelaide',
+    'Austria': r'austria',
+    'Bahrain': r'bahrain',
+    'Belarus': r'belarus',
+    'Belgium': r'belgi|diepenbeek|estinnes',
+    'Bosnia and Herzegovina': r'bosnia|bih\b|sarajevo',
+    'Brazil': r'brazil',
+    'Bulgaria': r'bulgar',
+    'Cameroon': r'cameroon|bamenda',
+    'Canada': r'canad',
+    'China': r'china',
+    'Croatia': r'croat|osijek',
+    'Cyprus': r'cyprus',
+    'Czech Republic': r'czech|cz\b|jindřichův',
+    'Denmark': r'denmark',
+    'Egypt': r'egypt',
+    'Finland': r'finland',
+    'France': r'french|france',
+    'Gambia': r'gambia',
+    'Georgia': r'georgia',
+    'Germany': r'german|munich',
+    'Greece': r'gree|athens|piraeus|thessaloniki|glyfada',
+    'Hungary': r'hungar',
+    'Iceland': r'iceland',
+    'Iran': r'iran',
+    'Ireland': r'irish|ireland',
+    'Israel': r'israel',
+    'Italy': r'ital|modena|siena|suzzara',
+    'Japan': r'japan',
+    'Kenya': r'kenya',
+    'Lebanon': r'leban',
+    'Lithuania': r'lithuan',
+    'Luxembourg': r'luxembourg',
+    'Malta': r'malta',
+    'Monaco': r'monaco',
+    'Montenegro': r'montenegr',
+    'Morocco': r'morocc|morroc',
+    'Netherlands': r'netherlands|dutch|rotterdam|zwolle|weert',
+    'North Macedonia': r'macedon|skopje',
+    'Norway': r'norw|oslo',
+    'Romania': r'romania|românia|oradea|gheorgheni',
+    'Russia': r'russia|rostov',
+    'Saudi Arabia': r'saudi',
+    'Serbia': r'serb|belgrade|nova pazova',
+    'Slovakia': r'slovakia',
+    'Slovenia': r'sloven|ljubljana|šentjur',
+    'Spain': r'spain|spanish|madrid|vitoria|soain',
+    'Sweden': r'swed',
+    'Switzerland': r'switzerland',
+    'Turkey': r'turk|istanbul',
+    'Uganda': r'uganda',
+    'Ukraine': r'ukrain',
+    'United Kingdom': r'british|united kingdom|london|uk\b',
+    'United States': r'usa\b|american|pennsylvania',
+    'Zimbabwe': r'zimbabwe',
+}
+
+CONTINENTS = {
+    'Africa': ['Cameroon', 'Egypt', 'Gambia', 'Kenya', 'Morocco', 'Uganda', 'Zimbabwe'],
+    'Asia': ['Bahrain', 'China', 'Iran', 'Japan', 'Lebanon', 'Saudi Arabia'],
+    'North America': ['Canada', 'United States'],
+    'Oceania': ['Australia'],
+    'South America': ['Argentina', 'Brazil'],
+}
+
+# Countries with a club in the EuroLeague, reported apart from the rest of Europe
+EUROLEAGUE_COUNTRIES = ['France', 'Germany', 'Greece', 'Israel', 'Italy',
+                        'Lithuania', 'Monaco', 'Serbia', 'Spain', 'Turkey']
+
+_COUNTRY_REGEX = {country: re.compile(r'\b(?:' + pattern + ')', re.IGNORECASE)
+                  for country, pattern in COUNTRY_PATTERNS.items()}
+_CONTINENT_OF = {country: continent for continent, countries in CONTINENTS.items()
+                 for country in countries}
+
+
+def normalize_country(text):
+    """Country named first in a free-text answer, or None if none is recognised."""
+    if not isinstance(text, str):
+        return None
+    matches = [(match.start(), country) for country, regex in _COUNTRY_REGEX.items()
+               for match in [regex.search(text)] if match]
+    return min(matches)[1] if matches else None
+
+
+def continent_of(country):
+    if country is None:
+        return None
+    if country in EUROLEAGUE_COUNTRIES:
+        return 'Europe - EuroLeague'
+    return _CONTINENT_OF.get(country, 'Europe - Non-EuroLeague')
+
+
+def continent_of_answer(text):
+    return continent_of(normalize_country(text))
@@ -0,0 +1,236 @@
+"""Per-chart timing and memory instrumentation of the report sections.
+
+While a section renders inside ``recording``, the loaders decorated with
+``timed('load')`` and the figure builders wrapped in ``stage('build', ...)``
+report their time, and every chart the section sends to the browser closes
+a record. A chart's record covers the time since the previous chart, split
+into:
+
+- load: reading data files and the shared responses (cache hits included)
+- build: building the figure or word cloud (figure cache lookups included)
+- send: from the end of the figure's build until Streamlit has serialized
+  the chart for the browser
+- compute: the rest, i.e. the pandas work preparing the chart's data (and
+  the serialization of charts without a build step such as ``st.bar_chart``)
+
+plus the bytes sent. With ``trace_memory`` the peak of Python allocations
+over the chart and over each stage is recorded too; tracemalloc slows the
+whole process down while it runs and its peaks include other sessions.
+
+Nothing is hooked when no recording is active: ``timed`` and ``stage`` cost
+one thread-local lookup.
+"""
+import contextlib
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+STAGES = ['load', 'compute', 'build', 'send']
+# Element types closing a chart record, and the headings used to name charts
+CHART_ELEMENTS = {'plotly_chart', 'vega_lite_chart', 'imgs', 'deck_gl_json_chart',
+                  'graphviz_chart', 'echarts_chart', 'dataframe', 'table'}
+HEADING_ELEMENTS = {'heading'}
+
+_local = threading.local()
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+def _chart_title(element):
+    """The title of a Plotly chart, from the spec it is sent as."""
+    layout = json.loads(element.plotly_chart.spec or '{}').get('layout', {})
+    title = layout.get('title')
+    return title.get('text') if isinstance(title, dict) else title
+
+
+class Recorder:
+    """Collects the chart records of one section render."""
+
+    def __init__(self, section, trace_memory=False):
+        self.section = section
+        self.trace_memory = trace_memory
+        self.started = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.records = []
+        self._heading = None
+        self._build_label = None
+        self._depth = 0
+        self._start_segment()
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory() if self.trace_memory else (0, 0)
+
+    def _fold_peak(self):
+        # tracemalloc keeps a single peak, which every stage resets
+        if self.trace_memory:
+            self._segment_peak = max(self._segment_peak, self._memory()[1] - self._segment_base)
+
+    def _start_segment(self):
+        self._segment_start = time.perf_counter()
+        self._seconds = dict.fromkeys(STAGES, 0.0)
+        self._peaks = dict.fromkeys(STAGES, 0)
+        self._last_stage = None
+        self._last_stage_end = None
+        self._cache = None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self._segment_base = self._memory()[0]
+            self._segment_peak = 0
+
+    @contextlib.contextmanager
+    def stage(self, name, label=None):
+        if self._depth:
+            # Already inside a stage (a loader calling a loader): counted there
+            yield
+            return
+        self._depth += 1
+        self._fold_peak()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        base = self._memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            end = time.perf_counter()
+            self._seconds[name] += end - start
+            if self.trace_memory:
+                self._peaks[name] = max(self._peaks[name], self._memory()[1] - base)
+                self._fold_peak()
+            self._last_stage, self._last_stage_end = name, end
+            if name == 'build':
+                self._build_label = label
+
+    def note_cache(self, hit):
+        self._cache = 'hit' if hit else 'miss'
+
+    def element_sent(self, msg):
+        """Called with every message the section sends; closes a chart record."""
+        if msg.WhichOneof('type') != 'delta' or msg.delta.WhichOneof('type') != 'new_element':
+            return
+        element = msg.delta.new_element
+        element_type = element.WhichOneof('type')
+        if element_type in HEADING_ELEMENTS:
+            self._heading = element.heading.body
+            return
+        if element_type in CHART_ELEMENTS:
+            self._close_segment(element_type, msg.ByteSize(),
+                                _chart_title(element) if element_type == 'plotly_chart' else None)
+
+    def finish(self):
+        """Record what ran after the last chart, e.g. text-only output."""
+        if time.perf_counter() - self._segment_start > 0.001 or self._last_stage is not None:
+            self._close_segment(None, 0, None)
+
+    def _close_segment(self, element_type, size, title):
+        now = time.perf_counter()
+        seconds = dict(self._seconds)
+        if self._last_stage == 'build':
+            seconds['send'] = now - self._last_stage_end
+        seconds['compute'] = max(0.0, (now - self._segment_start) - sum(
+            seconds[name] for name in STAGES if name != 'compute'))
+        self._fold_peak()
+
+        record = {
+            'run': self.started,
+            'section': self.section,
+            'chart': title or (self._build_label if self._last_stage == 'build' else None)
+            or self._heading or element_type or '(after the last chart)',
+            'element': element_type,
+            'seconds': round(now - self._segment_start, 6),
+            **{f'{name}_seconds': round(seconds[name], 6) for name in STAGES},
+            'bytes': size,
+            'figure_cache': self._cache,
+        }
+        if self.trace_memory:
+            record['peak_kb'] = round(self._segment_peak / 1024, 1)
+            record.update({f'{name}_peak_kb': round(self._peaks[name] / 1024, 1)
+                           for name in ['load', 'build']})
+        self.records.append(record)
+        self._build_label = None
+        self._start_segment()
+
+
+def active_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+@contextlib.contextmanager
+def recording(section, trace_memory=False):
+    """Record the charts of the section rendered inside the block.
+
+    Yields the Recorder, whose ``records`` hold one dict per chart.
+    """
+    if trace_memory:
+        _start_tracing()
+    recorder = Recorder(section, trace_memory)
+    ctx = get_script_run_ctx()
+    enqueue = ctx.enqueue if ctx is not None else None
+
+    def instrumented_enqueue(msg):
+        enqueue(msg)
+        recorder.element_sent(msg)
+
+    if ctx is not None:
+        # Only this session's context is hooked; other sessions are untouched
+        ctx.enqueue = instrumented_enqueue
+    _local.recorder = recorder
+    try:
+        yield recorder
+        recorder.finish()
+    finally:
+        _local.recorder = None
+        if ctx is not None:
+            del ctx.enqueue
+        if trace_memory:
+            _stop_tracing()
+
+
+def stage(name, label=None):
+    """Context manager timing a stage of the current chart, if recording."""
+    recorder = active_recorder()
+    return recorder.stage(name, label) if recorder is not None else contextlib.nullcontext()
+
+
+def note_cache(hit):
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.note_cache(hit)
+
+
+def timed(name):
+    """Decorator recording every call of the function as stage ``name``."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = active_recorder()
+            if recorder is None:
+                return function(*args, **kwargs)
+            with recorder.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def to_jsonl(records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
@@ -0,0 +1,121 @@
+"""Dense labelled matrices stored as float32 arrays with a JSON label index.
+
+A matrix named ``name`` is kept as two files next to each other:
+
+- ``name.npy``: the values, a row-major float32 array in NumPy's .npy format
+- ``name.labels.json``: the row and column labels, plus free-form ``attrs``
+
+The array is opened memory-mapped, so opening a matrix reads only the label
+index and ``block`` reads only the pages holding the requested rows. Rows
+and columns are addressed by label (the question text) or by their integer
+position in the label index, the question ID.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+MATRIX_VERSION = 1
+
+
+def matrix_paths(name):
+    name = Path(name)
+    return name.with_name(f'{name.name}.npy'), name.with_name(f'{name.name}.labels.json')
+
+
+def _replace(path, write):
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def write_matrix(df, name, row_labels=True, attrs=None):
+    """Store a numeric DataFrame as ``name.npy`` plus ``name.labels.json``.
+
+    With ``row_labels=False`` the rows are only addressed by position, e.g.
+    for per-respondent scores whose index carries no meaning.
+    """
+    values_path, labels_path = matrix_paths(name)
+    values = np.ascontiguousarray(df.to_numpy(dtype=np.float32))
+    labels = {
+        'version': MATRIX_VERSION,
+        'shape': list(values.shape),
+        'rows': [str(label) for label in df.index] if row_labels else None,
+        'columns': [str(label) for label in df.columns],
+        'attrs': attrs or {},
+    }
+    _replace(values_path, lambda f: np.save(f, values, allow_pickle=False))
+    _replace(labels_path, lambda f: f.write(json.dumps(labels, indent=4).encode('utf-8')))
+
+
+class LabeledMatrix:
+    """Read-only view of a stored matrix; values stay on disk until read."""
+
+    def __init__(self, name):
+        values_path, labels_path = matrix_paths(name)
+        with open(labels_path, 'r') as f:
+            labels = json.load(f)
+        if labels.get('version') != MATRIX_VERSION:
+            raise ValueError(f'{labels_path}: unsupported matrix version {labels.get("version")}')
+        self.values = np.load(values_path, mmap_mode='r', allow_pickle=False)
+        if list(self.values.shape) != labels['shape']:
+            raise ValueError(f'{values_path}: shape {self.values.shape} does not match its labels')
+        self.rows = labels['rows']
+        self.columns = labels['columns']
+        self.attrs = labels['attrs']
+        self._row_ids = {label: i for i, label in enumerate(self.rows or [])}
+        self._column_ids = {label: i for i, label in enumerate(self.columns)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _positions(self, keys, ids, size):
+        if keys is None:
+            return None
+        if isinstance(keys, (str, int, np.integer)):
+            keys = [keys]
+        positions = []
+        for key in keys:
+            if isinstance(key, (int, np.integer)):
+                if not -size <= key < size:
+                    raise KeyError(key)
+                positions.append(int(key) % size)
+            else:
+                positions.append(ids[key])
+        return np.asarray(positions, dtype=np.intp)
+
+    def block(self, rows=None, columns=None):
+        """DataFrame of the given rows and columns (labels or IDs; None for all)."""
+        row_positions = self._positions(rows, self._row_ids, self.shape[0])
+        column_positions = self._positions(columns, self._column_ids, self.shape[1])
+        values = self.values
+        if row_positions is not None:
+            values = values[row_positions]
+        if column_positions is not None:
+            values = values[:, column_positions]
+        row_labels = self.rows if self.rows is not None else range(self.shape[0])
+        index = row_labels if row_positions is None else [row_labels[i] for i in row_positions]
+        columns = self.columns if column_positions is None else [self.columns[i] for i in column_positions]
+        return pd.DataFrame(np.array(values), index=index, columns=columns)
+
+    def to_frame(self):
+        return self.block()
+
+
+def matrix_signature(name):
+    return tuple((os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in matrix_paths(name))
+
+
+@st.cache_resource(max_entries=16)
+def _open_matrix(name, signature):
+    return LabeledMatrix(name)
+
+
+def open_matrix(name):
+    """The shared LabeledMatrix stored under ``name``, reopened when its files change."""
+    return _open_matrix(str(name), matrix_signature(name))
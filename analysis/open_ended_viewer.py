@@ -1,51 +1,110 @@
-import streamlit as st
+import time
+
+import numpy as np
 import pandas as pd
-import os
+import streamlit as st
+from analysis.comments import COMMENT_FILES, load_comment_store
+from analysis.responses import load_responses
+from analysis.search import RESPONDENT_ATTRIBUTES, load_search_index, snippet
+from analysis.sections import exporting
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+def comment_list(comments):
+    # One markdown element per page; continuation lines stay inside their bullet
+    return "\n".join("- " + comment.replace("\n", "\n  ") for comment in comments)
+
+
+def page_number(count, page_size, key):
+    pages = -(-count // page_size)
+    if pages < 2:
+        return 1
+    # The page size is part of the key so that a smaller page count never
+    # meets a stored page number past its end
+    return int(st.number_input(f"Page (of {pages})", 1, pages, 1, key=f"{key}_{page_size}"))
+
+
+def show_question(store, position, question, page_size):
+    count = store.count(question)
+    if not count:
+        st.write("No detailed responses available for this question.")
+        return
+    if page_size is None:
+        st.caption(f"All {count} responses")
+        st.markdown(comment_list(store.page(question, 0, count)))
+        return
+    page = page_number(count, page_size, f"comments_page_{position}")
+    first = (page - 1) * page_size
+    st.caption(f"Responses {first + 1}–{min(first + page_size, count)} of {count}")
+    st.markdown(comment_list(store.page(question, page - 1, page_size)))
+
+
+def respondent_rows(filters):
+    """Rows of Responses.json matching every attribute filter, or None if there are none."""
+    filters = {attribute: values for attribute, values in filters.items() if values}
+    if not filters:
+        return None
+    df = load_responses()
+    matches = np.ones(len(df), dtype=bool)
+    for attribute, values in filters.items():
+        matches &= df[attribute].isin(values).to_numpy()
+    return np.flatnonzero(matches).tolist()
+
+
+def search_results(query, page_size):
+    index = load_search_index()
+    df = load_responses()
+    with st.expander("Filters"):
+        questions = st.multiselect("Questions", list(COMMENT_FILES), key="comments_search_questions")
+        filters = {attribute: st.multiselect(attribute, sorted(df[attribute].dropna().unique()),
+                                             key=f"comments_search_{attribute.lower()}")
+                   for attribute in RESPONDENT_ATTRIBUTES}
+    respondents = respondent_rows(filters)
+
+    start = time.perf_counter()
+    results = index.search(query, questions=questions or None, respondents=respondents)
+    elapsed = time.perf_counter() - start
+    st.caption(f"{len(results)} of {len(index)} responses match ({elapsed * 1000:.1f} ms)"
+               + ("; filtering by respondent leaves out answers not linked to one"
+                  if respondents is not None else ""))
+    if results.empty:
+        return
+
+    page = page_number(len(results), page_size, "comments_search_page")
+    lines = []
+    for result in results.iloc[(page - 1) * page_size:page * page_size].itertuples():
+        source = result.Question
+        if pd.notna(result.Respondent) and result.Respondent < len(df):
+            details = df.iloc[int(result.Respondent)]
+            source += "; " + ", ".join(str(details[attribute]) for attribute in RESPONDENT_ATTRIBUTES
+                                       if pd.notna(details[attribute]))
+        lines.append(f"{snippet(result.Text, query)} *({source})*")
+    st.markdown(comment_list(lines))
 
 
 def open_ended_viewer():
     st.header("Open-Ended Feedback Viewer")
+    # The exported report lists every response, unpaged and without search
+    page_size, query = None, ""
+    if not exporting():
+        page_size = st.selectbox("Responses per page", PAGE_SIZES, index=1, key="comments_page_size")
+        query = st.text_input("Search responses", key="comments_search",
+                              placeholder="e.g. WhatsApp, exam, time zone")
+    if query.strip():
+        search_results(query, page_size)
+        return
+
+    store = load_comment_store()
+    st.caption(f"{len(store)} responses to {len(store.questions)} questions; "
+               "generic answers such as \"yes\" or \"-\" are left out.")
 
-    # Dictionary mapping questions to their respective CSV files
-    questions = {
-        "Application and Registration Process": "additional_comments_or_suggestions_about_Application_and_Registration_Process.csv",
-        "Lecture Modules, Exam, Grading, and Certification": "additional_comments_or_suggestions_about_Lecture_Modules_exams.csv",
-        "Networking": "additional_comments_or_suggestions_about_Networking.csv",
-        "Bonus Lectures": "additional_comments_or_suggestions_about_the_Bonus_Lectures.csv",
-        "Curriculum": "additional_comments_or_suggestions_about_the_Curriculum.csv",
-        "Operational and Technical Aspects": "additional_comments_or_suggestions_about_the_Operational_and_Technical_Aspects.csv",
-        "Practice Weeks": "additional_comments_or_suggestions_about_the_Practice_Weeks.csv",
-        "Schedule and Attendance": "additional_comments_or_suggestions_about_the_Schedule_and_Attandance.csv",
-        "General Suggestions": "additional_comments_or_suggestions.csv",
-        "Should Exams be Part of the Curriculum?": "should_exams_be_part_of_the_curriculum.csv",
-        "Criteria/Screening for New Participants": "screening_criteria.csv",
-        "What Helped You Decide to Sign Up?": "decision_to_sign.csv",
-        "Preferred Content from EHCB Members": "members_content.csv",
-        "Preferred Interactivity from Professors": "what-kind-of-interactivity.csv",
-        "Suggested Price for 5th Gen": "suggested-price.csv",
-        "Module/Lesson to Add to the Curriculum": "what-to-add-for-curriculum.csv"
-    }
-
-    # Select question
-    # question = st.selectbox("Select a question", list(questions.keys()))
-
-    # Load the selected CSV file
-    for question in questions:
-        file_path = os.path.join('data', questions[question])
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-
-            # Filter out generic responses
-            generic_responses = ['/', 'yes', 'no', '-',
-                                 'na', 'none', 'N/A', 'Nothing', 'nothing']
-            df = df[~df.iloc[:, 0].str.strip(
-            ).str.lower().isin(generic_responses)]
-
-            if not df.empty:
-                st.markdown(f"### Responses for {question}")
-                for index, row in df.iterrows():
-                    st.markdown(f"- {row[0]}")
-            else:
-                st.write("No detailed responses available for this question.")
-        else:
+    # Only one page of every question is sent, so the page stays the same
+    # size however many responses there are (all of them in the report)
+    for position, question in enumerate(COMMENT_FILES):
+        if question in store.missing:
+            st.markdown(f"### Responses for {question}")
             st.write("File not found.")
+            continue
+        with st.expander(f"Responses for {question} ({store.count(question)})"):
+            show_question(store, position, question, page_size)
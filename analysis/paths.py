@@ -0,0 +1,80 @@
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Location of the survey data and of the runtime caches derived from it. The
+# bundled data/ directory unless EHCB_DATA_DIR points elsewhere (e.g. for the
+# benchmarks' synthetic datasets).
+DATA_DIR = Path(os.environ.get('EHCB_DATA_DIR') or Path(__file__).parent.parent / 'data')
+
+# Every cohort (generation of the academy) is a directory of its own with its
+# Responses.json, the files derived from it and a .cache of runtime caches, so
+# loading one cohort never reads another's files.
+COHORTS_DIR = DATA_DIR / 'cohorts'
+RESPONSES_FILE = 'Responses.json'
+
+logger = logging.getLogger(__name__)
+
+_current = threading.local()
+
+
+def _cohort_order(name):
+    # "4th-gen" before "10th-gen"
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def cohorts():
+    """Names of the cohorts holding a Responses.json, oldest first."""
+    if not COHORTS_DIR.is_dir():
+        return []
+    return sorted((path.name for path in COHORTS_DIR.iterdir()
+                   if (path / RESPONSES_FILE).is_file()), key=_cohort_order)
+
+
+def default_cohort():
+    """EHCB_COHORT if it names a cohort, otherwise the latest cohort."""
+    names = cohorts()
+    name = os.environ.get('EHCB_COHORT')
+    if name and name not in names:
+        logger.warning("EHCB_COHORT is '%s', which is not a cohort in %s; using the latest one",
+                       name, COHORTS_DIR)
+        name = None
+    return name or (names[-1] if names else None)
+
+
+def current_cohort():
+    """The cohort chosen with ``using_cohort`` in this thread, or the default one."""
+    return getattr(_current, 'name', None) or default_cohort()
+
+
+@contextmanager
+def using_cohort(name):
+    """Resolve data_dir() to the directory of cohort ``name`` in this thread.
+
+    Every Streamlit session runs its script in a thread of its own, so
+    sessions looking at different cohorts do not interfere.
+    """
+    if name not in cohorts():
+        raise ValueError(f"Unknown cohort '{name}' (expected one of {', '.join(cohorts())})")
+    previous = getattr(_current, 'name', None)
+    _current.name = name
+    try:
+        yield COHORTS_DIR / name
+    finally:
+        _current.name = previous
+
+
+def data_dir(cohort=None):
+    """Directory of ``cohort`` (default: the current one)."""
+    cohort = cohort or current_cohort()
+    if cohort is None:
+        raise FileNotFoundError(f'No cohort with a {RESPONSES_FILE} in {COHORTS_DIR}')
+    return COHORTS_DIR / cohort
+
+
+def cache_dir(cohort=None):
+    """Runtime caches derived from the files of ``cohort``."""
+    return data_dir(cohort) / '.cache'
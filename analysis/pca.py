@@ -0,0 +1,171 @@
+"""Principal component analysis of the rating questions, computed in the app.
+
+Missing answers are imputed with the question mean and every question is
+standardized, as in the pca pipeline stage. Three solvers give the same
+components up to numerical precision:
+
+- ``exact``: a full SVD of the standardized answers
+- ``randomized``: a randomized range finder with power iterations (Halko et
+  al.), for many questions when only a few components are wanted
+- ``incremental``: two passes over row batches that only ever hold one
+  batch and the questions x questions covariance, for cohorts too large to
+  standardize in memory at once (and the fastest for many more respondents
+  than questions)
+
+``solver='auto'`` picks one from the matrix shape. Signs are fixed so that
+the largest loading of every component is positive, which makes reruns and
+the different solvers agree.
+"""
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.instrumentation import timed
+from analysis.responses import likert_columns, load_responses, responses_signature
+
+PCAResult = namedtuple('PCAResult', ['scores', 'loadings', 'explained_variance', 'solver'])
+
+# Standardized answers above this size are processed in row batches
+MAX_DENSE_BYTES = 256 * 1024 * 1024
+BATCH_ROWS = 50_000
+# Randomized SVD once there are this many questions and few components wanted
+RANDOMIZED_MIN_COLUMNS = 150
+
+
+def _as_float(df):
+    return df.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def column_moments(batches):
+    """Mean and population standard deviation of every column, in one pass.
+
+    Means ignore missing values; the deviation is that of the mean-imputed
+    column, i.e. it counts imputed answers as zero deviations.
+    """
+    count = total = squares = None
+    rows = 0
+    for batch in batches:
+        present = ~np.isnan(batch)
+        values = np.where(present, batch, 0.0)
+        if count is None:
+            count, total, squares = (np.zeros(batch.shape[1]) for _ in range(3))
+        count += present.sum(axis=0)
+        total += values.sum(axis=0)
+        squares += (values * values).sum(axis=0)
+        rows += len(batch)
+    mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    # Sum of squared deviations of the answered values, spread over all rows
+    std = np.sqrt(np.maximum(squares - count * mean * mean, 0.0) / max(rows, 1))
+    return mean, std, rows
+
+
+def standardize(batch, mean, std):
+    """Mean-impute and standardize a batch; constant columns become 0."""
+    batch = np.where(np.isnan(batch), mean, batch) - mean
+    return np.divide(batch, std, out=np.zeros_like(batch), where=std > 0)
+
+
+def _fix_signs(components):
+    signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    signs[signs == 0] = 1
+    return components * signs[:, None]
+
+
+def exact_components(standardized, k):
+    _, singular_values, components = np.linalg.svd(standardized, full_matrices=False)
+    return singular_values[:k] ** 2 / len(standardized), components[:k]
+
+
+def randomized_components(standardized, k, oversamples=10, iterations=7, seed=0):
+    rng = np.random.default_rng(seed)
+    sketch = standardized @ rng.normal(size=(standardized.shape[1], min(k + oversamples, standardized.shape[1])))
+    basis = np.linalg.qr(sketch)[0]
+    for _ in range(iterations):
+        # Power iterations, re-orthonormalized for stability
+        basis = np.linalg.qr(standardized.T @ basis)[0]
+        basis = np.linalg.qr(standardized @ basis)[0]
+    _, singular_values, components = np.linalg.svd(basis.T @ standardized, full_matrices=False)
+    return singular_values[:k] ** 2 / len(standardized), components[:k]
+
+
+def incremental_components(batches, mean, std, rows, k):
+    covariance = np.zeros((len(mean), len(mean)))
+    for batch in batches():
+        standardized = standardize(batch, mean, std)
+        covariance += standardized.T @ standardized
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance / rows)
+    order = np.argsort(eigenvalues)[::-1][:k]
+    return np.maximum(eigenvalues[order], 0.0), eigenvectors[:, order].T
+
+
+def frame_batches(df, rows=BATCH_ROWS):
+    """Callable yielding the DataFrame as float arrays of ``rows`` rows."""
+    def batches():
+        for start in range(0, len(df), rows):
+            yield _as_float(df.iloc[start:start + rows])
+    return batches
+
+
+def choose_solver(rows, columns, k):
+    # See benchmarks/bench_pca.py: the covariance pass wins on tall
+    # matrices, the randomized SVD on wide ones
+    if rows * columns * 8 > MAX_DENSE_BYTES or rows >= 4 * columns:
+        return 'incremental'
+    if columns >= RANDOMIZED_MIN_COLUMNS and k < columns // 4:
+        return 'randomized'
+    return 'exact'
+
+
+def compute_pca(df, k=5, solver='auto', batch_rows=BATCH_ROWS):
+    """PCA of the numeric columns of ``df`` (rows are respondents)."""
+    batches = frame_batches(df, batch_rows)
+    mean, std, rows = column_moments(batches())
+    k = min(k, len(df.columns), max(rows, 1))
+    if solver == 'auto':
+        solver = choose_solver(rows, len(df.columns), k)
+
+    if solver == 'incremental':
+        variances, components = incremental_components(batches, mean, std, rows, k)
+    else:
+        standardized = standardize(_as_float(df), mean, std)
+        solve = randomized_components if solver == 'randomized' else exact_components
+        variances, components = solve(standardized, k)
+    components = _fix_signs(components)
+
+    # Every non-constant standardized column has unit variance
+    total_variance = float((std > 0).sum()) or 1.0
+    names = [f'PC{i + 1}' for i in range(len(components))]
+    scores = np.concatenate([standardize(batch, mean, std) @ components.T for batch in batches()]) \
+        if rows else np.zeros((0, len(names)))
+    return PCAResult(
+        scores=pd.DataFrame(scores, index=df.index, columns=names),
+        loadings=pd.DataFrame(components.T, index=df.columns, columns=names),
+        explained_variance=pd.Series(variances / total_variance, index=names),
+        solver=solver,
+    )
+
+
+@st.cache_data(max_entries=16)
+def _load_pca(signature, role, items, k, key, _rows):
+    df = load_responses()
+    if _rows is not None:
+        df = df.iloc[_rows]
+    if role is not None:
+        df = df[df['Role'] == role]
+    return compute_pca(df[list(items)], k)
+
+
+@timed('load')
+def load_pca(role=None, items=None, k=5, rows=None):
+    """PCA of the current responses, cached per role filter, item set, k and rows.
+
+    ``items`` defaults to every rating question, ``rows`` (row positions,
+    e.g. of the sidebar filters) to every respondent.
+    """
+    if items is None:
+        items = likert_columns(load_responses())
+    key = None if rows is None else hashlib.sha1(np.asarray(rows, dtype=np.int64).tobytes()).hexdigest()
+    return _load_pca(responses_signature(), role, tuple(items), k, key, rows)
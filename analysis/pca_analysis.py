@@ -1,23 +1,179 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import plotly.express as px
+import plotly.graph_objects as go
 import json
 import numpy as np
-from pathlib import Path
+from analysis.figure_cache import cached_figure
+from analysis.filters import filter_caption, selected_rows
+from analysis.instrumentation import timed
+from analysis.matrix_store import open_matrix
+from analysis.paths import data_dir
+from analysis.pca import load_pca
+from analysis.questions import QUESTION_SECTIONS
+from analysis.responses import likert_columns, load_responses
+from analysis.sections import exporting
 
-@st.cache_data
+OTHER_QUESTIONS = "Other rating questions"
+# Above this many respondents the biplot shows one point per occupied grid cell
+MAX_BIPLOT_POINTS = 20_000
+BIPLOT_GRID = 150
+BIPLOT_ARROWS = 5
+
+@timed('load')
 def load_pca_data():
-    DATA_FILENAME = Path(__file__).resolve().parent.parent / 'data' / 'PCA_Analysis.json'
-    with open(DATA_FILENAME, 'r') as f:
-        return json.load(f)
+    # Memory-mapped per-respondent scores and per-question loadings; the
+    # explained variance is stored with the loadings
+    directory = data_dir()
+    return open_matrix(directory / 'PCA_Scores'), open_matrix(directory / 'PCA_Loadings')
 
+@timed('load')
 @st.cache_data
-def load_component_ranking_data():
-    DATA_FILENAME = Path(__file__).resolve().parent.parent / 'data' / 'PCA_Components_Ranking_By_Role.json'
+def load_component_ranking_data(directory):
+    DATA_FILENAME = directory / 'PCA_Components_Ranking_By_Role.json'
     with open(DATA_FILENAME, 'r') as f:
         return json.load(f)
 
+def select_items(groups):
+    """Rating questions of the chosen QUESTION_SECTIONS (and OTHER_QUESTIONS)."""
+    grouped = {question for questions in QUESTION_SECTIONS.values() for question in questions}
+    chosen = {question for group in groups if group in QUESTION_SECTIONS
+              for question in QUESTION_SECTIONS[group]}
+    return [question for question in likert_columns(load_responses())
+            if question in chosen or (OTHER_QUESTIONS in groups and question not in grouped)]
+
+
+def decimate_scores(scores, max_points=MAX_BIPLOT_POINTS, grid=BIPLOT_GRID):
+    """PC1/PC2 scores reduced to at most ``max_points`` rows for plotting.
+
+    Small sets are returned whole. Larger ones are binned on a ``grid`` x
+    ``grid`` lattice over their extent and the first respondent of every
+    occupied cell is kept, so outliers and the shape of the cloud survive
+    while dense regions collapse. ``Respondents`` counts the rows a point
+    stands for.
+    """
+    x = np.asarray(scores['PC1'], dtype=np.float64)
+    y = np.asarray(scores['PC2'], dtype=np.float64)
+    if len(x) <= max_points:
+        return pd.DataFrame({'PC1': x, 'PC2': y, 'Respondents': np.ones(len(x), dtype=np.int64)})
+
+    def cells(values):
+        low, high = values.min(), values.max()
+        scale = (grid - 1) / (high - low) if high > low else 0.0
+        return ((values - low) * scale).astype(np.int64)
+
+    _, first, counts = np.unique(cells(x) * grid + cells(y), return_index=True, return_counts=True)
+    return pd.DataFrame({'PC1': x[first], 'PC2': y[first], 'Respondents': counts})
+
+
+def scree_figure(explained_variance):
+    explained_variance = pd.Series(explained_variance, dtype=np.float64)
+    fig = go.Figure([
+        go.Bar(x=explained_variance.index, y=explained_variance.values, name='Component',
+               hovertemplate='%{x}: %{y:.1%} of the variance<extra></extra>'),
+        go.Scatter(x=explained_variance.index, y=explained_variance.cumsum().values,
+                   mode='lines+markers', name='Cumulative',
+                   hovertemplate='PC1 to %{x}: %{y:.1%}<extra></extra>'),
+    ])
+    fig.update_layout(title='Scree Plot', xaxis_title='Principal Component',
+                      yaxis_title='Variance Explained', yaxis_tickformat='.0%')
+    return fig
+
+
+def biplot_figure(points, total, loadings, explained_variance):
+    """WebGL scatter of the (decimated) scores with the strongest loadings as arrows."""
+    fig = go.Figure()
+    decimated = len(points) < total
+    fig.add_trace(go.Scattergl(
+        x=points['PC1'], y=points['PC2'], mode='markers', name='Respondents',
+        customdata=points['Respondents'],
+        marker=dict(size=5, opacity=0.6, color=np.log10(points['Respondents']) if decimated else None,
+                    colorscale='Blues', cmin=0),
+        hovertemplate='PC1 %{x:.2f}, PC2 %{y:.2f}' +
+                      ('<br>%{customdata} respondents in this cell' if decimated else '') + '<extra></extra>',
+    ))
+
+    # Loadings are drawn at the scale of the scores so that the arrows are visible
+    top = loadings.abs().sum(axis=1).sort_values(ascending=False).head(BIPLOT_ARROWS).index
+    arrows = loadings.loc[top, ['PC1', 'PC2']]
+    reach = np.abs(points[['PC1', 'PC2']].to_numpy()).max() if len(points) else 1.0
+    scale = 0.8 * reach / max(np.abs(arrows.to_numpy()).max(), 1e-12)
+    for question, (pc1, pc2) in arrows.iterrows():
+        fig.add_annotation(x=pc1 * scale, y=pc2 * scale, ax=0, ay=0, xref='x', yref='y',
+                           axref='x', ayref='y', showarrow=True, arrowhead=2, arrowcolor='red')
+    fig.add_trace(go.Scatter(
+        x=arrows['PC1'] * scale, y=arrows['PC2'] * scale, mode='markers+text', name='Loadings',
+        text=[question if len(question) <= 40 else question[:37] + '...' for question in arrows.index],
+        textposition='top center', textfont=dict(color='green'),
+        marker=dict(color='red', size=6), customdata=arrows.to_numpy(), hovertext=list(arrows.index),
+        hovertemplate='%{hovertext}<br>PC1 loading %{customdata[0]:.3f}, '
+                      'PC2 loading %{customdata[1]:.3f}<extra></extra>',
+    ))
+
+    title = 'Biplot of PC1 and PC2'
+    if decimated:
+        title += f' ({len(points):,} of {total:,} respondents shown)'
+    fig.update_layout(title=title, height=700, showlegend=False,
+                      xaxis_title=f"PC1 - {explained_variance['PC1']:.2%} Variance Explained",
+                      yaxis_title=f"PC2 - {explained_variance['PC2']:.2%} Variance Explained")
+    return fig
+
+
+def loadings_heatmap_figure(loadings):
+    # Focus on the questions with the largest loadings
+    top_features = loadings.abs().sum(axis=1).sort_values(ascending=False).head(10).index
+    fig = px.imshow(loadings.loc[top_features].transpose(), text_auto='.2f', aspect='auto',
+                    color_continuous_scale='RdBu_r', color_continuous_midpoint=0,
+                    title='Heatmap of Component Loadings')
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def component_charts(explained_variance, pca_components, loadings, heading=st.subheader):
+    # Scree Plot
+    heading("Scree Plot")
+    st.plotly_chart(cached_figure('pca/scree', explained_variance,
+                                  lambda: scree_figure(explained_variance)))
+
+    # Biplot for PC1 and PC2, decimated for large cohorts
+    heading("Biplot of PC1 and PC2")
+    points = decimate_scores(pca_components)
+    biplot_data = [points, len(pca_components), loadings[['PC1', 'PC2']], explained_variance]
+    st.plotly_chart(cached_figure('pca/biplot', biplot_data,
+                                  lambda: biplot_figure(*biplot_data)))
+
+    # Heatmap of Component Loadings (Simplified)
+    heading("Heatmap of Component Loadings")
+    st.plotly_chart(cached_figure('pca/loadings-heatmap', loadings,
+                                  lambda: loadings_heatmap_figure(loadings)))
+
+
+def exported_components():
+    """Components of every group of respondents, then the published ones, for the exported report."""
+    st.caption("Computed from all rating questions, for all respondents and for each role, followed "
+               "by the components of the published report. The dashboard also computes them for "
+               "chosen question groups.")
+
+    def heading(text):
+        st.markdown(f"#### {text}")
+
+    items = select_items(list(QUESTION_SECTIONS) + [OTHER_QUESTIONS])
+    roles = sorted(load_responses()['Role'].dropna().unique())
+    for role in ["All roles"] + roles:
+        st.subheader(f"Live responses: {role}")
+        result = load_pca(None if role == "All roles" else role, items)
+        if len(result.scores) < 2:
+            st.warning("Too few respondents for a PCA.")
+            continue
+        st.caption(f"{len(result.scores)} respondents, {len(items)} questions, {result.solver} solver")
+        component_charts(result.explained_variance, result.scores[['PC1', 'PC2']], result.loadings, heading)
+
+    st.subheader("Published report")
+    pca_scores, pca_loadings = load_pca_data()
+    component_charts(pd.Series(pca_loadings.attrs['explained_variance']),
+                     pca_scores.block(columns=['PC1', 'PC2']), pca_loadings.to_frame(), heading)
+
+
 def pca_analysis():
     # Display the explanatory paragraph at the top
     st.markdown("""
@@ -36,8 +192,7 @@ def pca_analysis():
     """)
 
     # Load data
-    pca_data = load_pca_data()
-    component_ranking_data = load_component_ranking_data()
+    component_ranking_data = load_component_ranking_data(data_dir())
 
     # Component Ranking by Role
     st.subheader("Component Ranking by Role")
@@ -46,44 +201,46 @@ def pca_analysis():
         st.write(f"### {role}")
         st.bar_chart(df_role.set_index("PCA_Component")["Average_Score"])
 
-    # Scree Plot
-    st.subheader("Scree Plot")
-    explained_variance = pd.Series(pca_data['Explained_Variance'])
-    plt.figure(figsize=(10, 6))
-    plt.plot(explained_variance.index, explained_variance.values, 'o-', color='b')
-    plt.title('Scree Plot')
-    plt.xlabel('Principal Component')
-    plt.ylabel('Variance Explained')
-    plt.grid()
-    st.pyplot(plt)
-
-    # Biplot for PC1 and PC2 (Simplified)
-    st.subheader("Biplot of PC1 and PC2")
-    pca_components = pd.DataFrame(pca_data['PCA_Components'])
-    loadings = pd.DataFrame(pca_data['Loadings'])
-
-    plt.figure(figsize=(10, 10))
-    plt.scatter(pca_components['PC1'], pca_components['PC2'])
-
-    # Simplify by showing only a few components with the highest loadings
-    top_loadings = loadings.abs().sum(axis=1).sort_values(ascending=False).head(5).index
-    for i in top_loadings:
-        plt.arrow(0, 0, loadings['PC1'][i], loadings['PC2'][i], color='r', alpha=0.5)
-        plt.text(loadings['PC1'][i] * 1.15, loadings['PC2'][i] * 1.15, i, color='g', ha='center', va='center')
-
-    plt.xlabel(f"PC1 - {explained_variance['PC1']:.2%} Variance Explained")
-    plt.ylabel(f"PC2 - {explained_variance['PC2']:.2%} Variance Explained")
-    plt.title('Biplot of PC1 and PC2')
-    plt.grid()
-    st.pyplot(plt)
-
-    # Heatmap of Component Loadings (Simplified)
-    st.subheader("Heatmap of Component Loadings")
-    # Focus on top components and features
-    top_features = loadings.abs().sum(axis=1).sort_values(ascending=False).head(10).index
-    loadings_transposed = loadings.loc[top_features].transpose()
+    # Components computed from the current responses, or the published ones
+    st.subheader("Principal Components")
+    if not filter_caption():
+        return
+    rows = selected_rows()
+    if exporting():
+        exported_components()
+        return
+    source = st.radio("Numbers from", ["Live responses", "Published report"],
+                      horizontal=True, key="pca_source")
+    if source == "Live responses":
+        roles = sorted(load_responses()['Role'].dropna().unique())
+        role = st.selectbox("Respondents", ["All roles"] + roles, key="pca_role")
+        groups = st.multiselect("Questions", list(QUESTION_SECTIONS) + [OTHER_QUESTIONS],
+                                default=list(QUESTION_SECTIONS) + [OTHER_QUESTIONS], key="pca_groups")
+        items = select_items(groups)
+        if len(items) < 2:
+            st.warning("The selected groups hold fewer than two rating questions.")
+            return
+        result = load_pca(None if role == "All roles" else role, items, rows=rows)
+        if len(result.scores) < 2:
+            st.warning("Too few respondents for a PCA.")
+            return
+        st.caption(f"{len(result.scores)} respondents, {len(items)} questions, {result.solver} solver")
+        explained_variance = result.explained_variance
+        pca_components = result.scores[['PC1', 'PC2']]
+        loadings = result.loadings
+    else:
+        pca_scores, pca_loadings = load_pca_data()
+        explained_variance = pd.Series(pca_loadings.attrs['explained_variance'])
+        # The published scores are stored in the row order of Responses.json
+        if rows is not None and pca_scores.shape[0] == len(load_responses()):
+            pca_components = pca_scores.block(rows=rows, columns=['PC1', 'PC2'])
+        else:
+            if rows is not None:
+                st.warning(f"The published scores cover {pca_scores.shape[0]} respondents, not the "
+                           f"{len(load_responses())} of the current responses, so the filter cannot be "
+                           "applied to them: the biplot shows every respondent of the published report. "
+                           "Choose \"Live responses\" to see the selected respondents.")
+            pca_components = pca_scores.block(columns=['PC1', 'PC2'])
+        loadings = pca_loadings.to_frame()
 
-    plt.figure(figsize=(12, 8))
-    sns.heatmap(loadings_transposed, annot=True, cmap='coolwarm')
-    plt.title('Heatmap of Component Loadings')
-    st.pyplot(plt)
+    component_charts(explained_variance, pca_components, loadings)
@@ -0,0 +1,186 @@
+"""Streaming counts of the words and phrases in the free-text answers.
+
+``count_phrases`` reads Responses.json line by line, in byte ranges handled
+by parallel worker processes, and counts the 1-, 2- and 3-grams of every
+answer to the OPEN_ENDED_COLUMNS. Phrases are cut at punctuation and may
+neither start nor end with a stop word or a single letter ("the practice
+weeks" counts as "practice weeks").
+
+Counts are kept per (question, role) cell in PhraseCounters, which merge by
+adding counts. The totals per question, per role and overall are merges of
+the cells, so every breakdown comes out of the same single scan. A counter
+holding more than twice its capacity keeps only its ``capacity`` most common
+phrases. The largest count dropped is added to the counter's error, which
+bounds how far any remaining count may be too low; the counts are exact as
+long as the error is 0.
+"""
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis.questions import OPEN_ENDED_COLUMNS
+
+MAX_ORDER = 3
+# Phrases kept per counter; plenty for the survey, bounded for large cohorts
+CAPACITY = 50_000
+ROLE_COLUMN = 'Role'
+UNKNOWN_ROLE = 'Unknown'
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing done down during each even
+ever every few for from further get got had has have having he her here hers herself him
+himself his how i if in into is it its itself just let like lot lots me more most much must
+my myself no nor not now of off on once only or other our ours ourselves out over own per
+quite really same she should so some such than that the their theirs them themselves then
+there these they this those through to too under until up upon us very via was we well were
+what when where which while who whom why will with within without would yes you your yours
+yourself yourselves etc also maybe
+""".split())
+
+SENTENCE_BREAK = re.compile(r'[.!?;:,()\[\]"\n\r\t]+|\s-\s')
+WORD = re.compile(r"[^\W_](?:[\w'/&-]*[^\W_])?")
+
+
+def phrases(text, max_order=MAX_ORDER):
+    """The n-grams (n <= max_order) of ``text``, as space-joined lower-case strings."""
+    for sentence in SENTENCE_BREAK.split(text.lower()):
+        words = WORD.findall(sentence)
+        stops = [len(word) < 2 or word in STOP_WORDS for word in words]
+        for start in range(len(words)):
+            if stops[start]:
+                continue
+            for end in range(start + 1, min(start + max_order, len(words)) + 1):
+                if not stops[end - 1]:
+                    yield ' '.join(words[start:end])
+
+
+class PhraseCounter:
+    """Mergeable phrase counts, pruned to about ``capacity`` phrases."""
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.counts = Counter()
+        # Upper bound on how much any count is too low because of pruning
+        self.error = 0
+
+    def update(self, phrases):
+        self.counts.update(phrases)
+        if len(self.counts) > 2 * self.capacity:
+            self.prune()
+
+    def prune(self):
+        if len(self.counts) <= self.capacity:
+            return
+        ranked = self.counts.most_common()
+        self.error += ranked[self.capacity][1]
+        self.counts = Counter(dict(ranked[:self.capacity]))
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.error += other.error
+        if len(self.counts) > 2 * self.capacity:
+            self.prune()
+        return self
+
+    def most_common(self, n, min_order=1, max_order=MAX_ORDER):
+        """The n most frequent phrases of min_order to max_order words, ties by phrase."""
+        items = ((phrase, count) for phrase, count in self.counts.items()
+                 if min_order <= phrase.count(' ') + 1 <= max_order)
+        return sorted(items, key=lambda item: (-item[1], item[0]))[:n]
+
+    def to_dict(self):
+        return {'counts': dict(self.counts), 'error': self.error}
+
+    @classmethod
+    def from_dict(cls, data, capacity=CAPACITY):
+        counter = cls(capacity)
+        counter.counts = Counter(data['counts'])
+        counter.error = data['error']
+        return counter
+
+
+def _byte_ranges(path, parts):
+    size = os.path.getsize(path)
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def count_range(path, start, end, columns=OPEN_ENDED_COLUMNS, capacity=CAPACITY):
+    """Count the lines of a JSON-lines file that start in [start, end).
+
+    Returns ({(question, role): PhraseCounter as dict}, answers counted).
+    """
+    cells = {}
+    answers = 0
+    with open(path, 'rb') as f:
+        if start:
+            # The line under ``start`` belongs to the range before
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            role = record.get(ROLE_COLUMN) or UNKNOWN_ROLE
+            for question in columns:
+                text = record.get(question)
+                if not isinstance(text, str) or not text.strip():
+                    continue
+                answers += 1
+                key = (question, role)
+                if key not in cells:
+                    cells[key] = PhraseCounter(capacity)
+                cells[key].update(phrases(text))
+    return {key: counter.to_dict() for key, counter in cells.items()}, answers
+
+
+class PhraseCounts:
+    """Phrase counters of one scan, per (question, role) cell."""
+
+    def __init__(self, cells, answers, capacity=CAPACITY):
+        self.cells = cells
+        self.answers = answers
+        self.capacity = capacity
+
+    def total(self, question=None, role=None):
+        """Merged counts of the cells matching ``question`` and ``role`` (None: all)."""
+        counter = PhraseCounter(self.capacity)
+        for (cell_question, cell_role), cell in self.cells.items():
+            if question in (None, cell_question) and role in (None, cell_role):
+                counter.merge(cell)
+        return counter
+
+    @property
+    def questions(self):
+        return sorted({question for question, _ in self.cells})
+
+    @property
+    def roles(self):
+        return sorted({role for _, role in self.cells})
+
+
+def count_phrases(path, jobs=None, columns=OPEN_ENDED_COLUMNS, capacity=CAPACITY):
+    """Count the phrases of the answers in a JSON-lines file, in ``jobs`` processes."""
+    jobs = jobs or os.cpu_count() or 1
+    ranges = _byte_ranges(path, jobs)
+    if jobs == 1:
+        results = [count_range(path, *ranges[0], columns, capacity)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(count_range, [path] * jobs, *zip(*ranges),
+                                        [columns] * jobs, [capacity] * jobs))
+
+    cells = {}
+    answers = 0
+    for partial, partial_answers in results:
+        answers += partial_answers
+        for key, data in partial.items():
+            counter = PhraseCounter.from_dict(data, capacity)
+            cells[key] = cells[key].merge(counter) if key in cells else counter
+    return PhraseCounts(cells, answers, capacity)
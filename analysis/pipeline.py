@@ -0,0 +1,156 @@
+"""Incremental, parallel runner for the artifact stages in analysis.artifacts.
+
+A stage is rebuilt only when the fingerprint of its inputs changed: the
+SHA-256 of every input file plus the source of the module defining the
+builder and of the modules the stage declares. Upstream outputs are hashed
+after they are rebuilt, so a change propagates exactly as far as it alters
+file contents. Stages whose inputs are ready run concurrently in worker
+processes.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from analysis.artifacts import STAGES
+from analysis.paths import data_dir as current_data_dir
+
+MANIFEST_FILENAME = '.cache/build_manifest.json'
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage, data_dir):
+    digest = hashlib.sha256(stage.name.encode())
+    digest.update(inspect.getsource(
+        inspect.getmodule(stage.build)).encode())
+    for module in stage.modules:
+        digest.update(module.encode())
+        digest.update(inspect.getsource(importlib.import_module(module)).encode())
+    for name in stage.inputs:
+        digest.update(name.encode())
+        digest.update(file_digest(data_dir / name).encode())
+    return digest.hexdigest()
+
+
+def stage_dependencies(stages):
+    """Map each stage name to the names of the stages producing its inputs."""
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    dependencies = {stage.name: {producers[name] for name in stage.inputs if name in producers}
+                    for stage in stages}
+    # Reject cycles up front rather than deadlocking the scheduler
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(
+                f"Artifact stages form a dependency cycle at '{name}'")
+        visiting.add(name)
+        for dependency in dependencies[name]:
+            visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in dependencies:
+        visit(name)
+    return dependencies
+
+
+def load_manifest(data_dir):
+    path = data_dir / MANIFEST_FILENAME
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, data_dir):
+    path = data_dir / MANIFEST_FILENAME
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+
+def is_up_to_date(stage, fingerprint, manifest, data_dir):
+    entry = manifest.get(stage.name)
+    if not entry or entry['fingerprint'] != fingerprint:
+        return False
+    return all((data_dir / name).exists() and file_digest(data_dir / name) == entry['outputs'].get(name)
+               for name in stage.outputs)
+
+
+def _run_stage(stage_name, data_dir):
+    stage = next(stage for stage in STAGES if stage.name == stage_name)
+    start = time.perf_counter()
+    stage.build(data_dir)
+    return time.perf_counter() - start
+
+
+def build(data_dir=None, stages=None, force=False, jobs=None, dry_run=False, log=print):
+    """Rebuild the out-of-date artifacts of a cohort's directory and return {stage name: status}."""
+    data_dir = data_dir or current_data_dir()
+    stages = stages or STAGES
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = stage_dependencies(stages)
+    manifest = load_manifest(data_dir)
+    status = {}
+    pending = set(by_name)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            ready = [name for name in sorted(pending)
+                     if all(dependency in status for dependency in dependencies[name])]
+            for name in ready:
+                pending.discard(name)
+                stage = by_name[name]
+                upstream = {status[dependency] for dependency in dependencies[name]}
+                if upstream & {'failed', 'skipped'}:
+                    status[name] = 'skipped'
+                    log(f'{name}: skipped, an upstream stage failed')
+                    continue
+                if dry_run and 'stale' in upstream:
+                    status[name] = 'stale'
+                    log(f'{name}: would rebuild {", ".join(stage.outputs)}')
+                    continue
+                fingerprint = stage_fingerprint(stage, data_dir)
+                if not force and is_up_to_date(stage, fingerprint, manifest, data_dir):
+                    status[name] = 'up to date'
+                    log(f'{name}: up to date')
+                elif dry_run:
+                    status[name] = 'stale'
+                    log(f'{name}: would rebuild {", ".join(stage.outputs)}')
+                else:
+                    running[executor.submit(
+                        _run_stage, name, data_dir)] = (name, fingerprint)
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, fingerprint = running.pop(future)
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    status[name] = 'failed'
+                    log(f'{name}: failed: {e!r}')
+                    continue
+                manifest[name] = {
+                    'fingerprint': fingerprint,
+                    'outputs': {output: file_digest(data_dir / output) for output in by_name[name].outputs},
+                }
+                save_manifest(manifest, data_dir)
+                status[name] = 'built'
+                log(f'{name}: built {", ".join(by_name[name].outputs)} in {elapsed:.2f}s')
+    return status
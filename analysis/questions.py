@@ -0,0 +1,189 @@
+# Groups of rating questions from Responses.json shared by the analyses
+
+APPLICATION_COLUMNS = [
+    'How satisfied were you with the clarity of the application instructions? ',
+    'How smooth was the registration process?',
+    'How helpful was the initial contact with the academy’s staff? ',
+    'Were the payment options and processes clear and convenient?',
+    'Were you satisfied with the price of the Academy?',
+]
+
+LECTURE_COLUMNS = [
+    'How relevant was the General Academic Lectures to your coaching needs?',
+    'How useful did you find the Basketball Academic Lectures?',
+    'How beneficial were the new modules introduced this year (Scouting, S&C, Officiating, Medical)?',
+    "How effective was the EHCB Members' Online Lectures? ",
+]
+
+LESSON_COLUMNS = [
+    'How effective were the lessons on Offensive Team Tactic?',
+    'How effective were the lessons on Defensive Team Tactic? ',
+    'How effective were the lessons on Individual and Group Tactics? ',
+    'How effective were the lessons on Basketball Technique? ',
+    'How effective were the lessons on Planning & Programming and S&C?',
+    'How effective were the lessons on Selection and Training of Young Players?',
+    'How effective were the lessons on Basketball History and Factors? ',
+    'How effective were the lessons on Theory of Sports Training and S&C? ',
+    'How effective were the lessons on Sociology & Psychology?',
+    'How effective were the lessons on Human Motoric? ',
+    'How effective were the lessons on Biomedicine Subjects?',
+]
+
+EXAM_COLUMNS = [
+    'Did the exam adequately assess your knowledge in Offensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Defensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Individual and Group Tactics?',
+    'Did the exam adequately assess your knowledge in Basketball Technique?',
+    'Did the exam adequately assess your knowledge in Planning & Programming and S&C?',
+    'Did the exam adequately assess your knowledge in Selection and Training of Young Players?',
+    'Did the exam adequately assess your knowledge in Basketball History and Factors? ',
+    'Did the exam adequately assess your knowledge in Theory of Sports Training and S&C? ',
+    'Did the exam adequately assess your knowledge in Sociology & Psychology?',
+    'Did the exam adequately assess your knowledge in Human Motoric? ',
+    'Did the exam adequately assess your knowledge in Biomedicine Subjects?',
+    'How satisfied were you with the exams in general?',
+]
+
+TECHNICAL_COLUMNS = [
+    'How user-friendly was Zoom?',
+    'How user-friendly was MS Teams?',
+    'How effective were the communication channels (WhatsApp, email, etc.)?',
+    'Were the lesson schedules and reminders adequately managed?',
+    'How accessible were the recorded lectures and materials? ',
+    'Please rate the overall technical support provided during the courses.',
+    'Please rate the support provided for operational aspects of the academy',
+]
+
+PRACTICE_WEEK_COLUMNS = [
+    'How well-organized was the practice week with EuroLeague teams?',
+    'How beneficial was the practice week for your coaching development?',
+    'How satisfactory was your interaction with the coaches of the practice week team? ',
+    'How effective were the practice week presentations?',
+    'How would you rate the out-of-court experiences in the city of the practice week?',
+    'Please rate the support provided for operational aspects of the practice week (travel,  accommodation, guidance etc.)',
+]
+
+OVERALL_COLUMNS = [
+    'To what extent has the academy helped you become a better coach?',
+    "How much knowledge did you gain from the EHCB Coaches Academy's  modules?",
+    'Did the academy meet your expectations for professional networking? ',
+    'How likely are you to recommend the EHCB Coaches Academy to other coaches? ',
+]
+
+# Sections of the questionnaire, e.g. for the correlation explorer
+QUESTION_SECTIONS = {
+    'Application and Registration': APPLICATION_COLUMNS,
+    'Lectures': LECTURE_COLUMNS,
+    'Lessons': LESSON_COLUMNS,
+    'Exams': EXAM_COLUMNS,
+    'Technical and Operational': TECHNICAL_COLUMNS,
+    'Practice Weeks': PRACTICE_WEEK_COLUMNS,
+    'Overall': OVERALL_COLUMNS,
+}
+
+# Question groups compared across continents in the summary
+COMPONENT_COLUMNS = {
+    'Application Process': APPLICATION_COLUMNS,
+    'Academy Content': LECTURE_COLUMNS + LESSON_COLUMNS,
+    'Exams': EXAM_COLUMNS,
+    'General Satisfaction': OVERALL_COLUMNS,
+    'Technical and Operational Support': TECHNICAL_COLUMNS,
+}
+
+# Questions ranked per role in All_Sections_Ranking_By_Role.json
+RANKED_SECTION_COLUMNS = [
+    'How smooth was the registration process?',
+    'Were the payment options and processes clear and convenient?',
+    'Were you satisfied with the price of the Academy?',
+    'How relevant was the General Academic Lectures to your coaching needs?',
+    'How useful did you find the Basketball Academic Lectures?',
+    'How beneficial were the new modules introduced this year (Scouting, S&C, Officiating, Medical)?',
+    "How effective was the EHCB Members' Online Lectures? ",
+    'How effective were the lessons on Offensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Offensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Defensive Team Tactic?',
+    'How effective were the communication channels (WhatsApp, email, etc.)?',
+    'Were the lesson schedules and reminders adequately managed?',
+    'Please rate the overall technical support provided during the courses.',
+    'Please rate the support provided for operational aspects of the academy',
+    'How well-organized was the practice week with EuroLeague teams?',
+    'How beneficial was the practice week for your coaching development?',
+    'How satisfactory was your interaction with the coaches of the practice week team? ',
+    'How effective were the practice week presentations?',
+    'How would you rate the out-of-court experiences in the city of the practice week?',
+    'To what extent has the academy helped you become a better coach?',
+    "How much knowledge did you gain from the EHCB Coaches Academy's  modules?",
+]
+
+# Questions ranked per role in Lessons_Exams_Ranking_By_Role.json
+RANKED_LESSON_EXAM_COLUMNS = [
+    'How relevant was the General Academic Lectures to your coaching needs?',
+    'How useful did you find the Basketball Academic Lectures?',
+    'How beneficial were the new modules introduced this year (Scouting, S&C, Officiating, Medical)?',
+    "How effective was the EHCB Members' Online Lectures? ",
+    'How effective were the lessons on Offensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Offensive Team Tactic?',
+    'Did the exam adequately assess your knowledge in Defensive Team Tactic?',
+]
+
+# Questions summarized in Box_Plot_Visualization.json
+COMPARED_COLUMNS = [
+    'Did you find the certification ceremony satisfactory? ',
+    'How effective were the practice week presentations?',
+    "How much knowledge did you gain from the EHCB Coaches Academy's  modules?",
+]
+
+# Headline satisfaction question, compared by role and nationality in the summary
+SATISFACTION_COLUMN = 'Did you find the certification ceremony satisfactory? '
+
+# Names given to the principal components in the reports
+PCA_COMPONENT_NAMES = {
+    'PC1': 'PC1 - Assessment of Knowledge and Academic Rigor',
+    'PC2': 'PC2 - Effectiveness and Organization of Practical Components',
+    'PC3': 'PC3 - Technical and Operational Satisfaction',
+    'PC4': 'PC4 - Financial and Administrative Satisfaction',
+    'PC5': 'PC5 - Technical Accessibility and Usability',
+}
+
+# Free-text questions of the overall sentiment charts in the summary
+SENTIMENT_COLUMNS = [
+    'Please share any additional comments or suggestions about Application and Registration Process. ',
+    'Please share any additional comments or suggestions about the Curriculum. ',
+    'Please share any additional comments or suggestions about the Operational and Technical Aspects. ',
+    'Please share any additional comments or suggestions about the Practice Weeks. ',
+    'Please share any additional comments or suggestions about Networking. ',
+    'Please share any additional comments or suggestions. ',
+]
+
+# Free-text questions and their short names, counted in
+# Phrase_Frequency_Summary.json and scored in Sentiment_Analysis.json
+OPEN_ENDED_COLUMNS = {
+    'What helped you to decide signing up for the program?': 'What Helped You Decide to Sign Up?',
+    'What would be your suggested price for the 5ht Gen. considering 8 modules and practice weeks?':
+        'Suggested Price for 5th Gen',
+    'What criteria/screening would you recommend while admitting new participants into the EHCB CA?':
+        'Criteria/Screening for New Participants',
+    'What kind of content would you prefer from the EHCB Members?': 'Preferred Content from EHCB Members',
+    'What kind of interactivity would you prefer from the professors?': 'Preferred Interactivity from Professors',
+    'Which module/lesson would you like to add to the curriculum?': 'Module/Lesson to Add to the Curriculum',
+    'Please share any additional comments or suggestions about Application and Registration Process. ':
+        'Application and Registration Process',
+    'Please share any additional comments or suggestions about the Curriculum. ': 'Curriculum',
+    'Please share any additional comments or suggestions about Lecture Modules, exam, grading and certification ':
+        'Lecture Modules, Exam, Grading, and Certification',
+    'Please share any additional comments or suggestions about the Schedule and Attandance. ':
+        'Schedule and Attendance',
+    'Please share any additional comments or suggestions about the Bonus Lectures. ': 'Bonus Lectures',
+    'Please share any additional comments or suggestions about the Operational and Technical Aspects. ':
+        'Operational and Technical Aspects',
+    'Please share any additional comments or suggestions about the Practice Weeks. ': 'Practice Weeks',
+    'Please share any additional comments or suggestions about Networking. ': 'Networking',
+    'Please share any additional comments or suggestions. ': 'General Suggestions',
+}
+
+PRACTICE_WEEK_JOINED_COLUMN = 'Which practice week have you joined'
+TIMEZONE_COLUMN = 'Which timezone do you live at?'
+PREFERRED_DAYS_COLUMN = 'Which days did you prefer the lessons the most?'
+WEEKDAY_TIMES_COLUMN = 'On weekdays, which time period fitted you the most? [Central European Time]'
+WEEKEND_TIMES_COLUMN = 'At weekends, which time period fitted you the most? [Central European Time]'
+SCHEDULING_COLUMN = 'How would you rate the overall scheduling of the lessons?'
@@ -0,0 +1,471 @@
+"""Static export of the report, served to guest sessions (see analysis.snapshot).
+
+``export_report`` renders every section of SECTIONS headlessly with
+Streamlit's AppTest, as benchmarks/bench_sections.py does, each section in
+a worker process of its own, and writes the cohort's report/ directory:
+
+- report.html: one self-contained page with every section. The Plotly
+  figures are embedded as JSON and drawn by an inline copy of plotly.js when
+  they scroll into view, word clouds are PNG data URIs and tables are HTML.
+  Charts drawn with ``st.bar_chart`` are redrawn with Plotly, so the page
+  needs no other script.
+- report.pdf, optionally: the headings, text, charts and word clouds as
+  pages of a PDF. The workers render the Plotly figures to PNG, which needs
+  the kaleido package.
+- report.json: when and from which Responses.json the report was exported.
+
+Sections render their export variant (see ``exporting`` in
+analysis.sections): the feedback viewer lists every response, the
+correlation explorer and the PCA section show each of their views. Controls
+left in a section keep their default values; the page shows their label and
+value in their place, and a note at the top of the section says which
+selections it is limited to.
+"""
+import base64
+import html
+import io
+import json
+import os
+import re
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.express as px
+import plotly.io as pio
+import pyarrow as pa
+
+from analysis.paths import current_cohort
+from analysis.pipeline import file_digest
+from analysis.responses import responses_path
+from analysis.sections import SECTIONS
+from analysis.snapshot import REPORT_HTML, REPORT_MANIFEST, REPORT_PDF, report_dir
+
+# Script AppTest runs: render one section of a cohort, then hand over the
+# images it stored, by file ID
+SCRIPT = """
+import importlib
+import streamlit as st
+from streamlit.runtime import Runtime
+from analysis.paths import using_cohort
+from analysis.sections import EXPORT_KEY
+
+st.session_state[EXPORT_KEY] = True
+module, function = {render!r}.split(':')
+with using_cohort({cohort!r}):
+    getattr(importlib.import_module(module), function)()
+
+storage = Runtime.instance().media_file_mgr._storage
+st.session_state['_export_media'] = {{file_id: (media_file.mimetype, media_file.content)
+                                     for file_id, media_file in storage._files_by_id.items()}}
+"""
+SECTION_TIMEOUT = 600
+
+HEADINGS = {'title', 'header', 'subheader', 'heading'}
+ALERTS = {'info', 'success', 'warning', 'error'}
+CONTROLS = {'selectbox', 'radio', 'multiselect', 'slider', 'select_slider', 'checkbox', 'toggle',
+            'text_input', 'text_area', 'number_input', 'date_input', 'time_input'}
+# Plotly Express function redrawing a Vega-Lite mark of st.bar_chart etc.
+VEGA_MARKS = {'bar': px.bar, 'line': px.line, 'area': px.area, 'circle': px.scatter, 'point': px.scatter}
+MAX_TABLE_ROWS = 500
+# Size of a Plotly figure rendered for the PDF, in layout pixels
+PDF_FIGURE_SIZE = (1000, 600)
+PDF_PAGE_SIZE = (8.27, 11.69)
+PDF_LINES_PER_PAGE = 60
+PDF_LINE_WIDTH = 95
+
+
+# 1. Sections as blocks, one dict per element
+def arrow_frame(data):
+    return pa.ipc.open_stream(data).read_pandas()
+
+
+def table_block(df):
+    return {'kind': 'table', 'rows': len(df),
+            'html': df.head(MAX_TABLE_ROWS).to_html(border=0, na_rep=''),
+            'text': df.head(PDF_LINES_PER_PAGE // 2).to_string()}
+
+
+def vega_block(proto):
+    """A Vega-Lite chart of Streamlit as an equivalent Plotly figure, else its data as a table."""
+    spec = json.loads(proto.spec)
+    datasets = {dataset.name: dataset.data.data for dataset in proto.datasets}
+    data = datasets.get(spec.get('data', {}).get('name')) or proto.data.data
+    if not data:
+        return None
+    df = arrow_frame(data)
+    mark = spec.get('mark')
+    chart = VEGA_MARKS.get(mark.get('type') if isinstance(mark, dict) else mark)
+    encoding = spec.get('encoding', {})
+    fields = {channel: encoding[channel].get('field') for channel in ['x', 'y', 'color']
+              if isinstance(encoding.get(channel), dict)}
+    if chart is None or not {'x', 'y'} <= fields.keys():
+        return table_block(df)
+    fig = chart(df, x=fields['x'], y=fields['y'], color=fields.get('color'))
+    fig.update_layout(xaxis_title=None, yaxis_title=None, legend_title_text=None)
+    if encoding['x'].get('type') in ('ordinal', 'nominal'):
+        fig.update_xaxes(type='category')
+    return {'kind': 'plotly', 'spec': fig.to_json()}
+
+
+def _control_value(value):
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return '' if value is None else str(value)
+
+
+def element_blocks(node, media):
+    """The elements of an AppTest node as blocks: dicts with a 'kind' and its content."""
+    blocks = []
+    for child in node.children.values():
+        kind = child.type
+        if kind == 'expander':
+            blocks.append({'kind': 'expander', 'label': child.proto.label,
+                           'blocks': element_blocks(child, media)})
+        elif hasattr(child, 'children'):
+            # Columns, containers etc.: their content in order
+            blocks.extend(element_blocks(child, media))
+        elif kind in HEADINGS:
+            blocks.append({'kind': 'heading', 'tag': child.proto.tag or 'h2', 'text': child.proto.body})
+        elif kind in ('markdown', 'caption'):
+            blocks.append({'kind': kind, 'text': child.proto.body})
+        elif kind in ALERTS:
+            blocks.append({'kind': 'alert', 'level': kind, 'text': child.proto.body})
+        elif kind == 'plotly_chart':
+            blocks.append({'kind': 'plotly', 'spec': child.proto.spec})
+        elif kind == 'vega_lite_chart':
+            block = vega_block(child.proto)
+            if block is not None:
+                blocks.append(block)
+        elif kind == 'image':
+            for image in child.proto.imgs:
+                mimetype, content = media[image.url.rsplit('/', 1)[-1].split('.')[0]]
+                blocks.append({'kind': 'image', 'mimetype': mimetype, 'caption': image.caption,
+                               'data': base64.b64encode(content).decode('ascii')})
+        elif kind in ('dataframe', 'table'):
+            blocks.append(table_block(arrow_frame(child.proto.arrow_data.data)))
+        elif kind in CONTROLS:
+            blocks.append({'kind': 'control', 'label': child.label, 'value': _control_value(child.value)})
+    return blocks
+
+
+def walk_blocks(blocks):
+    for block in blocks:
+        yield block
+        if block['kind'] == 'expander':
+            yield from walk_blocks(block['blocks'])
+
+
+def render_section(title, render, cohort, pdf=False):
+    """Blocks of one section of ``cohort``, run in a worker process.
+
+    With ``pdf`` the Plotly figures are also rendered to PNG.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    at = AppTest.from_string(SCRIPT.format(render=render, cohort=cohort), default_timeout=SECTION_TIMEOUT)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f'{title}: {at.exception[0].message}')
+    blocks = element_blocks(at.main, at.session_state['_export_media'])
+    controls = [block for block in walk_blocks(blocks) if block['kind'] == 'control']
+    if controls:
+        blocks.insert(0, {'kind': 'alert', 'level': 'info', 'text': (
+            "This view is interactive in the dashboard; the report shows it with the default "
+            "selections only (" + "; ".join(f"{block['label']}: {block['value']}" for block in controls)
+            + ").")})
+    if pdf:
+        width, height = PDF_FIGURE_SIZE
+        for block in walk_blocks(blocks):
+            if block['kind'] == 'plotly':
+                block['png'] = pio.to_image(json.loads(block['spec']), format='png', width=width, height=height)
+    return {'title': title, 'blocks': blocks, 'seconds': round(time.perf_counter() - start, 2)}
+
+
+# 2. HTML page
+INLINE_MARKDOWN = [
+    (re.compile(r'\*\*(.+?)\*\*'), r'<strong>\1</strong>'),
+    (re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])'), r'<em>\1</em>'),
+    (re.compile(r'`(.+?)`'), r'<code>\1</code>'),
+    (re.compile(r'\[([^\]]+)\]\((https?://[^)\s]+)\)'), r'<a href="\2">\1</a>'),
+]
+LIST_ITEM = re.compile(r'([-*+]|\d+\.)\s+(.*)')
+MARKDOWN_HEADING = re.compile(r'(#{1,6})\s+(.*)')
+
+
+def _inline_html(text):
+    text = html.escape(text, quote=False)
+    for pattern, replacement in INLINE_MARKDOWN:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def markdown_html(text):
+    """HTML of the markdown the sections write: paragraphs, headings, lists and emphasis."""
+    parts, paragraph, items = [], [], []
+    list_tag = None
+
+    def flush():
+        nonlocal list_tag
+        if paragraph:
+            parts.append(f'<p>{_inline_html(" ".join(paragraph))}</p>')
+            paragraph.clear()
+        if items:
+            parts.append(f'<{list_tag}>' + ''.join(f'<li>{_inline_html(item)}</li>' for item in items)
+                         + f'</{list_tag}>')
+            items.clear()
+            list_tag = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = MARKDOWN_HEADING.fullmatch(stripped)
+        item = LIST_ITEM.fullmatch(stripped)
+        if not stripped:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            parts.append(f'<h{level}>{_inline_html(heading.group(2))}</h{level}>')
+        elif item:
+            tag = 'ol' if item.group(1)[0].isdigit() else 'ul'
+            if paragraph or tag != list_tag:
+                flush()
+            list_tag = tag
+            items.append(item.group(2))
+        elif items and line[:1].isspace():
+            # Continuation line of a list item
+            items[-1] += ' ' + stripped
+        else:
+            if items:
+                flush()
+            paragraph.append(stripped)
+    flush()
+    return ''.join(parts)
+
+
+def _slug(title):
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+
+
+def blocks_html(blocks, figures):
+    """HTML of ``blocks``; the Plotly specs are appended to ``figures``."""
+    parts = []
+    for block in blocks:
+        kind = block['kind']
+        if kind == 'heading':
+            parts.append(f'<{block["tag"]}>{html.escape(block["text"])}</{block["tag"]}>')
+        elif kind == 'markdown':
+            parts.append(markdown_html(block['text']))
+        elif kind == 'caption':
+            parts.append(f'<div class="caption">{markdown_html(block["text"])}</div>')
+        elif kind == 'alert':
+            parts.append(f'<div class="alert {block["level"]}">{markdown_html(block["text"])}</div>')
+        elif kind == 'plotly':
+            figures.append(block['spec'])
+            parts.append(f'<div class="chart" data-figure="figure-{len(figures) - 1}"></div>')
+        elif kind == 'image':
+            caption = f'<figcaption>{html.escape(block["caption"])}</figcaption>' if block['caption'] else ''
+            parts.append(f'<figure><img src="data:{block["mimetype"]};base64,{block["data"]}" alt="">'
+                         f'{caption}</figure>')
+        elif kind == 'table':
+            more = (f'<div class="caption">First {MAX_TABLE_ROWS} of {block["rows"]} rows</div>'
+                    if block['rows'] > MAX_TABLE_ROWS else '')
+            parts.append(f'<div class="table">{block["html"]}</div>{more}')
+        elif kind == 'control':
+            parts.append(f'<div class="control">{html.escape(block["label"])}: '
+                         f'<strong>{html.escape(block["value"])}</strong></div>')
+        elif kind == 'expander':
+            parts.append(f'<details><summary>{html.escape(block["label"])}</summary>'
+                         f'{blocks_html(block["blocks"], figures)}</details>')
+    return '\n'.join(parts)
+
+
+PAGE_STYLE = """
+body { font-family: "Source Sans Pro", system-ui, sans-serif; color: #31333f; margin: 0 auto;
+       max-width: 1100px; padding: 1rem 2rem 4rem; line-height: 1.5; }
+nav a { margin-right: 1rem; }
+section { border-top: 1px solid #e6e6e6; margin-top: 2rem; }
+.chart { min-height: 450px; }
+.caption { color: #808495; font-size: 0.875rem; }
+.alert { border-radius: 0.5rem; padding: 0.75rem 1rem; margin: 0.5rem 0; background: #f0f2f6; }
+.alert.info { background: #e8f1fb; } .alert.success { background: #e6f4ea; }
+.alert.warning { background: #fff8e1; } .alert.error { background: #fdecea; }
+.control { color: #555867; font-size: 0.875rem; margin: 0.25rem 0; }
+.table { overflow-x: auto; max-height: 500px; font-size: 0.875rem; }
+table { border-collapse: collapse; } th, td { border-bottom: 1px solid #e6e6e6; padding: 0.2rem 0.5rem; }
+figure { margin: 1rem 0; } img { max-width: 100%; }
+details { margin: 0.5rem 0; } summary { cursor: pointer; font-weight: 600; }
+"""
+
+# Draws each figure once it comes close to the visible part of the page
+PAGE_SCRIPT = """
+const observer = new IntersectionObserver((entries) => {
+  for (const entry of entries) {
+    if (!entry.isIntersecting) continue;
+    observer.unobserve(entry.target);
+    const figure = JSON.parse(document.getElementById(entry.target.dataset.figure).textContent);
+    Plotly.newPlot(entry.target, figure.data, figure.layout || {}, {responsive: true, displaylogo: false});
+  }
+}, {rootMargin: '600px'});
+document.querySelectorAll('.chart').forEach((chart) => observer.observe(chart));
+"""
+
+
+def report_html(title, subtitle, sections):
+    """The self-contained HTML page of the rendered ``sections``."""
+    from plotly.offline import get_plotlyjs
+
+    figures = []
+    body = [f'<section id="{_slug(section["title"])}"><h2>{html.escape(section["title"])}</h2>\n'
+            f'{blocks_html(section["blocks"], figures)}</section>' for section in sections]
+    toc = ''.join(f'<a href="#{_slug(section["title"])}">{html.escape(section["title"])}</a>'
+                  for section in sections)
+    # Plotly's JSON escapes "<", so no spec can close its script element
+    specs = ''.join(f'<script type="application/json" id="figure-{i}">{spec}</script>\n'
+                    for i, spec in enumerate(figures))
+    return '\n'.join([
+        '<!DOCTYPE html>', '<html lang="en">', '<head>', '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f'<title>{html.escape(title)}</title>', f'<style>{PAGE_STYLE}</style>',
+        f'<script>{get_plotlyjs()}</script>', '</head>', '<body>',
+        f'<header><h1>{html.escape(title)}</h1><div class="caption">{html.escape(subtitle)}</div>'
+        f'<nav>{toc}</nav></header>',
+        *body, specs, f'<script>{PAGE_SCRIPT}</script>', '</body>', '</html>',
+    ])
+
+
+# 3. PDF
+def _text_lines(block):
+    kind = block['kind']
+    if kind in ('markdown', 'caption', 'alert'):
+        # Markup is dropped; list items keep their bullet
+        text = re.sub(r'\*\*|`', '', block['text'])
+        return [wrapped for line in text.splitlines() or ['']
+                for wrapped in textwrap.wrap(line.strip(), PDF_LINE_WIDTH) or ['']]
+    if kind == 'table':
+        return block['text'].splitlines()
+    if kind == 'control':
+        return [f'{block["label"]}: {block["value"]}']
+    return []
+
+
+def write_pdf(path, title, sections):
+    """PDF of the rendered ``sections``: text pages, and a page per chart or image."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.backends.backend_pdf import PdfPages
+    from PIL import Image
+
+    with PdfPages(path) as pdf:
+        lines = [(title, 'title')]
+
+        def text_pages():
+            while lines:
+                page, rest = lines[:PDF_LINES_PER_PAGE], lines[PDF_LINES_PER_PAGE:]
+                fig = plt.figure(figsize=PDF_PAGE_SIZE)
+                for i, (line, style) in enumerate(page):
+                    fig.text(0.06, 0.96 - i * 0.9 / PDF_LINES_PER_PAGE, line, va='top', parse_math=False,
+                             family='monospace' if style == 'table' else 'sans-serif',
+                             fontsize={'title': 16, 'heading': 12}.get(style, 8),
+                             weight='bold' if style in ('title', 'heading') else 'normal')
+                pdf.savefig(fig)
+                plt.close(fig)
+                lines[:] = rest
+
+        def image_page(image, heading):
+            text_pages()
+            fig = plt.figure(figsize=PDF_PAGE_SIZE)
+            fig.text(0.06, 0.96, heading, va='top', fontsize=12, weight='bold', parse_math=False)
+            ax = fig.add_axes([0.06, 0.35, 0.88, 0.55])
+            ax.imshow(np.asarray(Image.open(io.BytesIO(image)).convert('RGB')))
+            ax.axis('off')
+            pdf.savefig(fig)
+            plt.close(fig)
+
+        def add(blocks, heading):
+            for block in blocks:
+                kind = block['kind']
+                if kind == 'heading':
+                    heading = block['text']
+                    lines.extend([('', 'text'), (heading, 'heading')])
+                elif kind == 'expander':
+                    lines.extend([('', 'text'), (block['label'], 'heading')])
+                    heading = add(block['blocks'], block['label'])
+                elif kind == 'plotly':
+                    image_page(block['png'], heading)
+                elif kind == 'image':
+                    image_page(base64.b64decode(block['data']), heading)
+                else:
+                    style = 'table' if kind == 'table' else 'text'
+                    lines.extend((line, style) for line in _text_lines(block))
+            return heading
+
+        for section in sections:
+            lines.extend([('', 'text'), (section['title'], 'title')])
+            add(section['blocks'], section['title'])
+        text_pages()
+
+
+# 4. Export
+def _write_atomic(path, content):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def export_report(cohort=None, pdf=False, jobs=None, log=print):
+    """Render every section of ``cohort`` and write its report/ directory.
+
+    Sections render in parallel in ``jobs`` worker processes (default: one
+    per CPU). Nothing is written unless every section rendered.
+    """
+    cohort = cohort or current_cohort()
+    if pdf:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            raise RuntimeError('The PDF export renders the charts with kaleido: pip install kaleido')
+
+    start = time.perf_counter()
+    sections, failures = [], []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(render_section, title, render, cohort, pdf) for title, render, _ in SECTIONS]
+        for (title, _, _), future in zip(SECTIONS, futures):
+            try:
+                section = future.result()
+            except Exception as e:
+                failures.append(f'{title}: {e}')
+                log(f'{title}: failed, {e}')
+                continue
+            charts = sum(block['kind'] in ('plotly', 'image') for block in walk_blocks(section['blocks']))
+            log(f'{title}: {charts} charts in {section["seconds"]:.1f}s')
+            sections.append(section)
+    if failures:
+        raise RuntimeError(f'{len(failures)} sections failed, the report was not written: ' + '; '.join(failures))
+
+    directory = report_dir(cohort)
+    os.makedirs(directory, exist_ok=True)
+    exported = time.strftime('%Y-%m-%d %H:%M')
+    title = f'EHCB CA - Feedback Report ({cohort})'
+    page = report_html(title, f'Exported on {exported}', sections).encode('utf-8')
+    _write_atomic(directory / REPORT_HTML, page)
+    if pdf:
+        write_pdf(directory / f'{REPORT_PDF}.{os.getpid()}.tmp', title, sections)
+        os.replace(directory / f'{REPORT_PDF}.{os.getpid()}.tmp', directory / REPORT_PDF)
+    elif os.path.exists(directory / REPORT_PDF):
+        # A PDF of an earlier export would no longer match the page
+        os.remove(directory / REPORT_PDF)
+    manifest = {
+        'cohort': cohort,
+        'exported': exported,
+        'responses_digest': file_digest(responses_path(cohort)),
+        'pdf': pdf,
+        'sections': [{'title': section['title'], 'seconds': section['seconds']} for section in sections],
+    }
+    _write_atomic(directory / REPORT_MANIFEST, json.dumps(manifest, indent=4).encode('utf-8'))
+    log(f'{directory / REPORT_HTML}: {len(page) / 1024 ** 2:.1f} MB in {time.perf_counter() - start:.1f}s')
+    return directory
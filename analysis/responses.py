@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+
+import pandas as pd
+import streamlit as st
+
+from analysis.instrumentation import timed
+from analysis.paths import RESPONSES_FILE, data_dir
+
+# Millisecond epoch columns converted to datetimes once at load time
+TIMESTAMP_COLUMNS = ['Timestamp', 'Coaching Since']
+
+# Single-choice answers with few distinct values, stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'Role',
+    'Gender',
+    'Nationality',
+    'Residence',
+    'Coaching For',
+    'Played professional basketball?',
+    'With whom did you make the communication [Email exchange]',
+    'With whom did you make the communication [Phone Call]',
+    'With whom did you make the communication [Video Call]',
+    'Please state when you decided signing up',
+    'Should exams be part of the curriculum?',
+    'What kind of content would you prefer from the EHCB Members?',
+    'Which module/lesson would you like to add to the curriculum?',
+    'Which timezone do you live at?',
+    'Did you get bonus lectures?',
+    'Which practice week have you joined',
+]
+
+LIKERT_VALUES = range(1, 6)
+# Bytes hashed by ``tail_digest``
+TAIL_BYTES = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def likert_columns(df):
+    """Numeric columns whose answers all lie on the 1-5 rating scale."""
+    return [column for column in df.columns
+            if pd.api.types.is_numeric_dtype(df[column])
+            and not pd.api.types.is_bool_dtype(df[column])
+            and df[column].notna().any()
+            and df[column].dropna().isin(LIKERT_VALUES).all()]
+
+
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def responses_path(cohort=None):
+    """Responses.json of ``cohort`` (default: the current one)."""
+    return data_dir(cohort) / RESPONSES_FILE
+
+
+def read_responses(filename=None):
+    """Parse Responses.json (of the current cohort) into a compact, typed DataFrame.
+
+    Ratings become nullable 8-bit integers, low-cardinality answers become
+    categoricals and the millisecond timestamps become datetimes. Returns
+    ``(df, footprint)``, footprint being the rows, columns and bytes in
+    memory before and after the conversions.
+    """
+    if filename is None:
+        filename = responses_path()
+    df = pd.read_json(filename, lines=True, convert_dates=False)
+    raw_bytes = memory_footprint(df)
+
+    for column in likert_columns(df):
+        df[column] = df[column].astype('Int8')
+
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            epoch_ms = pd.to_numeric(df[column], errors='coerce')
+            converted = pd.to_datetime(epoch_ms, unit='ms', errors='coerce')
+            # Fall back to parsing the odd answer typed in as a date string
+            as_text = epoch_ms.isna() & df[column].notna()
+            if as_text.any():
+                converted[as_text] = pd.to_datetime(
+                    df.loc[as_text, column].astype(str), errors='coerce')
+            df[column] = converted
+
+    # Missing answers to "Played professional basketball?" mean "No"
+    if 'Played professional basketball?' in df.columns:
+        df['Played professional basketball?'] = df['Played professional basketball?'].fillna(
+            "No")
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+
+    footprint = {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'raw_bytes': raw_bytes,
+        'typed_bytes': memory_footprint(df),
+    }
+    logger.info("Loaded %s: %d rows, %d columns, %.1f KB (%.1f KB untyped)",
+                filename, footprint['rows'], footprint['columns'],
+                footprint['typed_bytes'] / 1024, footprint['raw_bytes'] / 1024)
+    return df, footprint
+
+
+def tail_digest(path, offset):
+    """Hash of the bytes just before ``offset``, to detect a replaced file."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, offset - TAIL_BYTES))
+        return hashlib.sha1(f.read(min(offset, TAIL_BYTES))).hexdigest()
+
+
+def responses_signature(filename=None):
+    """Path, size and modification time of the responses file, as a cache key.
+
+    The path makes the key differ between cohorts, so every cache keyed by
+    it holds one entry per cohort.
+    """
+    filename = responses_path() if filename is None else filename
+    stat = os.stat(filename)
+    return str(filename), stat.st_size, stat.st_mtime_ns
+
+
+# One parsed file per cohort being viewed
+@st.cache_resource(max_entries=4)
+def _load_responses(signature):
+    return read_responses(signature[0])
+
+
+@timed('load')
+def load_responses():
+    """The shared, read-only responses DataFrame.
+
+    The current cohort's file is parsed once per version (see
+    ingest_responses.py) and every section and session gets the same
+    instance. Callers that need extra columns must work on a copy, e.g.
+    ``load_responses().copy(deep=False)``.
+    """
+    return _load_responses(responses_signature())[0]
+
+
+def responses_footprint():
+    """Row/column counts and memory usage in bytes of the shared responses."""
+    return _load_responses(responses_signature())[1]
@@ -1,60 +1,56 @@
-import pandas as pd
 import streamlit as st
 import plotly.express as px
-from pathlib import Path
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-import json
-
-
-@st.cache_data
-def load_satisfaction_data():
-    # Load the satisfaction data from the provided JSON file
-    SATISFACTION_DATA_FILENAME = Path(
-        __file__).parent.parent / 'data' / 'Responses.json'
-    return pd.read_json(SATISFACTION_DATA_FILENAME, lines=True)
+from analysis.figure_cache import cached_figure
+from analysis.aggregates import rating_distribution, rating_summary
+from analysis.filters import filter_caption, filtered_aggregates, filtered_responses
+from analysis.wordclouds import RESPONSES_SOURCE, show_wordcloud
 
 
 def satisfaction_analysis():
-    df = load_satisfaction_data()
+    # Respondents selected in the sidebar filters
+    if not filter_caption():
+        return
+    df = filtered_responses()
+    # Rating charts read the per-question aggregates, not the raw rows
+    aggregates = filtered_aggregates()
 
     # 1. Application Process
     st.header('Satisfaction with Application Process')
 
     # Clarity of Application Instructions
     st.subheader('Clarity of Application Instructions')
-    df_clarity = df['How satisfied were you with the clarity of the application instructions? '].dropna()
-    st.bar_chart(df_clarity.value_counts().sort_index())
+    df_clarity = rating_distribution(aggregates, 'How satisfied were you with the clarity of the application instructions? ')
+    st.bar_chart(df_clarity)
 
     # Smoothness of Registration Process
     st.subheader('Smoothness of Registration Process')
-    df_registration = df['How smooth was the registration process?'].dropna()
-    st.bar_chart(df_registration.value_counts().sort_index())
+    df_registration = rating_distribution(aggregates, 'How smooth was the registration process?')
+    st.bar_chart(df_registration)
 
     # Helpfulness of Initial Contact with Academy Staff
     st.subheader('Helpfulness of Initial Contact with Academy Staff')
-    df_helpfulness = df['How helpful was the initial contact with the academy’s staff? '].dropna()
-    st.bar_chart(df_helpfulness.value_counts().sort_index())
+    df_helpfulness = rating_distribution(aggregates, 'How helpful was the initial contact with the academy’s staff? ')
+    st.bar_chart(df_helpfulness)
 
     # Clarity and Convenience of Payment Options
     st.subheader('Clarity and Convenience of Payment Options')
-    df_payment = df['Were the payment options and processes clear and convenient?'].dropna()
-    st.bar_chart(df_payment.value_counts().sort_index())
+    df_payment = rating_distribution(aggregates, 'Were the payment options and processes clear and convenient?')
+    st.bar_chart(df_payment)
 
     # Satisfaction with the Price of the Academy
     st.subheader('Satisfaction with the Price of the Academy')
-    df_price_satisfaction = df['Were you satisfied with the price of the Academy?'].dropna(
-    )
-    st.bar_chart(df_price_satisfaction.value_counts().sort_index())
+    df_price_satisfaction = rating_distribution(aggregates, 'Were you satisfied with the price of the Academy?')
+    st.bar_chart(df_price_satisfaction)
 
     # Suggested Price for the 5th Generation
     st.subheader('Suggested Price for the 5th Gen')
     df_price_suggestions = df['What would be your suggested price for the 5ht Gen. considering 8 modules and practice weeks?'].dropna()
 
     # Visualizing the distribution with a box plot
-    fig_price_box = px.box(df_price_suggestions, y=df_price_suggestions, title="Distribution of Suggested Prices for 5th Gen",
-                           labels={"y": "Suggested Price"}, points="all")
+    fig_price_box = cached_figure('satisfaction/suggested-price', df_price_suggestions, lambda: px.box(
+        df_price_suggestions, y=df_price_suggestions, title="Distribution of Suggested Prices for 5th Gen",
+        labels={"y": "Suggested Price"}, points="all"))
     st.plotly_chart(fig_price_box)
 
     # Displaying summary statistics
@@ -69,8 +65,9 @@ def satisfaction_analysis():
     df_screening_count = df_screening.value_counts().reset_index()
     df_screening_count.columns = ['Criteria', 'Count']
 
-    fig_screening_bar = px.bar(df_screening_count, x='Count', y='Criteria',
-                               orientation='h', title="Recommended Criteria for Screening New Participants")
+    fig_screening_bar = cached_figure('satisfaction/screening', df_screening_count, lambda: px.bar(
+        df_screening_count, x='Count', y='Criteria', orientation='h',
+        title="Recommended Criteria for Screening New Participants"))
     st.plotly_chart(fig_screening_bar)
 
     # 2. Practice Weeks
@@ -85,39 +82,38 @@ def satisfaction_analysis():
     # Organization of Practice Week with EuroLeague Teams
     st.subheader(
         'How well-organized was the practice week with EuroLeague teams?')
-    df_organization = df['How well-organized was the practice week with EuroLeague teams?'].dropna()
-    st.bar_chart(df_organization.value_counts().sort_index())
+    df_organization = rating_distribution(aggregates, 'How well-organized was the practice week with EuroLeague teams?')
+    st.bar_chart(df_organization)
 
     # Benefit for Coaching Development
     st.subheader(
         'How beneficial was the practice week for your coaching development?')
-    df_benefit = df['How beneficial was the practice week for your coaching development?'].dropna()
-    st.bar_chart(df_benefit.value_counts().sort_index())
+    df_benefit = rating_distribution(aggregates, 'How beneficial was the practice week for your coaching development?')
+    st.bar_chart(df_benefit)
 
     # Interaction with Coaches
     st.subheader(
         'How satisfactory was your interaction with the coaches of the practice week team?')
-    df_interaction = df['How satisfactory was your interaction with the coaches of the practice week team? '].dropna()
-    st.bar_chart(df_interaction.value_counts().sort_index())
+    df_interaction = rating_distribution(aggregates, 'How satisfactory was your interaction with the coaches of the practice week team? ')
+    st.bar_chart(df_interaction)
 
     # Effectiveness of Practice Week Presentations
     st.subheader('How effective were the practice week presentations?')
-    df_presentations = df['How effective were the practice week presentations?'].dropna(
-    )
-    st.bar_chart(df_presentations.value_counts().sort_index())
+    df_presentations = rating_distribution(aggregates, 'How effective were the practice week presentations?')
+    st.bar_chart(df_presentations)
 
     # Out-of-Court Experiences in the City of the Practice Week
     st.subheader(
         'How would you rate the out-of-court experiences in the city of the practice week?')
-    df_out_of_court = df['How would you rate the out-of-court experiences in the city of the practice week?'].dropna()
-    st.bar_chart(df_out_of_court.value_counts().sort_index())
+    df_out_of_court = rating_distribution(aggregates, 'How would you rate the out-of-court experiences in the city of the practice week?')
+    st.bar_chart(df_out_of_court)
 
     # # Support for Operational Aspects of the Practice Week
     # st.subheader(
     #     'Please rate the support provided for operational aspects of the practice week (travel, accommodation, guidance etc.)')
     # df_operational_support = df['Please rate the support provided for operational aspects of the practice week (travel, accommodation, guidance etc.)'].dropna(
     # )
-    # st.bar_chart(df_operational_support.value_counts().sort_index())
+    # st.bar_chart(df_operational_support)
     st.header('Satisfaction with Lessons')
 
     # 4. Lessons
@@ -141,20 +137,20 @@ def satisfaction_analysis():
 
     for lesson in lessons_columns:
         st.subheader(lesson)
-        lesson_counts = df[lesson].value_counts().sort_index()
-        fig_lesson = px.bar(lesson_counts, x=lesson_counts.index, y=lesson_counts.values,
-                            labels={'x': 'Rating', 'y': 'Count'}, title=f'Distribution of Ratings for {lesson}')
+        lesson_counts = rating_distribution(aggregates, lesson)
+        fig_lesson = cached_figure(f'satisfaction/lesson/{lesson}', lesson_counts, lambda: px.bar(
+            lesson_counts, x=lesson_counts.index, y=lesson_counts.values,
+            labels={'x': 'Rating', 'y': 'Count'}, title=f'Distribution of Ratings for {lesson}'))
         st.plotly_chart(fig_lesson)
 
     # Suggested Modules
     st.subheader('Suggested Modules to Add')
     df_suggestions = df['Which module/lesson would you like to add to the curriculum?'].dropna()
-    suggestions_wordcloud = WordCloud(
-        background_color='white').generate(' '.join(df_suggestions))
-    plt.figure(figsize=(10, 5))
-    plt.imshow(suggestions_wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    st.pyplot(plt)
+    text = ' '.join(df_suggestions)
+    if text.strip():
+        show_wordcloud(RESPONSES_SOURCE, text=text, background_color='white')
+    else:
+        st.info('None of the selected respondents suggested a module.')
 
     # 5. Exams
     st.header('Satisfaction with Exams')
@@ -177,196 +173,190 @@ def satisfaction_analysis():
 
     for exam in exams_columns:
         st.subheader(exam)
-        exam_counts = df[exam].value_counts().sort_index()
-        fig_exam = px.bar(exam_counts, x=exam_counts.index, y=exam_counts.values,
-                          labels={'x': 'Rating', 'y': 'Count'}, title=f'Distribution of Ratings for {exam}')
+        exam_counts = rating_distribution(aggregates, exam)
+        fig_exam = cached_figure(f'satisfaction/exam/{exam}', exam_counts, lambda: px.bar(
+            exam_counts, x=exam_counts.index, y=exam_counts.values,
+            labels={'x': 'Rating', 'y': 'Count'}, title=f'Distribution of Ratings for {exam}'))
         st.plotly_chart(fig_exam)
 
    # 6. Lessons - Overall Satisfaction Analysis
     st.subheader('Overall Satisfaction with Lessons')
-    low_rating_counts = {}
-    mean_ratings = {}
-
-    for lesson in lessons_columns:
-        low_rating_counts[lesson] = (df[lesson] < 4).sum()
-        mean_ratings[lesson] = df[lesson].mean()
-
-    df_lessons_ratings = pd.DataFrame({
-        'Lesson': lessons_columns,
-        'Low Ratings (<4)': low_rating_counts.values(),
-        'Mean Rating': mean_ratings.values()
-    }).sort_values(by='Mean Rating', ascending=False)
+    df_lessons_ratings = rating_summary(aggregates, lessons_columns).rename(columns={'Question': 'Lesson'})[
+        ['Lesson', 'Low Ratings (<4)', 'Mean Rating']].sort_values(by='Mean Rating', ascending=False)
 
     # Calculate the overall average rating across all lessons
     overall_mean_lesson_rating = df_lessons_ratings['Mean Rating'].mean()
 
-    # Create the bar chart with the average line
-    fig_lessons_mean = px.bar(df_lessons_ratings, x='Lesson', y='Mean Rating',
-                              title="Average Ratings of Lessons", labels={'Mean Rating': 'Average Rating'},
-                              range_y=[4, 4.5])
-
-    # Add a horizontal line for the overall average rating
-    fig_lessons_mean.add_shape(
-        type="line",
-        x0=-0.5, x1=len(df_lessons_ratings)-0.5,  # X-axis spans the whole plot
-        # Y-axis fixed at the mean value
-        y0=overall_mean_lesson_rating, y1=overall_mean_lesson_rating,
-        line=dict(color="red", width=2, dash="dash"),  # Line style
-    )
-
-    # Add annotation for the average line
-    fig_lessons_mean.add_annotation(
-        text=f"Overall Avg: {overall_mean_lesson_rating:.2f}",
-        x=len(df_lessons_ratings)-1, y=overall_mean_lesson_rating,
-        showarrow=False,
-        yshift=10,  # Position adjustment
-        font=dict(color="blue")
-    )
-
-    st.plotly_chart(fig_lessons_mean)
-
-    fig_low_ratings_lessons = px.bar(df_lessons_ratings, x='Lesson', y='Low Ratings (<4)',
-                                     title="Count of Low Ratings for Lessons", labels={'Low Ratings (<4)': 'Count of Low Ratings'})
-    overall_avg_low_ratings_lessons = df_lessons_ratings['Low Ratings (<4)'].mean(
-    )
-
-    # Add a horizontal line for the overall average count of low ratings
-    fig_low_ratings_lessons.add_shape(
-        type="line",
-        x0=-0.5, x1=len(df_lessons_ratings)-0.5,
-        y0=overall_avg_low_ratings_lessons, y1=overall_avg_low_ratings_lessons,
-        line=dict(color="red", width=2, dash="dash"),
-    )
-
-    # Add annotation for the average line
-    fig_low_ratings_lessons.add_annotation(
-        text=f"Overall Avg Low Ratings: {overall_avg_low_ratings_lessons:.2f}",
-        x=len(df_lessons_ratings)-1, y=overall_avg_low_ratings_lessons,
-        showarrow=False,
-        yshift=10,
-        font=dict(color="blue")
-    )
-    st.plotly_chart(fig_low_ratings_lessons)
+    def build_lessons_mean():
+        # Create the bar chart with the average line
+        fig_lessons_mean = px.bar(df_lessons_ratings, x='Lesson', y='Mean Rating',
+                                  title="Average Ratings of Lessons", labels={'Mean Rating': 'Average Rating'},
+                                  range_y=[4, 4.5])
+
+        # Add a horizontal line for the overall average rating
+        fig_lessons_mean.add_shape(
+            type="line",
+            x0=-0.5, x1=len(df_lessons_ratings)-0.5,  # X-axis spans the whole plot
+            # Y-axis fixed at the mean value
+            y0=overall_mean_lesson_rating, y1=overall_mean_lesson_rating,
+            line=dict(color="red", width=2, dash="dash"),  # Line style
+        )
 
-    # 7. Exams - Overall Satisfaction Analysis
-    st.subheader('Overall Satisfaction with Exams')
-    low_rating_counts_exams = {}
-    mean_ratings_exams = {}
+        # Add annotation for the average line
+        fig_lessons_mean.add_annotation(
+            text=f"Overall Avg: {overall_mean_lesson_rating:.2f}",
+            x=len(df_lessons_ratings)-1, y=overall_mean_lesson_rating,
+            showarrow=False,
+            yshift=10,  # Position adjustment
+            font=dict(color="blue")
+        )
+        return fig_lessons_mean
 
-    for exam in exams_columns:
-        low_rating_counts_exams[exam] = (df[exam] < 4).sum()
-        mean_ratings_exams[exam] = df[exam].mean()
+    st.plotly_chart(cached_figure(
+        'satisfaction/lessons-mean', df_lessons_ratings, build_lessons_mean))
 
-    df_exams_ratings = pd.DataFrame({
-        'Exam': exams_columns,
-        'Low Ratings (<4)': low_rating_counts_exams.values(),
-        'Mean Rating': mean_ratings_exams.values()
-    }).sort_values(by='Mean Rating', ascending=False)
+    def build_low_ratings_lessons():
+        fig_low_ratings_lessons = px.bar(df_lessons_ratings, x='Lesson', y='Low Ratings (<4)',
+                                         title="Count of Low Ratings for Lessons", labels={'Low Ratings (<4)': 'Count of Low Ratings'})
+        overall_avg_low_ratings_lessons = df_lessons_ratings['Low Ratings (<4)'].mean(
+        )
+
+        # Add a horizontal line for the overall average count of low ratings
+        fig_low_ratings_lessons.add_shape(
+            type="line",
+            x0=-0.5, x1=len(df_lessons_ratings)-0.5,
+            y0=overall_avg_low_ratings_lessons, y1=overall_avg_low_ratings_lessons,
+            line=dict(color="red", width=2, dash="dash"),
+        )
+
+        # Add annotation for the average line
+        fig_low_ratings_lessons.add_annotation(
+            text=f"Overall Avg Low Ratings: {overall_avg_low_ratings_lessons:.2f}",
+            x=len(df_lessons_ratings)-1, y=overall_avg_low_ratings_lessons,
+            showarrow=False,
+            yshift=10,
+            font=dict(color="blue")
+        )
+        return fig_low_ratings_lessons
+
+    st.plotly_chart(cached_figure(
+        'satisfaction/lessons-low', df_lessons_ratings, build_low_ratings_lessons))
+
+    # 7. Exams - Overall Satisfaction Analysis
+    st.subheader('Overall Satisfaction with Exams')
+    df_exams_ratings = rating_summary(aggregates, exams_columns).rename(columns={'Question': 'Exam'})[
+        ['Exam', 'Low Ratings (<4)', 'Mean Rating']].sort_values(by='Mean Rating', ascending=False)
 
     # Calculate the overall average rating across all exams
     overall_mean_exam_rating = df_exams_ratings['Mean Rating'].mean()
 
-    # Create the bar chart with the average line
-    fig_exams_mean = px.bar(df_exams_ratings, x='Exam', y='Mean Rating',
-                            title="Average Ratings of Exams", labels={'Mean Rating': 'Average Rating'},
-                            range_y=[4, 4.15])
-
-    # Add a horizontal line for the overall average rating
-    fig_exams_mean.add_shape(
-        type="line",
-        x0=-0.5, x1=len(df_exams_ratings)-0.5,
-        y0=overall_mean_exam_rating, y1=overall_mean_exam_rating,
-        line=dict(color="red", width=2, dash="dash"),
-    )
-
-    # Add annotation for the average line
-    fig_exams_mean.add_annotation(
-        text=f"Overall Avg: {overall_mean_exam_rating:.2f}",
-        x=len(df_exams_ratings)-1, y=overall_mean_exam_rating,
-        showarrow=False,
-        yshift=10,
-        font=dict(color="blue")
-    )
-
-    st.plotly_chart(fig_exams_mean)
-
-    fig_low_ratings_exams = px.bar(df_exams_ratings, x='Exam', y='Low Ratings (<4)',
-                                   title="Count of Low Ratings for Exams", labels={'Low Ratings (<4)': 'Count of Low Ratings'})
-    overall_avg_low_ratings = df_exams_ratings['Low Ratings (<4)'].mean()
-
-    # Add a horizontal line for the overall average count of low ratings
-    fig_low_ratings_exams.add_shape(
-        type="line",
-        x0=-0.5, x1=len(df_exams_ratings)-0.5,
-        y0=overall_avg_low_ratings, y1=overall_avg_low_ratings,
-        line=dict(color="red", width=2, dash="dash"),
-    )
-
-    # Add annotation for the average line
-    fig_low_ratings_exams.add_annotation(
-        text=f"Overall Avg Low Ratings: {overall_avg_low_ratings:.2f}",
-        x=len(df_exams_ratings)-1, y=overall_avg_low_ratings,
-        showarrow=False,
-        yshift=10,
-        font=dict(color="blue")
-    )
-    st.plotly_chart(fig_low_ratings_exams)
+    def build_exams_mean():
+        # Create the bar chart with the average line
+        fig_exams_mean = px.bar(df_exams_ratings, x='Exam', y='Mean Rating',
+                                title="Average Ratings of Exams", labels={'Mean Rating': 'Average Rating'},
+                                range_y=[4, 4.15])
+
+        # Add a horizontal line for the overall average rating
+        fig_exams_mean.add_shape(
+            type="line",
+            x0=-0.5, x1=len(df_exams_ratings)-0.5,
+            y0=overall_mean_exam_rating, y1=overall_mean_exam_rating,
+            line=dict(color="red", width=2, dash="dash"),
+        )
+
+        # Add annotation for the average line
+        fig_exams_mean.add_annotation(
+            text=f"Overall Avg: {overall_mean_exam_rating:.2f}",
+            x=len(df_exams_ratings)-1, y=overall_mean_exam_rating,
+            showarrow=False,
+            yshift=10,
+            font=dict(color="blue")
+        )
+        return fig_exams_mean
+
+    st.plotly_chart(cached_figure(
+        'satisfaction/exams-mean', df_exams_ratings, build_exams_mean))
+
+    def build_low_ratings_exams():
+        fig_low_ratings_exams = px.bar(df_exams_ratings, x='Exam', y='Low Ratings (<4)',
+                                       title="Count of Low Ratings for Exams", labels={'Low Ratings (<4)': 'Count of Low Ratings'})
+        overall_avg_low_ratings = df_exams_ratings['Low Ratings (<4)'].mean()
+
+        # Add a horizontal line for the overall average count of low ratings
+        fig_low_ratings_exams.add_shape(
+            type="line",
+            x0=-0.5, x1=len(df_exams_ratings)-0.5,
+            y0=overall_avg_low_ratings, y1=overall_avg_low_ratings,
+            line=dict(color="red", width=2, dash="dash"),
+        )
+
+        # Add annotation for the average line
+        fig_low_ratings_exams.add_annotation(
+            text=f"Overall Avg Low Ratings: {overall_avg_low_ratings:.2f}",
+            x=len(df_exams_ratings)-1, y=overall_avg_low_ratings,
+            showarrow=False,
+            yshift=10,
+            font=dict(color="blue")
+        )
+        return fig_low_ratings_exams
+
+    st.plotly_chart(cached_figure(
+        'satisfaction/exams-low', df_exams_ratings, build_low_ratings_exams))
 
     # 8. Time Zones & Scheduling
     st.header('Satisfaction with Time Zones & Scheduling')
     # Preferred Days for Lessons
     st.subheader('Preferred Days for Lessons')
-    df_days = df['Which days did you prefer the lessons the most?'].dropna()
-    fig_days = px.bar(df_days.value_counts().sort_index(), x=df_days.value_counts().sort_index().index,
-                      y=df_days.value_counts().sort_index().values,
+    df_days = df['Which days did you prefer the lessons the most?'].dropna().value_counts().sort_index()
+    fig_days = cached_figure('satisfaction/preferred-days', df_days, lambda: px.bar(df_days, x=df_days.index,
+                      y=df_days.values,
                       labels={'x': 'Preferred Day', 'y': 'Count'},
-                      title="Preferred Days for Lessons")
+                      title="Preferred Days for Lessons"))
     st.plotly_chart(fig_days)
 
     # Preferred Times for Weekdays
     st.subheader('Preferred Times for Weekdays (Central European Time)')
-    df_weekday_times = df['On weekdays, which time period fitted you the most? [Central European Time]'].dropna()
-    fig_weekday_times = px.bar(df_weekday_times.value_counts().sort_index(), x=df_weekday_times.value_counts().sort_index().index,
-                               y=df_weekday_times.value_counts().sort_index().values,
+    df_weekday_times = df['On weekdays, which time period fitted you the most? [Central European Time]'].dropna().value_counts().sort_index()
+    fig_weekday_times = cached_figure('satisfaction/weekday-times', df_weekday_times, lambda: px.bar(df_weekday_times, x=df_weekday_times.index,
+                               y=df_weekday_times.values,
                                labels={'x': 'Preferred Time', 'y': 'Count'},
-                               title="Preferred Times for Lessons on Weekdays (CET)")
+                               title="Preferred Times for Lessons on Weekdays (CET)"))
     st.plotly_chart(fig_weekday_times)
 
     # Preferred Times for Weekends
     st.subheader('Preferred Times for Weekends (Central European Time)')
-    df_weekend_times = df['At weekends, which time period fitted you the most? [Central European Time]'].dropna()
-    fig_weekend_times = px.bar(df_weekend_times.value_counts().sort_index(), x=df_weekend_times.value_counts().sort_index().index,
-                               y=df_weekend_times.value_counts().sort_index().values,
+    df_weekend_times = df['At weekends, which time period fitted you the most? [Central European Time]'].dropna().value_counts().sort_index()
+    fig_weekend_times = cached_figure('satisfaction/weekend-times', df_weekend_times, lambda: px.bar(df_weekend_times, x=df_weekend_times.index,
+                               y=df_weekend_times.values,
                                labels={'x': 'Preferred Time', 'y': 'Count'},
-                               title="Preferred Times for Lessons on Weekends (CET)")
+                               title="Preferred Times for Lessons on Weekends (CET)"))
     st.plotly_chart(fig_weekend_times)
 
     # Ability to Attend Lessons
     st.subheader('Ability to Attend Lessons')
-    df_attendance = df['Were you able to attend most of the lessons as per your personal schedule?'].dropna()
-    fig_attendance = px.pie(df_attendance.value_counts(), values=df_attendance.value_counts().values,
-                            names=df_attendance.value_counts().index,
-                            title="Ability to Attend Lessons as per Personal Schedule")
+    df_attendance = rating_distribution(aggregates, 'Were you able to attend most of the lessons as per your personal schedule?').sort_values(ascending=False)
+    fig_attendance = cached_figure('satisfaction/attendance', df_attendance, lambda: px.pie(df_attendance, values=df_attendance.values,
+                            names=df_attendance.index,
+                            title="Ability to Attend Lessons as per Personal Schedule"))
     st.plotly_chart(fig_attendance)
 
     # Satisfaction with Peer Attendance
     st.subheader('Satisfaction with Peer Attendance')
-    df_peer_attendance = df['How satisfied were you with the general attendance of your peers in the lessons? '].dropna()
-    fig_peer_attendance = px.bar(df_peer_attendance.value_counts().sort_index(), x=df_peer_attendance.value_counts().sort_index().index,
-                                 y=df_peer_attendance.value_counts().sort_index().values,
+    df_peer_attendance = rating_distribution(aggregates, 'How satisfied were you with the general attendance of your peers in the lessons? ')
+    fig_peer_attendance = cached_figure('satisfaction/peer-attendance', df_peer_attendance, lambda: px.bar(df_peer_attendance, x=df_peer_attendance.index,
+                                 y=df_peer_attendance.values,
                                  labels={'x': 'Satisfaction Level',
                                          'y': 'Count'},
-                                 title="Satisfaction with Peer Attendance")
+                                 title="Satisfaction with Peer Attendance"))
     st.plotly_chart(fig_peer_attendance)
 
     # Overall Scheduling Satisfaction
     st.subheader('Overall Scheduling Satisfaction')
-    df_overall_scheduling = df['How would you rate the overall scheduling of the lessons?'].dropna(
-    )
-    fig_overall_scheduling = px.bar(df_overall_scheduling.value_counts().sort_index(), x=df_overall_scheduling.value_counts().sort_index().index,
-                                    y=df_overall_scheduling.value_counts().sort_index().values,
+    df_overall_scheduling = rating_distribution(aggregates, 'How would you rate the overall scheduling of the lessons?')
+    fig_overall_scheduling = cached_figure('satisfaction/overall-scheduling', df_overall_scheduling, lambda: px.bar(df_overall_scheduling, x=df_overall_scheduling.index,
+                                    y=df_overall_scheduling.values,
                                     labels={'x': 'Rating', 'y': 'Count'},
-                                    title="Overall Satisfaction with Lesson Scheduling")
+                                    title="Overall Satisfaction with Lesson Scheduling"))
     st.plotly_chart(fig_overall_scheduling)
 
     # # Additional Comments on Scheduling
@@ -378,123 +368,107 @@ def satisfaction_analysis():
     st.header('Satisfaction with Content Quality')
     # 1. Satisfaction with Collaboration with University of Belgrade
     st.header('Satisfaction with Collaboration with University of Belgrade')
-    if 'How satisfied were you about the collaboration with University of Belgrade?' in df.columns:
-        df_collab_belgrade = df['How satisfied were you about the collaboration with University of Belgrade?'].dropna(
-        )
-        st.bar_chart(df_collab_belgrade.value_counts().sort_index())
+    if 'How satisfied were you about the collaboration with University of Belgrade?' in aggregates['questions']:
+        df_collab_belgrade = rating_distribution(aggregates, 'How satisfied were you about the collaboration with University of Belgrade?')
+        st.bar_chart(df_collab_belgrade)
 
     # 2. Satisfaction with Professors of University of Belgrade
     st.header('Satisfaction with Professors of University of Belgrade')
-    if 'How satisfied were you with the professors of the University of Belgrade?' in df.columns:
-        df_professors_belgrade = df['How satisfied were you with the professors of the University of Belgrade?'].dropna(
-        )
-        st.bar_chart(df_professors_belgrade.value_counts().sort_index())
+    if 'How satisfied were you with the professors of the University of Belgrade?' in aggregates['questions']:
+        df_professors_belgrade = rating_distribution(aggregates, 'How satisfied were you with the professors of the University of Belgrade?')
+        st.bar_chart(df_professors_belgrade)
 
     # 3. Satisfaction with Exams in General
     st.header('Satisfaction with Exams in General')
-    if 'How satisfied were you with the exams in general?' in df.columns:
-        df_exams_general = df['How satisfied were you with the exams in general?'].dropna(
-        )
-        st.bar_chart(df_exams_general.value_counts().sort_index())
+    if 'How satisfied were you with the exams in general?' in aggregates['questions']:
+        df_exams_general = rating_distribution(aggregates, 'How satisfied were you with the exams in general?')
+        st.bar_chart(df_exams_general)
 
     # 4. Effectiveness of EHCB Members Online Lectures
     st.header("Effectiveness of EHCB Members Online Lectures")
-    df_online_lectures = pd.read_json('data/EHCB_Members_Online.json')
-    # Load the JSON file
-    with open('data/EHCB_Members_Online.json', 'r') as file:
-        json_online_lectures = json.load(file)
-
-    # Convert the JSON data into a DataFrame
-    df_online_lectures = pd.DataFrame(json_online_lectures)
-
-    # Display the data as a bar chart
-    st.bar_chart(
-        df_online_lectures['EHCB_Members_Online_Lectures'].value_counts().sort_index())
+    if "How effective was the EHCB Members' Online Lectures? " in aggregates['questions']:
+        df_online_lectures = rating_distribution(aggregates, "How effective was the EHCB Members' Online Lectures? ")
+        st.bar_chart(df_online_lectures)
 
     # # 5. Effectiveness of EHCB Coaches Congress
     # st.header("Effectiveness of EHCB Coaches Congress")
-    # if "How effective was the EHCB Coaches Congress in providing valuable learning experiences?" in df.columns:
-    #     df_coaches_congress = df["How effective was the EHCB Coaches Congress in providing valuable learning experiences?"].dropna()
-    #     st.bar_chart(df_coaches_congress.value_counts().sort_index())
+    # if "How effective was the EHCB Coaches Congress in providing valuable learning experiences?" in aggregates['questions']:
+    #     df_coaches_congress = rating_distribution(aggregates, "How effective was the EHCB Coaches Congress in providing valuable learning experiences?")
+    #     st.bar_chart(df_coaches_congress)
 
     # # 6. Effectiveness of Panels and Masterclasses at the Congress
     # st.header("Effectiveness of Panels and Masterclasses at the Congress")
-    # if "How effective were the panels and masterclasses at the Congress?" in df.columns:
-    #     df_panels_masterclasses = df["How effective were the panels and masterclasses at the Congress?"].dropna()
-    #     st.bar_chart(df_panels_masterclasses.value_counts().sort_index())
+    # if "How effective were the panels and masterclasses at the Congress?" in aggregates['questions']:
+    #     df_panels_masterclasses = rating_distribution(aggregates, "How effective were the panels and masterclasses at the Congress?")
+    #     st.bar_chart(df_panels_masterclasses)
 
     # # 7. Value of Networking Opportunity at the Congress
     # st.header("Value of Networking Opportunity at the Congress")
-    # if "How valuable was the networking opportunity provided at the Congress?" in df.columns:
-    #     df_networking_congress = df["How valuable was the networking opportunity provided at the Congress?"].dropna()
-    #     st.bar_chart(df_networking_congress.value_counts().sort_index())
+    # if "How valuable was the networking opportunity provided at the Congress?" in aggregates['questions']:
+    #     df_networking_congress = rating_distribution(aggregates, "How valuable was the networking opportunity provided at the Congress?")
+    #     st.bar_chart(df_networking_congress)
 
     # 8. Satisfaction with General Attendance of Peers
     st.header("Satisfaction with General Attendance of Peers")
-    if "How satisfied were you with the general attendance of your peers in the lessons? " in df.columns:
-        df_attendance_peers = df["How satisfied were you with the general attendance of your peers in the lessons? "].dropna(
-        )
-        st.bar_chart(df_attendance_peers.value_counts().sort_index())
+    if "How satisfied were you with the general attendance of your peers in the lessons? " in aggregates['questions']:
+        df_attendance_peers = rating_distribution(aggregates, "How satisfied were you with the general attendance of your peers in the lessons? ")
+        st.bar_chart(df_attendance_peers)
 
     # 9. Overall Scheduling of Lessons
     st.header("Overall Scheduling of Lessons")
-    if "How would you rate the overall scheduling of the lessons?" in df.columns:
-        df_scheduling_lessons = df["How would you rate the overall scheduling of the lessons?"].dropna(
-        )
-        st.bar_chart(df_scheduling_lessons.value_counts().sort_index())
+    if "How would you rate the overall scheduling of the lessons?" in aggregates['questions']:
+        df_scheduling_lessons = rating_distribution(aggregates, "How would you rate the overall scheduling of the lessons?")
+        st.bar_chart(df_scheduling_lessons)
 
     # 10. Value of Bonus Lectures
     st.header("Value of Bonus Lectures")
-    if "How valuable did you find the Bonus Lectures?" in df.columns:
-        df_bonus_lectures_value = df["How valuable did you find the Bonus Lectures?"].dropna(
-        )
-        st.bar_chart(df_bonus_lectures_value.value_counts().sort_index())
+    if "How valuable did you find the Bonus Lectures?" in aggregates['questions']:
+        df_bonus_lectures_value = rating_distribution(aggregates, "How valuable did you find the Bonus Lectures?")
+        st.bar_chart(df_bonus_lectures_value)
 
     # 11. Relevance of Bonus Lecture Topics
     st.header("Relevance of Bonus Lecture Topics")
-    if "Were the topics covered in the Bonus Lectures relevant to your coaching needs / expectations? " in df.columns:
-        df_bonus_lectures_relevance = df["Were the topics covered in the Bonus Lectures relevant to your coaching needs / expectations? "].dropna()
-        st.bar_chart(df_bonus_lectures_relevance.value_counts().sort_index())
+    if "Were the topics covered in the Bonus Lectures relevant to your coaching needs / expectations? " in aggregates['questions']:
+        df_bonus_lectures_relevance = rating_distribution(aggregates, "Were the topics covered in the Bonus Lectures relevant to your coaching needs / expectations? ")
+        st.bar_chart(df_bonus_lectures_relevance)
 
     # 12. User-Friendliness of Zoom
     st.header("User-Friendliness of Zoom")
-    if "How user-friendly was Zoom?" in df.columns:
-        df_zoom_user_friendly = df["How user-friendly was Zoom?"].dropna()
-        st.bar_chart(df_zoom_user_friendly.value_counts().sort_index())
+    if "How user-friendly was Zoom?" in aggregates['questions']:
+        df_zoom_user_friendly = rating_distribution(aggregates, "How user-friendly was Zoom?")
+        st.bar_chart(df_zoom_user_friendly)
 
     # 13. User-Friendliness of MS Teams
     st.header("User-Friendliness of MS Teams")
-    if "How user-friendly was MS Teams?" in df.columns:
-        df_ms_teams_user_friendly = df["How user-friendly was MS Teams?"].dropna()
-        st.bar_chart(df_ms_teams_user_friendly.value_counts().sort_index())
+    if "How user-friendly was MS Teams?" in aggregates['questions']:
+        df_ms_teams_user_friendly = rating_distribution(aggregates, "How user-friendly was MS Teams?")
+        st.bar_chart(df_ms_teams_user_friendly)
 
     # # 14. Effectiveness of Communication Channels
     # st.header("Effectiveness of Communication Channels")
-    # if "How effective were the communication channels (WhatsApp, email, etc.)?" in df.columns:
+    # if "How effective were the communication channels (WhatsApp, email, etc.)?" in aggregates['questions']:
     #     df_communication_channels = df["How effective were the communication channels (WhatsApp, email, etc.)?"].dropna(
     #     )
     #     st.bar_chart(df_communication_channels.value_counts().sort_index())
 
     # 15. Accessibility of Recorded Lectures and Materials
     st.header("Accessibility of Recorded Lectures and Materials")
-    if "How accessible were the recorded lectures and materials? " in df.columns:
-        df_accessibility_materials = df["How accessible were the recorded lectures and materials? "].dropna(
-        )
-        st.bar_chart(df_accessibility_materials.value_counts().sort_index())
+    if "How accessible were the recorded lectures and materials? " in aggregates['questions']:
+        df_accessibility_materials = rating_distribution(aggregates, "How accessible were the recorded lectures and materials? ")
+        st.bar_chart(df_accessibility_materials)
 
     # # 16. Overall Technical Support
     # st.header("Overall Technical Support")
-    # if "Please rate the overall technical support provided during the courses." in df.columns:
+    # if "Please rate the overall technical support provided during the courses." in aggregates['questions']:
     #     df_technical_support = df["Please rate the overall technical support provided during the courses."].dropna(
     #     )
     #     st.bar_chart(df_technical_support.value_counts().sort_index())
 
     # 17. Support for Operational Aspects of the Academy
     st.header("Support for Operational Aspects of the Academy")
-    if "Please rate the support provided for operational aspects of the academy" in df.columns:
-        df_operational_support = df["Please rate the support provided for operational aspects of the academy"].dropna(
-        )
-        st.bar_chart(df_operational_support.value_counts().sort_index())
+    if "Please rate the support provided for operational aspects of the academy" in aggregates['questions']:
+        df_operational_support = rating_distribution(aggregates, "Please rate the support provided for operational aspects of the academy")
+        st.bar_chart(df_operational_support)
 
     # 10. Overall Program
     st.header('Satisfaction with Overall Program')
@@ -506,21 +480,14 @@ def satisfaction_analysis():
     ]
 
     for column in overall_program_columns:
-        if column in df.columns:
+        if column in aggregates['questions']:
             st.subheader(f'{column}')
-            df_overall_program = df[column].dropna()
-            st.bar_chart(df_overall_program.value_counts().sort_index())
+            df_overall_program = rating_distribution(aggregates, column)
+            st.bar_chart(df_overall_program)
         else:
             st.write(f"Column '{column}' not found in the dataset.")
 
-    # Load the JSON file
-    with open('data/How_much_knowledge_did_you_gain_from_the_modules.json', 'r') as f:
-        data = json.load(f)
-
-    # Extract the data
-    df_knowledge_gained = pd.DataFrame(data)
-
-    # Display the bar chart
     st.header("Knowledge Gained from EHCB Coaches Academy's Modules")
-    st.bar_chart(
-        df_knowledge_gained['How_much_knowledge_did_you_gain_from_the_modules'].value_counts().sort_index())
+    if "How much knowledge did you gain from the EHCB Coaches Academy's  modules?" in aggregates['questions']:
+        df_knowledge_gained = rating_distribution(aggregates, "How much knowledge did you gain from the EHCB Coaches Academy's  modules?")
+        st.bar_chart(df_knowledge_gained)
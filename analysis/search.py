@@ -0,0 +1,273 @@
+"""Full-text search over the answers to the open-ended questions.
+
+An inverted index maps every term to the answers containing it and how often;
+queries are ranked with BM25. Query words also match the longer words they
+begin, so that "exam" finds "exams" and "examination". The index covers the per-question CSVs of
+analysis.comments. Where a question's answers are also a column of
+open_ended_all_responses.csv, whose rows are the rows of Responses.json, every
+answer keeps the respondent it came from so that results can be filtered by
+Role, Nationality or Gender.
+
+The index is persisted in the cohort's cache directory and updated incrementally: on
+load, only the questions whose files changed are re-read, and of those only
+the answers whose text changed are re-indexed.
+"""
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+import pandas as pd
+import streamlit as st
+
+from analysis.comments import COMMENT_FILES, GENERIC_RESPONSES, comments_signature
+from analysis.instrumentation import timed
+from analysis.paths import cache_dir, data_dir
+
+SEARCH_INDEX_FILE = 'search_index.json'
+SEARCH_INDEX_VERSION = 1
+COMBINED_FILENAME = 'open_ended_all_responses.csv'
+RESPONDENT_ATTRIBUTES = ['Role', 'Nationality', 'Gender']
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_WORDS = 30
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_term(word):
+    """Case- and accent-insensitive form of a word ("Málaga" -> "malaga")."""
+    decomposed = unicodedata.normalize('NFKD', word.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return [normalize_term(word) for word in TOKEN_PATTERN.findall(text)]
+
+
+def is_generic(text):
+    stripped = text.strip()
+    return not stripped or stripped.lower() in GENERIC_RESPONSES
+
+
+def question_answers(directory, filename, combined):
+    """(respondent row or None, answer) pairs of a question, in file order.
+
+    Answers are linked to respondents when the question's column in the
+    combined file holds exactly the answers of its own CSV.
+    """
+    answers = pd.read_csv(os.path.join(directory, filename)).iloc[:, 0].dropna().astype(str)
+    if combined is not None and filename in combined.columns:
+        column = combined[filename].dropna().astype(str)
+        if column.str.strip().tolist() == answers.str.strip().tolist():
+            return list(zip(column.index.tolist(), column.tolist()))
+    return [(None, answer) for answer in answers]
+
+
+def source_signatures(directory=None):
+    """Per question, the signature of its CSV plus that of the combined file."""
+    directory = directory or data_dir()
+    try:
+        stat = os.stat(os.path.join(directory, COMBINED_FILENAME))
+        combined = [stat.st_size, stat.st_mtime_ns]
+    except FileNotFoundError:
+        combined = None
+    return {question: [list(signature[1:]), combined]
+            for question, signature in zip(COMMENT_FILES, comments_signature(directory))}
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking of the open-ended answers."""
+
+    def __init__(self):
+        # id -> [question, respondent row or None, text, length in terms]
+        self.documents = {}
+        # term -> {id: occurrences}
+        self.postings = defaultdict(dict)
+        # question -> signature of the files it was indexed from
+        self.sources = {}
+        self.total_length = 0
+        # Sorted terms for prefix lookups, rebuilt after changes
+        self._vocabulary = None
+
+    def __len__(self):
+        return len(self.documents)
+
+    # 1. Building and updating
+    def add(self, doc_id, question, respondent, text):
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            self.postings[term][doc_id] = count
+        length = sum(terms.values())
+        self._vocabulary = None
+        self.documents[doc_id] = [question, respondent, text, length]
+        self.total_length += length
+
+    def remove(self, doc_id):
+        _, _, text, length = self.documents.pop(doc_id)
+        for term in set(tokenize(text)):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= length
+        self._vocabulary = None
+
+    def update(self, directory=None):
+        """Re-index the questions whose files changed; True if anything did."""
+        directory = directory or data_dir()
+        signatures = source_signatures(directory)
+        stale = [question for question in COMMENT_FILES
+                 if self.sources.get(question) != signatures[question]]
+        stale += [question for question in self.sources if question not in signatures]
+        if not stale:
+            return False
+
+        combined_path = os.path.join(directory, COMBINED_FILENAME)
+        combined = pd.read_csv(combined_path) if os.path.exists(combined_path) else None
+        by_question = defaultdict(list)
+        for doc_id, document in self.documents.items():
+            by_question[document[0]].append(doc_id)
+        for question in stale:
+            current = {}
+            if question in signatures and signatures[question][0][0] is not None:
+                position = list(COMMENT_FILES).index(question)
+                answers = question_answers(directory, COMMENT_FILES[question], combined)
+                for row, (respondent, text) in enumerate(answers):
+                    if not is_generic(text):
+                        current[f'{position}:{row}'] = (respondent, text)
+            for doc_id in by_question.get(question, []):
+                if current.get(doc_id) != tuple(self.documents[doc_id][1:3]):
+                    self.remove(doc_id)
+            for doc_id, (respondent, text) in current.items():
+                if doc_id not in self.documents:
+                    self.add(doc_id, question, respondent, text)
+            if question in signatures:
+                self.sources[question] = signatures[question]
+            else:
+                self.sources.pop(question, None)
+        return True
+
+    # 2. Persistence
+    def save(self, path=None):
+        path = path or cache_dir() / SEARCH_INDEX_FILE
+        # Write to a temporary file first so concurrent readers never see a partial index
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': SEARCH_INDEX_VERSION, 'sources': self.sources,
+                       'documents': self.documents, 'postings': self.postings}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None):
+        """The persisted index, or an empty one if there is none (or it is outdated)."""
+        path = path or cache_dir() / SEARCH_INDEX_FILE
+        index = cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return index
+        if data.get('version') != SEARCH_INDEX_VERSION:
+            return index
+        index.sources = data['sources']
+        index.documents = data['documents']
+        index.postings.update(data['postings'])
+        index.total_length = sum(document[3] for document in index.documents.values())
+        return index
+
+    # 3. Queries
+    def expand(self, term):
+        """Indexed terms starting with ``term``."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + '\U0010ffff')
+        return self._vocabulary[start:end]
+
+    def search(self, query, questions=None, respondents=None, limit=None):
+        """Answers matching any term of ``query``, best BM25 score first.
+
+        ``questions`` restricts the results to some questions and
+        ``respondents`` to the answers of some rows of Responses.json (which
+        excludes the answers not linked to a respondent). Returns a DataFrame
+        with the columns Question, Respondent, Score and Text.
+        """
+        terms = {expanded for term in tokenize(query) for expanded in self.expand(term)}
+        scores = defaultdict(float)
+        if self.documents:
+            average_length = self.total_length / len(self.documents)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (len(self.documents) - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, count in postings.items():
+                    length = self.documents[doc_id][3]
+                    scores[doc_id] += idf * count * (BM25_K1 + 1) / (
+                        count + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+
+        if questions is not None:
+            questions = set(questions)
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if self.documents[doc_id][0] in questions}
+        if respondents is not None:
+            respondents = set(respondents)
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if self.documents[doc_id][1] in respondents}
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return pd.DataFrame({
+            'Question': [self.documents[doc_id][0] for doc_id, _ in ranked],
+            'Respondent': pd.array([self.documents[doc_id][1] for doc_id, _ in ranked], dtype='Int64'),
+            'Score': [score for _, score in ranked],
+            'Text': [self.documents[doc_id][2] for doc_id, _ in ranked],
+        })
+
+
+def snippet(text, query, words=SNIPPET_WORDS):
+    """Up to ``words`` words of ``text`` around the first match, matches in bold."""
+    terms = tuple(set(tokenize(query)))
+    matches = list(TOKEN_PATTERN.finditer(text))
+    hits = [i for i, match in enumerate(matches) if terms and normalize_term(match.group()).startswith(terms)]
+    first = max(0, min(hits[0] - words // 3, len(matches) - words)) if hits else 0
+    last = min(len(matches), first + words)
+    start = matches[first].start() if first else 0
+    end = matches[last - 1].end() if last < len(matches) else len(text)
+
+    parts = ['…'] if first else []
+    position = start
+    for i in hits:
+        if first <= i < last:
+            match = matches[i]
+            parts += [text[position:match.start()], f'**{match.group()}**']
+            position = match.end()
+    parts.append(text[position:end])
+    if last < len(matches):
+        parts.append('…')
+    return ' '.join(''.join(parts).split())
+
+
+@st.cache_resource(max_entries=4)
+def _load_search_index(directory, signature):
+    path = os.path.join(directory, '.cache', SEARCH_INDEX_FILE)
+    index = SearchIndex.load(path)
+    if index.update(directory):
+        index.save(path)
+    return index
+
+
+@timed('load')
+def load_search_index():
+    """The search index of the current cohort's answers, loaded and updated once per version."""
+    directory = data_dir()
+    return _load_search_index(str(directory), json.dumps(source_signatures(directory)))
@@ -0,0 +1,39 @@
+import importlib
+
+import streamlit as st
+
+# Report sections: title, "module:function" rendering it and the rough size
+# shown before a section is loaded in the one-page view. Section modules are
+# imported on first use, so pandas, plotly, wordcloud etc. are not loaded
+# until a section actually runs.
+SECTIONS = [
+    ("Summary", "analysis.summary:summary", "about 15 charts and a word cloud"),
+    ("Demographics", "analysis.demographics:demographics", "about 10 charts"),
+    ("PCA Analysis", "analysis.pca_analysis:pca_analysis", "about 4 charts"),
+    ("Correlations", "analysis.correlation_explorer:correlation_explorer",
+     "an interactive table of question pairs"),
+    ("Satisfaction Details", "analysis.satisfaction_analysis:satisfaction_analysis",
+     "about 75 charts and a word cloud"),
+    # ("Comparative Analysis", "analysis.comparative_analysis:comparative_analysis", "about 3 charts"),
+    # ("Recommendations", "analysis.recommendations:recommendations", ""),
+    ("Feedback Viewer", "analysis.open_ended_viewer:open_ended_viewer",
+     "16 lists of free-text answers"),
+    ("Cohort Comparison", "analysis.cohort_comparison:cohort_comparison",
+     "2 charts over all cohorts"),
+]
+
+
+def section_function(target):
+    module_name, function_name = target.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Set in the session while export_report renders a section for the static
+# report, where nobody can page, search or pick: sections then show every
+# answer and every selection they can instead of their controls
+EXPORT_KEY = '_report_export'
+
+
+def exporting():
+    """Whether the section is being rendered for the exported report."""
+    return bool(st.session_state.get(EXPORT_KEY))
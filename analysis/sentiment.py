@@ -0,0 +1,101 @@
+"""Batch sentiment scores of the free-text answers, computed in worker processes.
+
+``sentiment_table`` scores every answer to the OPEN_ENDED_COLUMNS and returns
+one row per answer: the respondent (row of Responses.json), the question,
+polarity and subjectivity. Each distinct text is scored once, with a single
+TextBlob pass giving both numbers; texts already in a SentimentStore are
+looked up instead. The remaining texts are split into chunks that a process
+pool scores independently, so the work spreads evenly over the cores.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis.questions import OPEN_ENDED_COLUMNS
+from analysis.sentiment_store import normalize_text, text_key
+
+# Chunks per worker: enough to even out long and short texts
+CHUNKS_PER_JOB = 4
+
+
+def score_texts(texts):
+    """(polarity, subjectivity) of every text, in one TextBlob pass each."""
+    from textblob import TextBlob
+    return [tuple(TextBlob(text).sentiment) for text in texts]
+
+
+def score_batch(texts, jobs=None, store=None):
+    """{key: (polarity, subjectivity)} of the distinct normalized ``texts``.
+
+    Texts found in ``store`` are not scored again, and new scores are added
+    to it.
+    """
+    if store is not None:
+        pending = store.missing(texts)
+    else:
+        pending = {text_key(text): normalize_text(text) for text in texts}
+    keys, unique = list(pending), list(pending.values())
+
+    jobs = min(jobs or os.cpu_count() or 1, max(len(unique), 1))
+    if jobs == 1:
+        scores = score_texts(unique)
+    else:
+        size = -(-len(unique) // (jobs * CHUNKS_PER_JOB))
+        chunks = [unique[start:start + size] for start in range(0, len(unique), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            scores = [score for chunk in executor.map(score_texts, chunks) for score in chunk]
+    scored = dict(zip(keys, scores))
+    if store is None:
+        return scored
+    store.add(scored)
+    return dict(zip((text_key(text) for text in texts), store.scores(texts)))
+
+
+def answer_table(df, columns=OPEN_ENDED_COLUMNS):
+    """Respondent, question and text of every non-blank answer to ``columns``."""
+    frames = []
+    for column in columns:
+        if column not in df.columns:
+            continue
+        texts = df[column].dropna().astype(str)
+        texts = texts[texts.str.strip() != '']
+        frames.append(pd.DataFrame({'Respondent': df.index.get_indexer(texts.index),
+                                    'Question': column, 'Text': texts.to_numpy()}))
+    if not frames:
+        return pd.DataFrame({'Respondent': [], 'Question': [], 'Text': []})
+    return pd.concat(frames, ignore_index=True)
+
+
+def sentiment_table(df, columns=OPEN_ENDED_COLUMNS, jobs=None, store=None):
+    """One row per answer: Respondent, Question, Polarity and Subjectivity."""
+    answers = answer_table(df, columns)
+    scores = score_batch(answers['Text'].tolist(), jobs, store)
+    polarity, subjectivity = zip(*(scores[text_key(text)] for text in answers['Text'])) \
+        if len(answers) else ((), ())
+    return pd.DataFrame({'Respondent': answers['Respondent'], 'Question': answers['Question'],
+                         'Polarity': np.asarray(polarity, dtype=float),
+                         'Subjectivity': np.asarray(subjectivity, dtype=float)})
+
+
+def to_columns(table):
+    """The table as JSON-ready columns, with the questions stored once."""
+    questions = pd.Categorical(table['Question'])
+    return {
+        'Questions': list(questions.categories),
+        'Respondent': table['Respondent'].astype(int).tolist(),
+        'Question': questions.codes.tolist(),
+        'Polarity': table['Polarity'].tolist(),
+        'Subjectivity': table['Subjectivity'].tolist(),
+    }
+
+
+def from_columns(data):
+    """Inverse of ``to_columns``; Question becomes a categorical."""
+    return pd.DataFrame({
+        'Respondent': np.asarray(data['Respondent'], dtype=np.int64),
+        'Question': pd.Categorical.from_codes(data['Question'], data['Questions']),
+        'Polarity': np.asarray(data['Polarity'], dtype=float),
+        'Subjectivity': np.asarray(data['Subjectivity'], dtype=float),
+    })
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    """Normalize a comment so that trivially different copies share one score."""
+    return ' '.join(unicodedata.normalize('NFC', str(text)).split())
+
+
+def text_key(text):
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class SentimentStore:
+    """Polarity/subjectivity scores keyed by a hash of the normalized text.
+
+    Every comment is scored once with TextBlob; the scores are kept in memory
+    and persisted to disk so that new sessions and worker processes only pay
+    for a lookup.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._scores = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self._scores = json.load(f)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def scores(self, texts):
+        """Return a list of (polarity, subjectivity) tuples, one per text."""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            missing = {key: normalize_text(text) for key, text in zip(keys, texts)
+                       if key not in self._scores}
+            if missing:
+                # TextBlob is slow to import and only needed for unseen texts
+                from textblob import TextBlob
+                for key, text in missing.items():
+                    sentiment = TextBlob(text).sentiment
+                    self._scores[key] = [sentiment.polarity, sentiment.subjectivity]
+                self._save()
+            return [tuple(self._scores[key]) for key in keys]
+
+    def missing(self, texts):
+        """{key: normalized text} of the texts without a stored score."""
+        with self._lock:
+            return {key: normalize_text(text) for key, text in ((text_key(text), text) for text in texts)
+                    if key not in self._scores}
+
+    def add(self, scores):
+        """Store {key: (polarity, subjectivity)} scored elsewhere, e.g. in worker processes."""
+        if not scores:
+            return
+        with self._lock:
+            self._scores.update({key: list(score) for key, score in scores.items()})
+            self._save()
+
+    def _save(self):
+        # Merge scores persisted by other worker processes, then write to a
+        # temporary file first so concurrent readers never see a partial store
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self._scores = {**json.load(f), **self._scores}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._scores, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,112 @@
+"""Server-wide single-flight execution of expensive computations.
+
+Streamlit's caches already compute a missing entry once while the other
+sessions asking for it wait. The results cached elsewhere (word clouds on
+disk, figures in the FigureCache) are looked up and filled by every session
+on its own, so a burst of sessions after a deploy would each render the same
+word cloud. ``single_flight(key, function, ...)`` runs ``function`` on one
+bounded thread pool shared by all sessions: the first caller of a key submits
+it, callers arriving while it runs wait for the same result, and once it is
+done the key is free again. Keeping the result is left to the caller's own
+cache.
+
+Computations run in a pool thread, outside the session's script and cohort
+(see analysis.paths), so everything they depend on must be passed in and be
+part of the key. A computation that asks for another key runs that one
+inline rather than waiting for a pool slot its caller may be holding.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Expensive computations running at once, server-wide
+MAX_WORKERS = int(os.environ.get('EHCB_MAX_WORKERS') or 4)
+
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+class SingleFlight:
+    """Bounded pool running at most one computation per key at a time."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='single-flight',
+                                        initializer=_mark_worker)
+        self._lock = threading.Lock()
+        # key -> Future of the computation in flight
+        self._in_flight = {}
+        self.calls = 0
+        self.computations = 0
+        self.deduplicated = 0
+        self.failures = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.running = 0
+        self.compute_seconds = 0.0
+
+    def run(self, key, function, *args, **kwargs):
+        """``function(*args, **kwargs)``, computed once for all concurrent callers of ``key``."""
+        if getattr(_worker, 'active', False):
+            return function(*args, **kwargs)
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is None:
+                self.computations += 1
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+                future = self._pool.submit(self._compute, key, function, args, kwargs)
+                self._in_flight[key] = future
+            else:
+                self.deduplicated += 1
+        return future.result()
+
+    def _compute(self, key, function, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            # Callers of the key from now on start a new computation, which
+            # normally finds the result in the caller's cache
+            with self._lock:
+                self.running -= 1
+                self.compute_seconds += time.perf_counter() - start
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'computations': self.computations,
+                'deduplicated': self.deduplicated,
+                'dedup_rate': self.deduplicated / self.calls if self.calls else 0.0,
+                'failures': self.failures,
+                'queued': self.queued,
+                'max_queued': self.max_queued,
+                'running': self.running,
+                'compute_seconds': self.compute_seconds,
+            }
+
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+
+def single_flight(key, function, *args, **kwargs):
+    """``function(*args, **kwargs)`` on the shared pool, deduplicated by ``key``."""
+    return get_single_flight().run(key, function, *args, **kwargs)
@@ -0,0 +1,82 @@
+"""Static report snapshots served to guest sessions.
+
+A snapshot of a cohort's report is exported ahead of time with
+export_report.py (see analysis.report_export) into the cohort's report/
+directory. Guests are shown it instead of the live sections: every guest
+session gets the same cached page, whatever the number of sessions, and
+nothing is computed from the responses.
+"""
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from analysis.paths import current_cohort, data_dir
+from analysis.pipeline import file_digest
+from analysis.responses import responses_signature
+
+REPORT_DIR = 'report'
+REPORT_HTML = 'report.html'
+REPORT_PDF = 'report.pdf'
+# When and from which Responses.json the snapshot was exported
+REPORT_MANIFEST = 'report.json'
+# Height of the frame showing the report, which scrolls inside it
+SNAPSHOT_HEIGHT = 1200
+
+
+def report_dir(cohort=None):
+    """Snapshot directory of ``cohort`` (default: the current one)."""
+    return data_dir(cohort) / REPORT_DIR
+
+
+def has_snapshot(cohort=None):
+    directory = report_dir(cohort)
+    return (directory / REPORT_HTML).is_file() and (directory / REPORT_MANIFEST).is_file()
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return str(path), stat.st_size, stat.st_mtime_ns
+
+
+@st.cache_resource(max_entries=8)
+def _load_snapshot(signature):
+    directory = os.path.dirname(signature[0])
+    with open(signature[0], 'r', encoding='utf-8') as f:
+        page = f.read()
+    with open(os.path.join(directory, REPORT_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    pdf = None
+    if manifest.get('pdf') and os.path.exists(os.path.join(directory, REPORT_PDF)):
+        with open(os.path.join(directory, REPORT_PDF), 'rb') as f:
+            pdf = f.read()
+    return page, manifest, pdf
+
+
+def load_snapshot():
+    """(HTML page, manifest, PDF bytes or None) of the current cohort's snapshot."""
+    return _load_snapshot(_signature(report_dir() / REPORT_HTML))
+
+
+@st.cache_data(max_entries=8)
+def _responses_digest(signature):
+    return file_digest(signature[0])
+
+
+def show_snapshot():
+    """The current cohort's exported report, with downloads of its files."""
+    page, manifest, pdf = load_snapshot()
+    note = f"Report as exported on {manifest['exported']}."
+    if manifest['responses_digest'] != _responses_digest(responses_signature()):
+        note += " Responses received since then are not included yet."
+    st.caption(note)
+
+    cohort = current_cohort()
+    columns = st.columns(2)
+    columns[0].download_button("Download the report (HTML)", page, file_name=f"ehcb-ca-report-{cohort}.html",
+                               mime="text/html")
+    if pdf is not None:
+        columns[1].download_button("Download the report (PDF)", pdf, file_name=f"ehcb-ca-report-{cohort}.pdf",
+                                   mime="application/pdf")
+    components.html(page, height=SNAPSHOT_HEIGHT, scrolling=True)
@@ -0,0 +1,95 @@
+"""Rendered word clouds, cached on disk as PNG files.
+
+Laying out a word cloud takes seconds, so each rendered image is written to
+the .cache/wordclouds directory of its cohort under a name derived from its
+words (frequencies or text) and WordCloud parameters, where every session and
+worker process can reuse it. The wordcloud package is imported only to render a missing image.
+File names start with the source the words came from, so the images of one
+source can be dropped with ``invalidate_wordclouds`` when its data changes.
+A missing image is rendered once however many sessions ask for it at the
+same time (see analysis.single_flight).
+"""
+import hashlib
+import io
+import json
+import os
+from importlib.metadata import version
+
+import streamlit as st
+
+from analysis.instrumentation import stage
+from analysis.paths import cache_dir
+from analysis.single_flight import single_flight
+
+# Sources of the word clouds, used as file name prefixes
+PHRASES_SOURCE = 'phrases'
+RESPONSES_SOURCE = 'responses'
+
+
+def wordcloud_cache_dir(cohort=None):
+    return cache_dir(cohort) / 'wordclouds'
+
+
+def _cache_path(source, words, params):
+    # The frequencies WordCloud derives from a text depend only on the text
+    # and the parameters, so a text is as good a key as its frequencies
+    words = sorted(words.items()) if isinstance(words, dict) else words
+    key = json.dumps([version('wordcloud'), words, sorted(params.items())],
+                     ensure_ascii=False, default=str)
+    return wordcloud_cache_dir() / f'{source}-{hashlib.sha1(key.encode()).hexdigest()}.png'
+
+
+def _render(path, frequencies, text, params):
+    # Another session may have written the image while this one waited
+    if path.exists():
+        return path.read_bytes()
+
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(**params)
+    if frequencies is None:
+        frequencies = wordcloud.process_text(text)
+    # Nothing but stopwords
+    if not frequencies:
+        return None
+    image = io.BytesIO()
+    wordcloud.generate_from_frequencies(frequencies).to_image().save(image, format='PNG')
+    png = image.getvalue()
+
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(png)
+    os.replace(tmp_path, path)
+    return png
+
+
+def render_wordcloud(source, frequencies=None, text=None, **params):
+    """PNG bytes of the word cloud of ``frequencies`` (or of the words in ``text``).
+
+    None when there are no words to draw. ``params`` are passed to WordCloud
+    and are part of the cache key.
+    """
+    path = _cache_path(source, text if frequencies is None else frequencies, params)
+    if path.exists():
+        return path.read_bytes()
+    return single_flight(f'wordcloud:{path}', _render, path, frequencies, text, params)
+
+
+def invalidate_wordclouds(source=None, directory=None):
+    """Delete the cached images of one source, or all of them. Returns the count."""
+    directory = directory or wordcloud_cache_dir()
+    if not directory.exists():
+        return 0
+    removed = 0
+    for path in directory.glob(f'{source or "*"}-*.png'):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def show_wordcloud(source, frequencies=None, text=None, **params):
+    with stage('build', f'{source} word cloud'):
+        png = render_wordcloud(source, frequencies, text, **params)
+    if png is None:
+        st.info('No words to draw a word cloud from.')
+        return
+    st.image(png, use_container_width=True)
@@ -0,0 +1,64 @@
+"""Benchmark the rating distributions of the satisfaction section.
+
+Run from the repository root:
+
+    python benchmarks/bench_aggregates.py [--scales 1 10 100] [--repeat 5]
+
+Responses.json of the default cohort is resampled to the given multiples of
+its rows. For every scale the distribution, mean and low-rating count of
+every rating question are computed both with one ``value_counts`` per
+question, as the section used to, and with ``aggregate_frame`` over the int8
+rating matrix (every group of GROUP_KEYS included). Reported are the mean
+seconds per full set of both, and of the aggregates of a filtered subset
+taken from the shared matrix.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.aggregates import LOW_RATING, aggregate_frame, likert_matrix  # noqa: E402
+from analysis.responses import likert_columns, read_responses  # noqa: E402
+
+
+def value_counts_stats(df, questions):
+    for question in questions:
+        answers = df[question].dropna()
+        answers.value_counts().sort_index()
+        answers.mean()
+        (answers < LOW_RATING).sum()
+
+
+def per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df_all = read_responses()[0]
+    questions = likert_columns(df_all)
+    print(f'{len(questions)} rating questions')
+    print(f'{"scale":>6} {"rows":>8} {"value_counts s":>15} {"matrix s":>9} {"filtered s":>11}')
+    for scale in args.scales:
+        df = df_all.sample(n=len(df_all) * scale, replace=scale > 1, random_state=0).reset_index(drop=True)
+        matrix = likert_matrix(df, questions)
+        rows = (df['Role'] == df['Role'].mode()[0]).to_numpy().nonzero()[0]
+        df_rows = df.iloc[rows]
+        value_counts_seconds = per_call(lambda: value_counts_stats(df, questions), args.repeat)
+        matrix_seconds = per_call(lambda: aggregate_frame(df, questions), args.repeat)
+        filtered_seconds = per_call(lambda: aggregate_frame(df_rows, questions, matrix[rows]), args.repeat)
+        print(f'{scale:>6} {len(df):>8} {value_counts_seconds:>15.3f} {matrix_seconds:>9.3f} '
+              f'{filtered_seconds:>11.3f}')
+
+
+if __name__ == '__main__':
+    main()
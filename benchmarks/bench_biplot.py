@@ -0,0 +1,69 @@
+"""Time the PCA biplot with and without decimation of the scores.
+
+Run from the repository root:
+
+    python benchmarks/bench_biplot.py [--points 1000 10000 100000 1000000]
+
+For random PC1/PC2 scores of the given sizes the biplot is built as the PCA
+section does (decimate_scores, then biplot_figure) and serialized to the
+JSON Streamlit sends to the browser. Reported are the plotted points, the
+time of every step and the payload size, next to building the figure from
+all the points.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.pca_analysis import MAX_BIPLOT_POINTS, biplot_figure, decimate_scores  # noqa: E402
+
+
+def synthetic_scores(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    # A correlated cloud with a heavy tail, like real component scores
+    scores = rng.standard_t(5, size=(rows, 2)) @ np.array([[3.0, 0.0], [1.0, 1.5]])
+    return pd.DataFrame(scores, columns=['PC1', 'PC2'])
+
+
+def synthetic_loadings(questions=63, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(scale=0.15, size=(questions, 2)), columns=['PC1', 'PC2'],
+                        index=[f'Question {i}' for i in range(questions)])
+
+
+def render(scores, loadings, explained_variance, max_points):
+    start = time.perf_counter()
+    points = decimate_scores(scores, max_points=max_points)
+    decimated = time.perf_counter() - start
+    fig = biplot_figure(points, len(scores), loadings, explained_variance)
+    built = time.perf_counter() - start - decimated
+    payload = fig.to_json()
+    total = time.perf_counter() - start
+    return len(points), decimated, built, total - decimated - built, total, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    loadings = synthetic_loadings()
+    explained_variance = pd.Series({'PC1': 0.31, 'PC2': 0.12})
+    print(f'{"rows":>9} {"mode":<10} {"points":>8} {"decimate s":>11} {"build s":>8} '
+          f'{"json s":>7} {"total s":>8} {"payload KB":>11}')
+    for rows in args.points:
+        scores = synthetic_scores(rows)
+        for mode, max_points in [('decimated', MAX_BIPLOT_POINTS), ('all', rows)]:
+            points, decimated, built, serialized, total, size = render(
+                scores, loadings, explained_variance, max_points)
+            print(f'{rows:>9} {mode:<10} {points:>8} {decimated:>11.4f} {built:>8.4f} '
+                  f'{serialized:>7.4f} {total:>8.4f} {size / 1024:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
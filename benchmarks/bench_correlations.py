@@ -0,0 +1,66 @@
+"""Benchmark the vectorized pairwise correlations against DataFrame.corr().
+
+Run from the repository root:
+
+    python benchmarks/bench_correlations.py [--rows 106 1000 10000] [--questions 63 300]
+
+Random 1-5 ratings with 20% missing answers are correlated both ways, and
+the results are checked to agree. The last column times the three engine
+queries on the computed matrix.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.correlations import CorrelationEngine  # noqa: E402
+from analysis.questions import QUESTION_SECTIONS  # noqa: E402
+
+
+def synthetic_ratings(rows, questions, seed=0):
+    rng = np.random.default_rng(seed)
+    # A few latent factors so that the questions actually correlate
+    latent = rng.normal(size=(rows, 4)) @ rng.normal(size=(4, questions))
+    ratings = np.clip(np.rint(3 + latent / latent.std() + rng.normal(size=(rows, questions))), 1, 5)
+    ratings[rng.random(ratings.shape) < 0.2] = np.nan
+    labels = list(QUESTION_SECTIONS['Lessons']) + [f'Question {i}' for i in range(questions)]
+    return pd.DataFrame(ratings, columns=labels[:questions])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[106, 1000, 10000])
+    parser.add_argument('--questions', type=int, nargs='+', default=[63, 300])
+    args = parser.parse_args()
+
+    print(f'{"rows":>8} {"questions":>9} {"engine (s)":>11} {"corr() (s)":>11} {"speedup":>8} {"queries (ms)":>13}')
+    for questions in args.questions:
+        for rows in args.rows:
+            df = synthetic_ratings(rows, questions)
+
+            start = time.perf_counter()
+            engine = CorrelationEngine(df)
+            vectorized = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = df.corr()
+            legacy = time.perf_counter() - start
+            np.testing.assert_allclose(engine.correlations, expected.to_numpy(), atol=1e-9)
+
+            start = time.perf_counter()
+            engine.pairs_above(0.3)
+            engine.top_partners(engine.questions[0], 10)
+            engine.section_pairs('Lessons')
+            queries = time.perf_counter() - start
+
+            print(f'{rows:>8} {questions:>9} {vectorized:>11.4f} {legacy:>11.4f} '
+                  f'{legacy / vectorized:>7.1f}x {queries * 1000:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
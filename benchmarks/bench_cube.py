@@ -0,0 +1,77 @@
+"""Benchmark the comparison cube against grouping the responses directly.
+
+Run from the repository root:
+
+    python benchmarks/bench_cube.py [--scales 1 10 100] [--repeat 1000]
+
+Responses.json of the default cohort is resampled to the given multiples of
+its rows. For every scale the cube is built once, then the views of the
+comparisons are computed both from the cube and with a groupby over the
+imputed rows, as the frozen comparison files used to be. Reported are the
+build time, the cube's size and the mean time per view of both.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.artifacts import numeric_responses  # noqa: E402
+from analysis.cube import DIMENSIONS, Cube, build_cube  # noqa: E402
+from analysis.questions import COMPONENT_COLUMNS, SATISFACTION_COLUMN  # noqa: E402
+from analysis.responses import read_responses  # noqa: E402
+
+VIEWS = ['Role', 'Age_Group', 'Residence_Continent', 'Nationality_Country']
+
+
+def cube_views(cube):
+    for dimension in VIEWS:
+        cube.mean(dimension, impute=True)
+    cube.mean('Role', [SATISFACTION_COLUMN], impute=True)
+    cube.component_means('Residence_Continent', COMPONENT_COLUMNS)
+
+
+def groupby_views(df, df_numeric):
+    for dimension in VIEWS:
+        column, function = DIMENSIONS[dimension]
+        keys = function(df[column]) if function else df[column]
+        df_numeric.groupby(keys, observed=True).mean()
+    df_numeric[SATISFACTION_COLUMN].groupby(df['Role'], observed=True).mean()
+    column, function = DIMENSIONS['Residence_Continent']
+    continents = function(df[column])
+    for columns in COMPONENT_COLUMNS.values():
+        df_numeric[columns].mean(axis=1).groupby(continents).mean()
+
+
+def per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    df_all = read_responses()[0]
+    print(f'{"scale":>6} {"rows":>8} {"build s":>8} {"cube KB":>8} {"cube ms":>8} {"groupby ms":>11}')
+    for scale in args.scales:
+        df = df_all.sample(n=len(df_all) * scale, replace=scale > 1, random_state=0).reset_index(drop=True)
+        start = time.perf_counter()
+        data = build_cube(df)
+        build_seconds = time.perf_counter() - start
+        cube = Cube(json.loads(json.dumps(data)))
+        df_numeric = numeric_responses(df)
+        cube_seconds = per_call(lambda: cube_views(cube), args.repeat)
+        groupby_seconds = per_call(lambda: groupby_views(df, df_numeric), max(1, args.repeat // 100))
+        print(f'{scale:>6} {len(df):>8} {build_seconds:>8.2f} {len(json.dumps(data)) / 1024:>8.0f} '
+              f'{cube_seconds * 1000:>8.2f} {groupby_seconds * 1000:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
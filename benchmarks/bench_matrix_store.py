@@ -0,0 +1,92 @@
+"""Compare loading the correlation matrix from JSON with the memory-mapped store.
+
+Run from the repository root:
+
+    python benchmarks/bench_matrix_store.py [--items 64 300 1000]
+
+For the bundled Heatmap_Correlation_Matrix and for random symmetric
+matrices with the given number of items, the matrix is written both as the
+pretty-printed dict-of-dicts JSON the pipeline used to produce and with
+analysis.matrix_store, then opened both ways. Reported are the file sizes,
+the time and Python memory peak (tracemalloc) of opening the matrix, and of
+reading a 10x10 block of it.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.matrix_store import LabeledMatrix, matrix_paths, write_matrix  # noqa: E402
+from analysis.paths import data_dir  # noqa: E402
+
+BLOCK = 10
+
+
+def synthetic_matrix(items, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(items, 8))
+    covariance = factors @ factors.T + np.diag(rng.uniform(1, 2, items))
+    scale = np.sqrt(np.diag(covariance))
+    labels = [f'Question {i}: how satisfied were you with item {i} of the programme?' for i in range(items)]
+    return pd.DataFrame(covariance / np.outer(scale, scale), index=labels, columns=labels)
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def load_json(path):
+    with open(path, 'r') as f:
+        return pd.DataFrame(json.load(f))
+
+
+def compare(name, df, workdir):
+    json_path = workdir / f'{name}.json'
+    with open(json_path, 'w') as f:
+        json.dump(df.to_dict(), f, indent=4)
+    write_matrix(df, workdir / name)
+    binary_bytes = sum(path.stat().st_size for path in matrix_paths(workdir / name))
+
+    rows = list(df.index[::max(1, len(df) // BLOCK)][:BLOCK])
+    _, json_seconds, json_peak = measure(lambda: load_json(json_path).loc[rows, rows])
+    matrix, open_seconds, open_peak = measure(lambda: LabeledMatrix(workdir / name))
+    block, block_seconds, block_peak = measure(lambda: matrix.block(rows, rows))
+    np.testing.assert_allclose(block.to_numpy(), df.loc[rows, rows].to_numpy(), atol=1e-6)
+
+    print(f'{name:<28} {len(df):>6} {json_path.stat().st_size / 1024:>10.0f} {binary_bytes / 1024:>10.0f} '
+          f'{json_seconds * 1000:>9.1f} {json_peak / 1024:>9.0f} '
+          f'{(open_seconds + block_seconds) * 1000:>9.1f} {max(open_peak, block_peak) / 1024:>9.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[64, 300, 1000])
+    args = parser.parse_args()
+
+    print(f'{"matrix":<28} {"items":>6} {"json KB":>10} {"npy KB":>10} '
+          f'{"json ms":>9} {"json KB":>9} {"mmap ms":>9} {"mmap KB":>9}')
+    print(f'{"":<28} {"":>6} {"(file)":>10} {"(files)":>10} {"":>9} {"(peak)":>9} {"":>9} {"(peak)":>9}')
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        compare('Heatmap_Correlation_Matrix',
+                load_json(data_dir() / 'Heatmap_Correlation_Matrix.json'), workdir)
+        for items in args.items:
+            compare('synthetic', synthetic_matrix(items), workdir)
+
+
+if __name__ == '__main__':
+    main()
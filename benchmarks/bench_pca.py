@@ -0,0 +1,56 @@
+"""Benchmark the PCA solvers of analysis.pca on synthetic rating matrices.
+
+Run from the repository root:
+
+    python benchmarks/bench_pca.py [--shapes 106x63 10000x63 20000x400 200000x63 500x2000]
+
+Ratings are random 1-5 answers driven by a few latent factors, with 10%
+missing. Every solver runs on every shape; the last column is the largest
+difference of its loadings from the exact SVD.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.pca import choose_solver, compute_pca  # noqa: E402
+
+SOLVERS = ['exact', 'randomized', 'incremental']
+
+
+def synthetic_ratings(rows, questions, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, 5)) @ rng.normal(size=(5, questions))
+    ratings = np.clip(np.rint(3 + latent / latent.std() + rng.normal(size=(rows, questions))), 1, 5)
+    ratings[rng.random(ratings.shape) < 0.1] = np.nan
+    return pd.DataFrame(ratings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shapes', nargs='+', default=['106x63', '10000x63', '20000x400', '200000x63', '500x2000'])
+    parser.add_argument('--components', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"shape":>12} {"auto":>12} {"solver":>12} {"seconds":>8} {"max |diff|":>11}')
+    for shape in args.shapes:
+        rows, questions = (int(n) for n in shape.split('x'))
+        df = synthetic_ratings(rows, questions)
+        auto = choose_solver(rows, questions, args.components)
+        exact = None
+        for solver in SOLVERS:
+            start = time.perf_counter()
+            result = compute_pca(df, args.components, solver=solver)
+            elapsed = time.perf_counter() - start
+            exact = exact if exact is not None else result.loadings.to_numpy()
+            difference = np.abs(result.loadings.to_numpy() - exact).max()
+            print(f'{shape:>12} {auto:>12} {solver:>12} {elapsed:>8.3f} {difference:>11.2e}')
+
+
+if __name__ == '__main__':
+    main()
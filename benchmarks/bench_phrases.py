@@ -0,0 +1,66 @@
+"""Benchmark the streaming phrase counts behind Phrase_Frequency_Summary.json.
+
+Run from the repository root:
+
+    python benchmarks/bench_phrases.py [--scales 1 10 100] [--jobs 1 4] [--capacity 50000 1000]
+
+Responses.json is resampled to the given multiples of its lines in a
+temporary directory and counted with every combination of worker processes
+and counter capacity. Reported are the scan time, the answers counted, the
+phrases kept over all (question, role) cells, the error bound pruning left
+on the counts and whether the top 50 phrases match those of an unpruned,
+single-process count.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.paths import data_dir  # noqa: E402
+from analysis.phrases import CAPACITY, count_phrases  # noqa: E402
+
+TOP = 50
+
+
+def resample(scale, path, seed=0):
+    rng = random.Random(seed)
+    with open(data_dir() / 'Responses.json', 'r', encoding='utf-8') as f:
+        lines = [line if line.endswith('\n') else f'{line}\n' for line in f if line.strip()]
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(scale):
+            f.writelines(rng.choice(lines) for _ in range(len(lines)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--capacity', type=int, nargs='+', default=[CAPACITY, 1000])
+    args = parser.parse_args()
+
+    print(f'{"scale":>6} {"jobs":>5} {"capacity":>9} {"seconds":>8} {"answers":>8} '
+          f'{"phrases":>8} {"error":>6} {"top 50":>7}')
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'Responses.json'
+            resample(scale, path)
+            expected = None
+            for capacity in args.capacity:
+                for jobs in args.jobs:
+                    start = time.perf_counter()
+                    counts = count_phrases(path, jobs=jobs, capacity=capacity)
+                    top = counts.total().most_common(TOP, min_order=2)
+                    elapsed = time.perf_counter() - start
+                    if expected is None:
+                        expected = top
+                    kept = sum(len(cell.counts) for cell in counts.cells.values())
+                    print(f'{scale:>6} {jobs:>5} {capacity:>9} {elapsed:>8.2f} {counts.answers:>8} '
+                          f'{kept:>8} {counts.total().error:>6} {"same" if top == expected else "differs":>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark building, loading, updating and querying the open-ended search index.
+
+Run from the repository root:
+
+    python benchmarks/bench_search.py [--scales 1 10 100]
+
+For every scale the answer CSVs of the default cohort are resampled to that
+many times their rows in a temporary directory. Reported are the time to build the
+index from scratch, its size on disk, the time to load it back, to update it
+after one CSV gained an answer, and the median latency of a few queries.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.comments import COMMENT_FILES  # noqa: E402
+from analysis.paths import data_dir  # noqa: E402
+from analysis.search import COMBINED_FILENAME, SearchIndex  # noqa: E402
+
+QUERIES = ['WhatsApp', 'exam', 'time zone', 'practice week schedule', 'price']
+
+
+def make_corpus(scale, directory, seed=0):
+    for filename in [COMBINED_FILENAME, *COMMENT_FILES.values()]:
+        df = pd.read_csv(data_dir() / filename)
+        if scale > 1:
+            df = df.sample(n=len(df) * scale, replace=True, random_state=seed)
+        df.to_csv(directory / filename, index=False)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f'{"scale":>6} {"answers":>8} {"terms":>7} {"build s":>8} {"index KB":>9} '
+          f'{"load s":>7} {"update s":>9} {"query ms":>9}')
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            make_corpus(scale, directory)
+            index_path = directory / 'search_index.json'
+
+            index = SearchIndex()
+            _, build = timed(lambda: index.update(directory))
+            index.save(index_path)
+            index, load = timed(lambda: SearchIndex.load(index_path))
+            assert not index.update(directory)
+
+            path = directory / COMMENT_FILES['General Suggestions']
+            with open(path, 'a') as f:
+                f.write('Please keep the WhatsApp group after the academy\n')
+            _, update = timed(lambda: index.update(directory))
+
+            latencies = []
+            for query in QUERIES * 5:
+                _, latency = timed(lambda: index.search(query, limit=50))
+                latencies.append(latency)
+
+            print(f'{scale:>6} {len(index):>8} {len(index.postings):>7} {build:>8.3f} '
+                  f'{index_path.stat().st_size / 1024:>9.0f} {load:>7.3f} {update:>9.3f} '
+                  f'{statistics.median(latencies) * 1000:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Headless render benchmark of the dashboard sections.
+
+Run from the repository root:
+
+    python benchmarks/bench_sections.py                    # compare with the baseline
+    python benchmarks/bench_sections.py --scales 1 10      # a quicker subset
+    python benchmarks/bench_sections.py --update-baseline  # record a new baseline
+
+Every section is rendered with Streamlit's AppTest, on a copy of one cohort
+and on synthetic datasets where the survey rows (Responses.json and the
+free-text CSVs) are resampled to 10x, 100x and 1000x their count. The
+derived JSON files are copied as they are. Each (section, scale) pair runs
+in a fresh interpreter, twice: a cold render with empty caches and a warm
+rerun. The benchmark records the wall time of both, the peak resident
+memory of the process and the bytes of chart specs and images the section
+sends to the browser.
+
+The run fails (exit status 1) when a section is slower or uses more memory
+than the baseline allows, or errors where the baseline rendered. Timings
+differ between machines, so record the baseline on the machine that checks
+against it. Nothing is downloaded: the datasets are generated locally.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Cohort the datasets are copied and resampled from
+COHORT = '4th-gen'
+COHORT_DIR = ROOT / 'data' / 'cohorts' / COHORT
+BASELINE_FILENAME = Path(__file__).resolve().parent / 'section_baseline.json'
+
+SECTIONS = {
+    'summary': 'analysis.summary:summary',
+    'demographics': 'analysis.demographics:demographics',
+    'pca_analysis': 'analysis.pca_analysis:pca_analysis',
+    'satisfaction_analysis': 'analysis.satisfaction_analysis:satisfaction_analysis',
+    'open_ended_viewer': 'analysis.open_ended_viewer:open_ended_viewer',
+    'comparative_analysis': 'analysis.comparative_analysis:comparative_analysis',
+    'correlation_explorer': 'analysis.correlation_explorer:correlation_explorer',
+}
+
+# Files holding one survey row per line (after a header for the CSVs)
+RESPONSES_FILE = 'Responses.json'
+CHART_TYPES = ['plotly_chart', 'vega_lite_chart', 'deck_gl_json_chart']
+
+# Script AppTest runs: render one section, then measure the images it stored
+SCRIPT = """
+import importlib
+import streamlit as st
+from streamlit.runtime import Runtime
+
+module, function = {target!r}.split(':')
+getattr(importlib.import_module(module), function)()
+
+storage = Runtime.instance().media_file_mgr._storage
+st.session_state['_bench_media_bytes'] = sum(
+    len(media_file.content) for media_file in storage._files_by_id.values())
+"""
+
+
+# 1. Synthetic datasets
+def resample_lines(lines, count, rng):
+    return [rng.choice(lines) for _ in range(count)]
+
+
+def make_dataset(scale, data_dir, seed=0):
+    """Copy COHORT into ``data_dir`` with the survey rows resampled ``scale`` times."""
+    directory = data_dir / 'cohorts' / COHORT
+    shutil.copytree(COHORT_DIR, directory, ignore=shutil.ignore_patterns('.cache'))
+    if scale == 1:
+        return data_dir
+    rng = random.Random(seed)
+
+    with open(COHORT_DIR / RESPONSES_FILE, 'r', encoding='utf-8') as f:
+        lines = [line if line.endswith('\n') else f'{line}\n' for line in f if line.strip()]
+    with open(directory / RESPONSES_FILE, 'w', encoding='utf-8') as f:
+        # Written in chunks: at 1000x the file is close to a gigabyte
+        for _ in range(scale):
+            f.writelines(resample_lines(lines, len(lines), rng))
+
+    import pandas as pd
+    for path in sorted(COHORT_DIR.glob('*.csv')):
+        df = pd.read_csv(path)
+        if df.empty:
+            continue
+        df.sample(n=len(df) * scale, replace=True, random_state=rng.randrange(2 ** 32)).to_csv(
+            directory / path.name, index=False)
+    return data_dir
+
+
+# 2. One measurement, run in a child process
+def figure_bytes(at):
+    total = at.session_state['_bench_media_bytes'] if '_bench_media_bytes' in at.session_state else 0
+    for chart_type in CHART_TYPES:
+        total += sum(element.proto.ByteSize() for element in at.get(chart_type))
+    return total
+
+
+def measure(target, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    result = {}
+    at = AppTest.from_string(SCRIPT.format(target=target), default_timeout=timeout)
+    for run in ['cold', 'warm']:
+        start = time.perf_counter()
+        try:
+            at.run()
+        except RuntimeError as e:
+            # AppTest gives up on a script running past the timeout
+            result.update(status='timeout', error=str(e))
+            break
+        result[f'{run}_seconds'] = round(time.perf_counter() - start, 3)
+        if at.exception:
+            result['status'] = 'error'
+            result['error'] = at.exception[0].message
+            break
+    else:
+        result['status'] = 'ok'
+    if result['status'] == 'ok':
+        result['figure_bytes'] = figure_bytes(at)
+    # ru_maxrss is in kilobytes on Linux
+    result['peak_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def run_child(section, data_dir, timeout):
+    env = dict(os.environ, EHCB_DATA_DIR=str(data_dir), PYTHONPATH=str(ROOT))
+    command = [sys.executable, __file__, '--child', SECTIONS[section], '--timeout', str(timeout)]
+    try:
+        completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True,
+                                   text=True, timeout=timeout * 2 + 60)
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout'}
+    if completed.returncode != 0:
+        # A crash, or the kernel killing the process for running out of memory
+        return {'status': 'error', 'error': (completed.stderr.strip().splitlines() or
+                                             [f'exit status {completed.returncode}'])[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# 3. Baseline comparison
+def regressions(results, baseline, tolerance, slack_seconds, slack_mb):
+    failures = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if expected['status'] == 'ok' and result['status'] != 'ok':
+            failures.append(f'{key}: {result["status"]} ({result.get("error", "")})')
+            continue
+        if result['status'] != 'ok' or expected['status'] != 'ok':
+            continue
+        for metric, slack in [('cold_seconds', slack_seconds), ('warm_seconds', slack_seconds),
+                              ('peak_mb', slack_mb)]:
+            limit = expected[metric] * (1 + tolerance) + slack
+            if result[metric] > limit:
+                failures.append(f'{key}: {metric} {result[metric]} > {limit:.1f} '
+                                f'(baseline {expected[metric]})')
+    return failures
+
+
+def format_row(key, result):
+    if result['status'] != 'ok':
+        return f'{key:<32} {result["status"]}: {result.get("error", "")}'[:160]
+    return (f'{key:<32} {result["cold_seconds"]:>8.2f} {result["warm_seconds"]:>8.2f} '
+            f'{result["peak_mb"]:>9.1f} {result["figure_bytes"] / 1024:>11.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--sections', nargs='+', choices=list(SECTIONS), default=list(SECTIONS))
+    parser.add_argument('--timeout', type=float, default=300,
+                        help='seconds allowed per render (default: %(default)s)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILENAME)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed relative increase over the baseline (default: %(default)s)')
+    parser.add_argument('--slack-seconds', type=float, default=0.5,
+                        help='absolute time allowance on top of the tolerance (default: %(default)s)')
+    parser.add_argument('--slack-mb', type=float, default=50,
+                        help='absolute memory allowance on top of the tolerance (default: %(default)s)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.timeout)))
+        return 0
+
+    results = {}
+    print(f'{"section @ scale":<32} {"cold (s)":>8} {"warm (s)":>8} {"peak (MB)":>9} {"figures (KB)":>11}')
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            data_dir = make_dataset(scale, Path(workdir) / 'data')
+            for section in args.sections:
+                # Every section starts from empty on-disk caches
+                shutil.rmtree(data_dir / 'cohorts' / COHORT / '.cache', ignore_errors=True)
+                key = f'{section}@{scale}x'
+                results[key] = run_child(section, data_dir, args.timeout)
+                print(format_row(key, results[key]), flush=True)
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + '\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if not args.baseline.exists():
+        print(f'No baseline at {args.baseline}; run with --update-baseline to record one')
+        return 0
+
+    failures = regressions(results, json.loads(args.baseline.read_text()),
+                           args.tolerance, args.slack_seconds, args.slack_mb)
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Benchmark the batch sentiment scoring behind Sentiment_Analysis.json.
+
+Run from the repository root:
+
+    python benchmarks/bench_sentiment.py [--texts 1000 10000] [--jobs 1 2 4]
+
+Distinct texts are made by numbering copies of the survey's free-text
+answers, so every one of them has to be scored. Each batch is scored with
+analysis.sentiment.score_batch (no store) by the given numbers of worker
+processes. Reported are the wall time, the throughput and the speedup over
+one process, next to the cores available: the speedup cannot exceed them.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.paths import data_dir  # noqa: E402
+from analysis.questions import OPEN_ENDED_COLUMNS  # noqa: E402
+from analysis.responses import read_responses  # noqa: E402
+from analysis.sentiment import answer_table, score_batch  # noqa: E402
+
+
+def distinct_texts(count):
+    answers = answer_table(read_responses(data_dir() / 'Responses.json')[0], OPEN_ENDED_COLUMNS)['Text'].tolist()
+    return [f'{answers[i % len(answers)]} ({i})' for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f'{len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()} cores available')
+    print(f'{"texts":>7} {"jobs":>5} {"seconds":>8} {"texts/s":>8} {"speedup":>8}')
+    for count in args.texts:
+        texts = distinct_texts(count)
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            scores = score_batch(texts, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            assert len(scores) == count
+            baseline = baseline or elapsed
+            print(f'{count:>7} {jobs:>5} {elapsed:>8.2f} {count / elapsed:>8.0f} {baseline / elapsed:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
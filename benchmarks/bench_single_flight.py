@@ -0,0 +1,121 @@
+"""Benchmark a burst of sessions asking for the same expensive results.
+
+Run from the repository root:
+
+    python benchmarks/bench_single_flight.py [--users 50]
+
+On a copy of one cohort's phrase frequencies, ``--users`` threads released
+at once each ask for the Summary word cloud with an empty image cache, and
+then for a figure missing from a fresh FigureCache, as sessions opening the
+section right after a deploy would. Reported are the wall time of the burst
+next to the time of a single computation, the number of computations run and
+the share of requests served by one already in flight.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COHORT = '4th-gen'
+COHORT_DIR = ROOT / 'data' / 'cohorts' / COHORT
+FILES = ['Responses.json', 'Phrase_Frequency_Summary.json']
+
+
+def burst(users, function):
+    """Seconds until ``users`` threads started together all returned from ``function``."""
+    barrier = threading.Barrier(users + 1)
+
+    def user():
+        barrier.wait()
+        function()
+
+    threads = [threading.Thread(target=user) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def report(name, single_seconds, burst_seconds, stats_before, stats_after):
+    calls = stats_after['calls'] - stats_before['calls']
+    computations = stats_after['computations'] - stats_before['computations']
+    deduplicated = stats_after['deduplicated'] - stats_before['deduplicated']
+    print(f'{name:<10} {single_seconds:>9.3f} {burst_seconds:>8.3f} {calls:>6} {computations:>13} '
+          f'{deduplicated / calls if calls else 0:>7.0%} {stats_after["max_queued"]:>10}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cohort_dir = Path(workdir) / 'cohorts' / COHORT
+        os.makedirs(cohort_dir)
+        for filename in FILES:
+            shutil.copy(COHORT_DIR / filename, cohort_dir / filename)
+        os.environ['EHCB_DATA_DIR'] = workdir
+        sys.path.insert(0, str(ROOT))
+
+        import plotly.express as px
+        from analysis.figure_cache import FigureCache
+        from analysis.paths import using_cohort
+        from analysis.single_flight import get_single_flight
+        from analysis.summary import load_json_data
+        from analysis.wordclouds import PHRASES_SOURCE, invalidate_wordclouds, render_wordcloud
+
+        flights = get_single_flight()
+        with using_cohort(COHORT):
+            phrases = load_json_data(cohort_dir / 'Phrase_Frequency_Summary.json')['Most_Common_Phrases']
+        frequencies = {item['Phrase']: item['Count'] for item in phrases}
+
+        def wordcloud():
+            with using_cohort(COHORT):
+                render_wordcloud(PHRASES_SOURCE, frequencies=frequencies, width=800, height=400,
+                                 background_color='white')
+
+        print(f'{args.users} users, {flights.max_workers} workers')
+        print(f'{"result":<10} {"single s":>9} {"burst s":>8} {"calls":>6} {"computations":>13} '
+              f'{"dedup":>7} {"max queued":>10}')
+
+        def clear_wordclouds():
+            with using_cohort(COHORT):
+                invalidate_wordclouds()
+
+        # Once to import wordcloud, then timed
+        wordcloud()
+        clear_wordclouds()
+        start = time.perf_counter()
+        wordcloud()
+        single_seconds = time.perf_counter() - start
+        clear_wordclouds()
+        before = flights.stats()
+        burst_seconds = burst(args.users, wordcloud)
+        report('wordcloud', single_seconds, burst_seconds, before, flights.stats())
+
+        labels = list(frequencies)
+        counts = list(frequencies.values())
+
+        def build():
+            return px.bar(x=labels, y=counts, title='Most common phrases')
+
+        FigureCache().get_or_build('bench/phrases', frequencies, build)
+        start = time.perf_counter()
+        FigureCache().get_or_build('bench/phrases', frequencies, build)
+        single_seconds = time.perf_counter() - start
+        figures = FigureCache()
+        before = flights.stats()
+        burst_seconds = burst(args.users, lambda: figures.get_or_build('bench/phrases', frequencies, build))
+        report('figure', single_seconds, burst_seconds, before, flights.stats())
+
+
+if __name__ == '__main__':
+    main()
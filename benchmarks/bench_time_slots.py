@@ -0,0 +1,77 @@
+"""Benchmark the time slot preference heatmap counts against the old iterrows loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_time_slots.py [--scales 1 10 100 1000 5000]
+
+Responses.json is resampled to each scale factor, both implementations are
+checked to produce identical counts and their wall times are printed.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.paths import data_dir  # noqa: E402
+from analysis.questions import (PREFERRED_DAYS_COLUMN,  # noqa: E402
+                                WEEKDAY_TIMES_COLUMN, WEEKEND_TIMES_COLUMN)
+from analysis.summary import (ALL_DAYS, ALL_TIMES,  # noqa: E402
+                              count_time_slot_preferences)
+
+
+def legacy_time_slot_preferences(df_all):
+    # The row-by-row loop previously used by summary()
+    preference_counts = pd.DataFrame(0, index=ALL_TIMES, columns=ALL_DAYS)
+    for idx, row in df_all.iterrows():
+        preferred_days = row[PREFERRED_DAYS_COLUMN]
+        weekday_times = row.get(WEEKDAY_TIMES_COLUMN)
+        weekend_times = row.get(WEEKEND_TIMES_COLUMN)
+        if pd.notna(preferred_days):
+            days_list = [day.strip() for day in preferred_days.split(',')]
+            for times, day_names in ((weekday_times, ALL_DAYS[:5]), (weekend_times, ALL_DAYS[5:])):
+                if pd.notna(times) and any(day in day_names for day in days_list):
+                    times_list = [time.strip() for time in times.split(',')]
+                    for day in days_list:
+                        if day in day_names:
+                            for time_period in times_list:
+                                start_time = time_period.split('-')[0].strip()
+                                if start_time in ALL_TIMES:
+                                    preference_counts.at[start_time, day] += 1
+    return preference_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+',
+                        default=[1, 10, 100, 1000, 5000])
+    parser.add_argument('--legacy-max-rows', type=int, default=110_000,
+                        help='skip the slow loop above this many rows')
+    args = parser.parse_args()
+
+    df_all = pd.read_json(data_dir() / 'Responses.json', lines=True)
+
+    print(f"{'rows':>10} {'vectorized (s)':>15} {'iterrows (s)':>13} {'speedup':>8}")
+    for scale in args.scales:
+        df_scaled = pd.concat([df_all] * scale, ignore_index=True)
+
+        start = time.perf_counter()
+        counts = count_time_slot_preferences(df_scaled)
+        vectorized = time.perf_counter() - start
+
+        legacy = float('nan')
+        if len(df_scaled) <= args.legacy_max_rows:
+            start = time.perf_counter()
+            expected = legacy_time_slot_preferences(df_scaled)
+            legacy = time.perf_counter() - start
+            pd.testing.assert_frame_equal(counts, expected, check_dtype=False)
+
+        print(f'{len(df_scaled):>10} {vectorized:>15.4f} {legacy:>13.4f} '
+              f'{legacy / vectorized:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
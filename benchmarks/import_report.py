@@ -0,0 +1,90 @@
+"""Startup import report: what each entry point loads and how long it takes.
+
+Run from the repository root:
+
+    python benchmarks/import_report.py [--output benchmarks/import_report.txt]
+
+Every scenario is imported in a fresh interpreter under ``python -X
+importtime``. The report lists the total import time of the scenario, the
+heavy libraries it pulled in and the slowest top-level packages. The
+"app (login page)" scenario imports streamlit_app.py with placeholder
+secrets, which is what a cold container pays before the first page.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_PACKAGES = ['pandas', 'numpy', 'plotly', 'matplotlib', 'seaborn', 'wordcloud', 'textblob', 'nltk']
+
+SCENARIOS = [
+    ('streamlit only', 'import streamlit'),
+    ('app (login page)', 'import streamlit_app'),
+    ('summary section', 'import analysis.summary'),
+    ('demographics section', 'import analysis.demographics'),
+    ('pca section', 'import analysis.pca_analysis'),
+    ('correlations section', 'import analysis.correlation_explorer'),
+    ('satisfaction section', 'import analysis.satisfaction_analysis'),
+    ('feedback viewer section', 'import analysis.open_ended_viewer'),
+]
+
+SECRETS = '\n'.join(f'{name} = "benchmark"' for name in [
+    'STREAMLIT_USERNAME', 'STREAMLIT_PASSWORD', 'STREAMLIT_GUEST_USERNAME', 'STREAMLIT_GUEST_PASSWORD'])
+
+
+def import_times(statement, workdir):
+    """{module: (self µs, cumulative µs)} of the modules ``statement`` imports."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=workdir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{statement!r} failed:\n{result.stderr[-2000:]}')
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def summarize(name, times, top):
+    total = sum(self_us for self_us, _ in times.values())
+    by_package = defaultdict(int)
+    for module, (self_us, _) in times.items():
+        by_package[module.split('.')[0]] += self_us
+    heavy = [package for package in HEAVY_PACKAGES if package in by_package]
+    lines = [f'{name}: {total / 1e6:.2f}s, {len(times)} modules',
+             f'  heavy libraries: {", ".join(heavy) or "none"}']
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f'  {self_us / 1e6:7.3f}s  {package}')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=8,
+                        help='packages listed per scenario (default: %(default)s)')
+    parser.add_argument('--output', type=Path,
+                        help='also write the report to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # streamlit_app reads the login credentials from st.secrets on import
+        os.makedirs(Path(workdir) / '.streamlit')
+        (Path(workdir) / '.streamlit' / 'secrets.toml').write_text(SECRETS)
+        report = '\n\n'.join(summarize(name, import_times(statement, workdir), args.top)
+                             for name, statement in SCENARIOS)
+
+    print(report)
+    if args.output:
+        args.output.write_text(f'{report}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Regenerate the derived files of every cohort from its Responses.json.
+
+    python build_artifacts.py               # rebuild what changed
+    python build_artifacts.py --cohort 4th-gen  # only one cohort
+    python build_artifacts.py --force       # rebuild everything
+    python build_artifacts.py --only pca    # rebuild selected stages
+    python build_artifacts.py --dry-run     # list the stages that would run
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from analysis.artifacts import STAGES
+from analysis.paths import cohorts, data_dir
+from analysis.pipeline import build
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--cohort', nargs='+', choices=cohorts(), default=cohorts(),
+                        help='cohorts to rebuild (default: all)')
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help='rebuild this directory holding a Responses.json instead')
+    parser.add_argument('--only', nargs='+', metavar='STAGE',
+                        choices=[stage.name for stage in STAGES],
+                        help='stages to consider (default: all)')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild even if the inputs did not change')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='report stale stages without building them')
+    args = parser.parse_args()
+
+    stages = [stage for stage in STAGES if not args.only or stage.name in args.only]
+    directories = [args.data_dir] if args.data_dir else [data_dir(name) for name in args.cohort]
+    failed = False
+    for directory in directories:
+        print(f'{directory}:')
+        status = build(directory, stages, force=args.force,
+                       jobs=args.jobs, dry_run=args.dry_run)
+        failed = failed or 'failed' in status.values()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Export the report of every cohort as static files served to guest sessions.
+
+    python export_report.py                    # every cohort, HTML only
+    python export_report.py --cohort 4th-gen   # only one cohort
+    python export_report.py --pdf              # also a PDF (needs kaleido)
+    python export_report.py --jobs 4           # worker processes
+
+Guests see the exported report of the cohort they pick instead of the live
+sections; export again after new responses came in.
+"""
+import argparse
+import sys
+
+from analysis.paths import cohorts
+from analysis.report_export import export_report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--cohort', nargs='+', choices=cohorts(), default=cohorts(),
+                        help='cohorts to export (default: all)')
+    parser.add_argument('--pdf', action='store_true',
+                        help='also write a PDF of the report')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes rendering the sections (default: one per CPU)')
+    args = parser.parse_args()
+
+    failed = False
+    for cohort in args.cohort:
+        print(f'{cohort}:')
+        try:
+            export_report(cohort, pdf=args.pdf, jobs=args.jobs)
+        except RuntimeError as e:
+            print(f'  {e}')
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Append new survey submissions to a cohort's Responses.json and update the aggregates.
+
+    python ingest_responses.py new_batch.jsonl    # append a batch of JSONL records
+    python ingest_responses.py --cohort 5th-gen new_batch.jsonl
+    cat new_batch.jsonl | python ingest_responses.py -
+    python ingest_responses.py --rebuild          # recompute the aggregates from scratch
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from analysis.aggregates import AGGREGATES_FILE, build_aggregates, ingest, save_aggregates
+from analysis.paths import COHORTS_DIR, RESPONSES_FILE, default_cohort
+
+
+def read_records(f):
+    records = []
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f'line {number}: expected a JSON object per line')
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('batches', nargs='*', type=argparse.FileType('r', encoding='utf-8'),
+                        help="JSONL files with one submission per line ('-' for stdin)")
+    parser.add_argument('--cohort', default=default_cohort(),
+                        help='cohort receiving the submissions, created if new (default: %(default)s)')
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help='directory holding Responses.json, instead of a cohort')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='recompute the aggregates from the whole responses file')
+    args = parser.parse_args()
+
+    directory = args.data_dir or COHORTS_DIR / args.cohort
+    source = directory / RESPONSES_FILE
+    path = directory / '.cache' / AGGREGATES_FILE
+    if args.rebuild:
+        aggregates = build_aggregates(source)
+        save_aggregates(aggregates, path)
+    # Validate every batch before appending anything
+    records = [record for batch in args.batches for record in read_records(batch)]
+    aggregates = ingest(records, source, path)
+    print(f'Ingested {len(records)} responses, {aggregates["rows"]} in total')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,67 @@
+import time
+
 import streamlit as st
-from analysis.demographics import demographics
-from analysis.summary import summary
-from analysis.recommendations import recommendations
-from analysis.pca_analysis import pca_analysis
-from analysis.satisfaction_analysis import satisfaction_analysis
-from analysis.comparative_analysis import comparative_analysis
-from analysis.open_ended_viewer import open_ended_viewer
+
+from analysis.paths import cohorts, default_cohort, using_cohort
+from analysis.sections import SECTIONS, section_function
+
+# Chart records kept per session for the instrumentation panel and its export
+MAX_INSTRUMENTATION_RECORDS = 5000
+
+
+@st.cache_resource
+def section_timings():
+    """Seconds the last render of each section took, shared by all sessions."""
+    return {}
+
+
+def render_section(title, render):
+    start = time.perf_counter()
+    function = section_function(render)
+    # Every path the section resolves points into the selected cohort
+    with using_cohort(st.session_state.get("cohort") or default_cohort()):
+        if st.session_state.get("instrument") and not st.session_state.get("is_guest"):
+            from analysis.instrumentation import recording
+            with recording(title, trace_memory=st.session_state.get("instrument_memory", False)) as recorder:
+                function()
+            records = st.session_state.setdefault("instrumentation_records", [])
+            records.extend(recorder.records)
+            del records[:-MAX_INSTRUMENTATION_RECORDS]
+            st.session_state.setdefault("instrumentation_run", []).extend(recorder.records)
+        else:
+            function()
+    section_timings()[title] = time.perf_counter() - start
+
+
+def instrumentation_panel(panel):
+    """Slowest charts of this run and the JSONL export of all recorded ones."""
+    from analysis.instrumentation import STAGES, to_jsonl
+    run = st.session_state.pop("instrumentation_run", [])
+    records = st.session_state.get("instrumentation_records", [])
+    if not records:
+        panel.caption("Show a section to record its charts.")
+        return
+    if run:
+        columns = ["section", "chart", "seconds"] + [f"{stage}_seconds" for stage in STAGES]
+        columns += ["peak_kb"] if "peak_kb" in run[0] else []
+        panel.caption(f"{len(run)} charts in {sum(r['seconds'] for r in run):.2f}s, slowest first")
+        panel.dataframe([{column: record[column] for column in columns + ["bytes", "figure_cache"]}
+                         for record in sorted(run, key=lambda r: -r["seconds"])],
+                        hide_index=True)
+    panel.download_button(f"Export {len(records)} records (JSONL)", to_jsonl(records),
+                          file_name="instrumentation.jsonl", mime="application/jsonl")
+    if panel.button("Clear records"):
+        st.session_state["instrumentation_records"] = []
+
+
+def lazy_section(title, render, size):
+    """Section header with a switch; the section itself runs only when switched on."""
+    st.header(title)
+    elapsed = section_timings().get(title)
+    cost = f"{size}, last took {elapsed:.1f}s" if elapsed is not None else size
+    if st.toggle(f"Show section ({cost})", key=f"show_{title}"):
+        render_section(title, render)
+
 
 # Retrieve the username and passwords from Streamlit secrets
 USERNAME = st.secrets["STREAMLIT_USERNAME"]
@@ -36,62 +92,85 @@ if not st.session_state["logged_in"]:
     elif login_button:
         st.sidebar.error("Invalid username or password")
 else:
-    # Add a toggle switch for one-page view vs. sectioned view
-    st.sidebar.header("Display Options")
-    one_page_view = st.sidebar.checkbox(
-        "Show all sections on one page", value=False)
+    # Generation of the academy the sections describe
+    cohort_names = cohorts()
+    if not cohort_names:
+        st.error("No survey data found: every cohort needs a data/cohorts/<cohort>/Responses.json.")
+        st.stop()
+    st.sidebar.selectbox("Cohort", cohort_names, index=cohort_names.index(default_cohort()),
+                         key="cohort")
 
-    if one_page_view:
-        # Show all sections on one page
-        st.header("Summary")
-        summary()
+    cohort = st.session_state.get("cohort") or default_cohort()
 
-        st.header("Demographics")
-        demographics()
+    # Guests are shown the exported report of the cohort (see export_report.py),
+    # so their sessions compute nothing
+    snapshot = False
+    if st.session_state.get("is_guest"):
+        from analysis.snapshot import has_snapshot
+        snapshot = has_snapshot(cohort)
 
-        st.header("PCA Analysis")
-        pca_analysis()
+    if snapshot:
+        from analysis.snapshot import show_snapshot
+        with using_cohort(cohort):
+            show_snapshot()
+    else:
+        # Respondent filters applied to every section
+        if st.sidebar.checkbox("Filter respondents", key="respondent_filters"):
+            from analysis.filters import filter_sidebar
+            with using_cohort(cohort):
+                filter_sidebar(st.sidebar.expander("Respondents", expanded=True))
+        else:
+            for key in [key for key in st.session_state if str(key).startswith("filter_")]:
+                del st.session_state[key]
 
-        st.header("Satisfaction Details")
-        satisfaction_analysis()
+        # Add a toggle switch for one-page view vs. sectioned view
+        st.sidebar.header("Display Options")
+        one_page_view = st.sidebar.checkbox(
+            "Show all sections on one page", value=False)
 
-        # st.header("Comparative Analysis")
-        # comparative_analysis()
+        # Admin-only chart instrumentation; the panel is filled once the sections ran
+        if not st.session_state.get("is_guest"):
+            panel = st.sidebar.expander("Instrumentation")
+            panel.checkbox("Time each chart", key="instrument")
+            panel.checkbox("Also trace memory (slows down every session)", key="instrument_memory",
+                           disabled=not st.session_state.get("instrument"))
 
-        # st.header("Recommendations")
-        # recommendations()
+        if one_page_view:
+            # Show all sections on one page, each loaded only once it is switched on
+            lazy = st.sidebar.checkbox("Load sections on demand", value=True)
+            for title, render, size in SECTIONS:
+                if lazy:
+                    lazy_section(title, render, size)
+                else:
+                    st.header(title)
+                    render_section(title, render)
 
-        st.header("Feedback Viewer")
-        open_ended_viewer()
+        else:
+            # Sectioned view
+            st.sidebar.header("Navigate")
+            section = st.sidebar.radio(
+                "Go to", [title for title, _, _ in SECTIONS])
 
-    else:
-        # Sectioned view
-        st.sidebar.header("Navigate")
-        section = st.sidebar.radio("Go to", ["Summary", "Demographics", "PCA Analysis",
-                                             "Satisfaction Details", "Feedback Viewer"])
-
-        # Display the selected section
-        if section == "Summary":
-            st.header("Summary")
-            summary()
-        elif section == "Demographics":
-            st.header("Demographics")
-            demographics()
-        elif section == "PCA Analysis":
-            st.header("PCA Analysis")
-            pca_analysis()
-        elif section == "Satisfaction Details":
-            st.header("Satisfaction Details")
-            satisfaction_analysis()
-        # elif section == "Comparative Analysis":
-        #     st.header("Comparative Analysis")
-        #     comparative_analysis()
-        # elif section == "Recommendations":
-        #     st.header("Recommendations")
-        #     recommendations()
-        elif section == "Feedback Viewer":
-            st.header("Feedback Viewer")
-            open_ended_viewer()
+            # Display the selected section
+            for title, render, _ in SECTIONS:
+                if section == title:
+                    st.header(title)
+                    render_section(title, render)
+
+    # Only once a section has run, so the stats never load a section's libraries
+    if not st.session_state.get("is_guest") and section_timings():
+        from analysis.figure_cache import get_figure_cache
+        stats = get_figure_cache().stats()
+        st.sidebar.caption(f"Figure cache: {stats['hits']} hits, {stats['misses']} misses, "
+                           f"{stats['saved_seconds']:.1f}s of chart building saved")
+        from analysis.single_flight import get_single_flight
+        flights = get_single_flight().stats()
+        st.sidebar.caption(f"Shared computations: {flights['computations']} for {flights['calls']} requests "
+                           f"({flights['dedup_rate']:.0%} deduplicated), {flights['queued']} queued, "
+                           f"{flights['running']} running")
+
+    if st.session_state.get("instrument") and not st.session_state.get("is_guest"):
+        instrumentation_panel(panel)
 
     # Add a logout button
     if st.sidebar.button("Logout"):